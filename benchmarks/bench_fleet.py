@@ -0,0 +1,118 @@
+"""
+Scaling of core.fleet_monitor: one monitor process polling many stand-in
+LHM servers (asyncio, keep-alive) that run in a separate process.
+
+A few hosts are hot (warning/critical alerts), a few hang without answering
+(timeouts) and a few refuse connections (backoff, "down" alerts).
+
+Usage: python benchmarks/bench_fleet.py [hosts] [seconds] [interval_s]
+"""
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.lhm_fixture import build_payload
+from core.fleet_monitor import FleetMonitor, HostAlert, HostReading
+
+HOT_EVERY = 25  # Every n-th host reports VRAM above T1 (every 2n-th above T2)
+HANG_EVERY = 50  # Every n-th host accepts requests but never answers
+DEAD_EVERY = 40  # Every n-th host is not listening at all
+
+
+def _response(temp: float) -> bytes:
+    payload = build_payload(cores=16, dimms=4, disks=4, nics=2, vram_temps=[temp])
+    return (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n" % len(payload)) + payload
+
+
+async def _serve_hosts(count: int):
+    normal, hot, critical = _response(74.0), _response(95.0), _response(107.0)
+
+    def handler(response: bytes, hang: bool):
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                while True:
+                    while (line := await reader.readline()) not in (b"\r\n", b""):
+                        pass
+                    if not line:
+                        break
+                    if hang:
+                        await asyncio.sleep(3600)
+                    writer.write(response)
+                    await writer.drain()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                writer.close()
+        return handle
+
+    servers, ports = [], []
+    for i in range(count):
+        if i % DEAD_EVERY == DEAD_EVERY - 1:
+            ports.append(1)  # Nothing listens on port 1: connection refused
+            continue
+        response = critical if i % (2 * HOT_EVERY) == 2 * HOT_EVERY - 1 else hot if i % HOT_EVERY == HOT_EVERY - 1 else normal
+        server = await asyncio.start_server(handler(response, i % HANG_EVERY == HANG_EVERY // 2), "127.0.0.1", 0)
+        servers.append(server)
+        ports.append(server.sockets[0].getsockname()[1])
+    print(json.dumps(ports), flush=True)
+    await asyncio.Event().wait()
+
+
+async def _monitor(ports, seconds: float, interval_s: float):
+    monitor = FleetMonitor([f"127.0.0.1:{port}" for port in ports], interval_s=interval_s, timeout_s=1.0,
+                           max_concurrency=256)
+    latencies, alerts = [], {}
+
+    async def consume():
+        async for event in monitor.events():
+            if isinstance(event, HostReading):
+                latencies.append(event.latency_s)
+            elif isinstance(event, HostAlert):
+                alerts[event.level] = alerts.get(event.level, 0) + 1
+
+    monitor.start()
+    consumer = asyncio.ensure_future(consume())
+    await asyncio.sleep(interval_s * 2)  # Connections established, sensors resolved
+    latencies.clear()
+    polls, cpu, wall = monitor.polls, time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    polls, cpu, wall = monitor.polls - polls, time.process_time() - cpu, time.perf_counter() - wall
+    consumer.cancel()
+    await monitor.stop()
+    return monitor, polls, cpu, wall, sorted(latencies), alerts
+
+
+def main():
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    interval_s = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+
+    server = subprocess.Popen([sys.executable, __file__, "--serve", str(hosts)], stdout=subprocess.PIPE, text=True)
+    try:
+        ports = json.loads(server.stdout.readline())
+        monitor, polls, cpu, wall, latencies, alerts = asyncio.run(_monitor(ports, seconds, interval_s))
+    finally:
+        server.kill()
+
+    answering = sum(1 for i in range(hosts) if i % DEAD_EVERY != DEAD_EVERY - 1 and i % HANG_EVERY != HANG_EVERY // 2)
+    print(f"hosts {hosts} ({answering} answering), interval {interval_s:g}s, {seconds:g}s measured")
+    print(f"polls/s        {polls / wall:8.1f}  (ideal {answering / interval_s:.1f})")
+    print(f"monitor CPU    {cpu / wall:8.1%}  of one core")
+    if latencies:
+        print(f"latency ms     p50 {latencies[len(latencies) // 2] * 1e3:.2f}  "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f}")
+    print(f"connections    {monitor.connections_opened} opened for {monitor.polls} polls, {monitor.errors} errors")
+    print(f"alerts         {alerts}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--serve":
+        asyncio.run(_serve_hosts(int(sys.argv[2])))
+    else:
+        main()
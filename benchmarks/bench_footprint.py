@@ -0,0 +1,97 @@
+"""
+Resident memory, threads and wakeups (context switches per second) of the
+headless service vs. the tray build, each running the real core loop on a
+replayed trace in its own process.
+
+The tray variant adds what main() does for the tray: the GUI imports
+(PIL, pystray, tkinter) and the UI update thread. pystray is skipped when it
+cannot load (no display), which understates the tray footprint.
+
+Usage: python benchmarks/bench_footprint.py [seconds]
+"""
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psutil
+
+TRACE = [(0.0, 68.0), (60.0, 74.0), (120.0, 71.0)]  # Warm, not throttling: 5 s polls
+
+
+def _child(mode: str, seconds: float):
+    from config.settings import Settings
+    from core.gpu_process_source import FakeGpuProcessSource
+    from core.process_throttler import Throttler
+    from core.sensor_source import ReplaySensorSource
+    from core.vram_guard_core import VRAMGuardCore
+
+    skipped = []
+    with tempfile.TemporaryDirectory() as settings_dir:
+        settings = Settings(Path(settings_dir))
+        settings.update({"enable_telemetry": False})
+        core = VRAMGuardCore(settings, None, ReplaySensorSource(TRACE), Throttler(FakeGpuProcessSource(), settings))
+
+        if mode == "tray":
+            from PIL import Image, ImageDraw, ImageFont  # noqa: F401
+            import tkinter  # noqa: F401
+            try:
+                import pystray  # noqa: F401
+            except Exception:
+                skipped.append("pystray")
+
+            ui_changed = threading.Event()
+            core.subscribe(ui_changed.set)
+
+            def update_ui_loop():
+                while True:
+                    _ = (core.current_temp, core.is_throttling, core.gpu_states)
+                    ui_changed.wait(timeout=30)
+                    ui_changed.clear()
+
+            threading.Thread(target=update_ui_loop, daemon=True).start()
+
+        thread = threading.Thread(target=core.run_monitoring_loop, daemon=True)
+        thread.start()
+        time.sleep(2.0)  # Startup settles
+
+        process = psutil.Process()
+        before = process.num_ctx_switches()
+        time.sleep(seconds)
+        after = process.num_ctx_switches()
+        rss, threads = process.memory_info().rss, process.num_threads()
+        core.stop()
+        thread.join(timeout=5)
+
+        switches = (after.voluntary + after.involuntary) - (before.voluntary + before.involuntary)
+        print(json.dumps({
+            "rss_mib": rss / 2**20,
+            "threads": threads,
+            "wakeups_per_s": switches / seconds,
+            "modules": len(sys.modules),
+            "skipped": skipped,
+        }))
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    print(f"{'mode':<10} {'RSS MiB':>8} {'threads':>8} {'wakeups/s':>10} {'modules':>8}")
+    for mode in ("headless", "tray"):
+        output = subprocess.run([sys.executable, __file__, "--child", mode, str(seconds)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        note = f"  (without {', '.join(result['skipped'])})" if result["skipped"] else ""
+        print(f"{mode:<10} {result['rss_mib']:>8.1f} {result['threads']:>8} {result['wakeups_per_s']:>10.2f} "
+              f"{result['modules']:>8}{note}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], float(sys.argv[3]))
+    else:
+        main()
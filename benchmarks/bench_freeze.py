@@ -0,0 +1,132 @@
+"""
+Freeze/thaw latency of the POSIX process freezers (core.process_freezer) on
+trees of busy stand-in GPU jobs: every job is a shell with worker children
+that keep forking short-lived helpers.
+
+  pids      SIGSTOP/SIGCONT to the listed PIDs only (children keep running)
+  signals   SIGSTOP/SIGCONT to the whole tree
+  cgroup    one cgroup.freeze write per cycle (Linux, cgroup v2, root)
+
+"freeze" is the time until the last listed job was signalled or frozen
+(what the reaction latency sees), "call" the whole suspend call including
+the descendant walk, "settled" the time until every task is verifiably
+stopped (cgroup.events "frozen 1" for the cgroup), "escaped" the processes
+that still ran or appeared during a short hold.
+
+Usage: python benchmarks/bench_freeze.py [jobs,...] [cycles]
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psutil
+
+from core.process_freezer import CgroupFreezer, SignalFreezer, _children_map, _descendants, cgroup2_mount
+
+WORKERS_PER_JOB = 2
+HOLD_S = 0.3  # How long each freeze is held while counting escaped processes
+JOB_CODE = "for i in $(seq %d); do (while :; do sleep 0.1; done) & done; wait" % WORKERS_PER_JOB
+
+
+def _tree(roots):
+    return [int(pid) for pid in roots] + _descendants(roots, _children_map())
+
+
+def _all_stopped(pids) -> bool:
+    """No task in pids can run (stopped, or exited and not yet reaped)."""
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                state = f.read().rsplit(b")", 1)[1].split()[0]
+        except OSError:
+            continue  # Exited
+        if state not in (b"T", b"t", b"Z", b"X"):  # Zombies exited before their parent was stopped
+            return False
+    return True
+
+
+def _wait(predicate, timeout_s: float = 2.0) -> float:
+    started = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - started > timeout_s:
+            return float("nan")
+    return time.perf_counter() - started
+
+
+def _measure(freezer, jobs, cycles: int):
+    processes = [psutil.Process(job.pid) for job in jobs]
+    roots = [job.pid for job in jobs]
+    freeze, suspend, stopped, resume, escaped = [], [], [], [], []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        _, finished = freezer.run('suspend', processes)
+        suspend.append(time.perf_counter() - started)
+        freeze.append(max(t for t in finished if t is not None) - started)
+        if isinstance(freezer, CgroupFreezer):
+            stopped.append(suspend[-1] + _wait(freezer.is_frozen))
+        else:
+            tree = _tree(roots) if getattr(freezer, "include_descendants", False) else roots
+            stopped.append(suspend[-1] + _wait(lambda: _all_stopped(tree)))
+
+        before = set(_tree(roots))
+        time.sleep(HOLD_S)
+        # New helpers forked during the hold, plus tree members that are not stopped
+        after = set(_tree(roots))
+        frozen = isinstance(freezer, CgroupFreezer) and freezer.is_frozen()
+        running = 0 if frozen else sum(1 for pid in after if not _all_stopped([pid]))
+        escaped.append(len(after - before) + running)
+
+        started = time.perf_counter()
+        freezer.run('resume', processes)
+        resume.append(time.perf_counter() - started)
+        time.sleep(0.05)
+    return freeze, suspend, stopped, resume, escaped
+
+
+def _median_ms(values) -> float:
+    values = sorted(values)
+    return values[len(values) // 2] * 1000
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1, 8, 32, 64]
+    cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    backends = [("pids", lambda: SignalFreezer(include_descendants=False)), ("signals", SignalFreezer)]
+    mount = cgroup2_mount()
+    if sys.platform.startswith("linux") and mount is not None and os.geteuid() == 0:
+        backends.append(("cgroup", lambda: CgroupFreezer(mount / "vram_guard_bench")))
+    else:
+        print("cgroup backend skipped (needs Linux, cgroup v2 and root)")
+
+    print(f"{'jobs':>5} {'procs':>6} {'backend':<8} {'freeze ms':>10} {'call ms':>9} {'settled ms':>11} "
+          f"{'thaw ms':>8} {'escaped':>8}")
+    for size in sizes:
+        jobs = [subprocess.Popen(["sh", "-c", JOB_CODE], stderr=subprocess.DEVNULL) for _ in range(size)]
+        try:
+            time.sleep(0.5)
+            count = len(_tree([job.pid for job in jobs]))
+            for name, factory in backends:
+                freezer = factory()
+                try:
+                    freeze, suspend, stopped, resume, escaped = _measure(freezer, jobs, cycles)
+                finally:
+                    freezer.close()
+                print(f"{size:>5} {count:>6} {name:<8} {_median_ms(freeze):>10.3f} {_median_ms(suspend):>9.3f} "
+                      f"{_median_ms(stopped):>11.3f} {_median_ms(resume):>8.3f} {sorted(escaped)[len(escaped) // 2]:>8}")
+        finally:
+            for pid in reversed(_tree([job.pid for job in jobs])):
+                try:
+                    os.kill(pid, 9)
+                except OSError:
+                    pass
+            for job in jobs:
+                job.wait()
+
+
+if __name__ == "__main__":
+    main()
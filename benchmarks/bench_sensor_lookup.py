@@ -0,0 +1,45 @@
+"""
+Per-poll CPU time of the VRAM sensor lookup on a large LHM tree:
+full tree walk on every poll (old behaviour) vs. the cached sensor path.
+
+Usage: python benchmarks/bench_sensor_lookup.py [polls]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.lhm_fixture import build_tree, count_nodes
+from core.lhm_sensors import VramSensorMatcher
+
+
+def _per_poll_us(fn, data: dict, polls: int) -> float:
+    start = time.process_time()
+    for _ in range(polls):
+        fn(data)
+    return (time.process_time() - start) / polls * 1e6
+
+
+def main():
+    polls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    data = build_tree()
+    matcher = VramSensorMatcher()
+
+    def full_walk(tree):
+        matcher.invalidate()
+        return matcher.lookup(tree)
+
+    cached = matcher.lookup
+    assert full_walk(data) == cached(data)
+
+    before = _per_poll_us(full_walk, data, polls)
+    after = _per_poll_us(cached, data, polls)
+    print(f"tree nodes:        {count_nodes(data)}")
+    print(f"full walk / poll:  {before:8.1f} us")
+    print(f"cached / poll:     {after:8.1f} us")
+    print(f"speedup:           {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
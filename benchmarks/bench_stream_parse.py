@@ -0,0 +1,62 @@
+"""
+Per-poll wall time and peak Python allocations of LHMClient.get_vram_temp,
+full response.json() parse vs. streaming early-exit parse, against
+multi-hundred-KB payloads served by a local stand-in LHM server.
+
+Usage: python benchmarks/bench_stream_parse.py [polls]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.lhm_fixture import build_payload
+from benchmarks.lhm_server import FakeLHMServer
+from core.lhm_client import LHMClient
+
+PAYLOADS = {
+    "large": dict(cores=64, dimms=16, disks=16, nics=8),
+    "huge": dict(cores=128, dimms=16, disks=24, nics=16),
+    "server": dict(cores=192, dimms=32, disks=48, nics=24),
+}
+
+
+def _measure(client: LHMClient, polls: int):
+    client.get_vram_temp()  # Resolve and cache the sensor first
+    start = time.perf_counter()
+    for _ in range(polls):
+        temp, _ = client.get_vram_temp()
+        assert temp is not None
+    per_poll_ms = (time.perf_counter() - start) / polls * 1e3
+
+    tracemalloc.start()
+    client.get_vram_temp()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_poll_ms, peak / 1024
+
+
+def main():
+    polls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for name, kwargs in PAYLOADS.items():
+        payload = build_payload(**kwargs)
+        server = FakeLHMServer(payload).start()
+        try:
+            client = LHMClient(Path("."))
+            client.api_url = server.url
+            client.stream_parsing = False
+            full_ms, full_kb = _measure(client, polls)
+            client.stream_parsing = True
+            stream_ms, stream_kb = _measure(client, polls)
+        finally:
+            server.stop()
+
+        print(f"{name} ({len(payload) / 1024:.0f} KB payload)")
+        print(f"  full parse:   {full_ms:7.2f} ms/poll, peak {full_kb:8.1f} KB")
+        print(f"  stream parse: {stream_ms:7.2f} ms/poll, peak {stream_kb:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Builds a large LibreHardwareMonitor data.json tree for the benchmarks.
+
+The layout mirrors a dump recorded on a workstation (many-core CPU, several
+DIMMs, disks and NICs) with the NVIDIA GPU near the end of the tree, which is
+the worst case for a full walk.
+"""
+import json
+from typing import Dict, List, Optional
+
+
+class _TreeBuilder:
+    def __init__(self):
+        self.next_id = 0
+
+    def node(self, text: str, value: str = "", children: Optional[List[dict]] = None,
+             sensor_id: Optional[str] = None, sensor_type: Optional[str] = None) -> dict:
+        node = {
+            "id": self.next_id,
+            "Text": text,
+            "Min": value,
+            "Value": value,
+            "Max": value,
+            "ImageURL": "images_icon/transparent.png",
+            "Children": children or [],
+        }
+        if sensor_id:
+            node["SensorId"] = sensor_id
+            node["Type"] = sensor_type
+        self.next_id += 1
+        return node
+
+    def group(self, text: str, hw_id: str, kind: str, unit: str, names: List[str], base: float) -> dict:
+        children = [
+            self.node(name, f"{base + i * 0.5:.1f} {unit}", sensor_id=f"{hw_id}/{kind.lower()}/{i}", sensor_type=kind)
+            for i, name in enumerate(names)
+        ]
+        return self.node(text, children=children)
+
+
+def build_tree(cores: int = 32, dimms: int = 8, disks: int = 8, nics: int = 6, fans: int = 7,
+               gpu_name: str = "NVIDIA GeForce RTX 4090", vram_temp: float = 74.0,
+               vram_temps: Optional[List[float]] = None) -> Dict:
+    """
+    Returns a data.json-shaped dict. The defaults produce several hundred sensors.
+    :param vram_temps: One GPU per entry (default: a single GPU at vram_temp).
+    """
+    b = _TreeBuilder()
+    hardware = []
+
+    cpu_id = "/amdcpu/0"
+    hardware.append(b.node("AMD Ryzen Threadripper", children=[
+        b.group("Voltages", cpu_id, "Voltage", "V", [f"Core #{i + 1} VID" for i in range(cores)], 1.1),
+        b.group("Clocks", cpu_id, "Clock", "MHz", [f"Core #{i + 1}" for i in range(cores)], 4200.0),
+        b.group("Temperatures", cpu_id, "Temperature", "°C",
+                ["Core (Tctl/Tdie)", "Package"] + [f"CCD{i + 1} (Tdie)" for i in range(cores // 8)], 55.0),
+        b.group("Load", cpu_id, "Load", "%", ["CPU Total"] + [f"CPU Core #{i + 1}" for i in range(cores)], 12.0),
+        b.group("Powers", cpu_id, "Power", "W", ["Package"] + [f"Core #{i + 1} (SMU)" for i in range(cores)], 3.0),
+    ]))
+
+    lpc_id = "/lpc/nct6798d/0"
+    hardware.append(b.node("ASUS Pro WS", children=[b.node("Nuvoton NCT6798D", children=[
+        b.group("Voltages", lpc_id, "Voltage", "V", [f"Voltage #{i + 1}" for i in range(15)], 0.9),
+        b.group("Temperatures", lpc_id, "Temperature", "°C",
+                ["CPU", "Motherboard", "PCH Chip", "PCH CPU", "PCH MCH"] + [f"Auxiliary #{i}" for i in range(6)], 38.0),
+        b.group("Fans", lpc_id, "Fan", "RPM", [f"Fan #{i + 1}" for i in range(fans)], 900.0),
+        b.group("Controls", lpc_id, "Control", "%", [f"Fan #{i + 1}" for i in range(fans)], 40.0),
+    ])]))
+
+    for d in range(dimms):
+        mem_id = f"/memory/dimm/{d}"
+        hardware.append(b.node(f"DIMM #{d + 1}", children=[
+            b.group("Temperatures", mem_id, "Temperature", "°C", ["Temperature"], 41.0),
+            b.group("Timings", mem_id, "Timing", "T", ["tCL", "tRCD", "tRP", "tRAS", "tRC"], 16.0),
+        ]))
+
+    for d in range(disks):
+        disk_id = f"/nvme/{d}"
+        hardware.append(b.node(f"Samsung SSD 990 PRO #{d}", children=[
+            b.group("Temperatures", disk_id, "Temperature", "°C", ["Composite Temperature", "Temperature #1", "Temperature #2"], 44.0),
+            b.group("Load", disk_id, "Load", "%", ["Used Space", "Read Activity", "Write Activity", "Total Activity"], 1.0),
+            b.group("Data", disk_id, "Data", "GB", ["Data Read", "Data Written"], 12000.0),
+            b.group("Throughput", disk_id, "Throughput", "KB/s", ["Read Rate", "Write Rate"], 0.0),
+        ]))
+
+    for n in range(nics):
+        nic_id = f"/nic/{n}"
+        hardware.append(b.node(f"Ethernet {n + 1}", children=[
+            b.group("Data", nic_id, "Data", "GB", ["Data Uploaded", "Data Downloaded"], 3.0),
+            b.group("Throughput", nic_id, "Throughput", "KB/s", ["Upload Speed", "Download Speed"], 0.0),
+            b.group("Load", nic_id, "Load", "%", ["Network Utilization"], 0.0),
+        ]))
+
+    for g, temp in enumerate(vram_temps if vram_temps is not None else [vram_temp]):
+        hardware.append(_gpu_node(b, f"/gpu-nvidia/{g}", gpu_name, temp))
+
+    computer = b.node("WORKSTATION", children=hardware)
+    return b.node("Sensor", children=[computer])
+
+
+def _gpu_node(b: _TreeBuilder, gpu_id: str, gpu_name: str, vram_temp: float) -> dict:
+    return b.node(gpu_name, children=[
+        b.group("Clocks", gpu_id, "Clock", "MHz", ["GPU Core", "GPU Memory", "GPU Shader"], 2520.0),
+        b.node("Temperatures", children=[
+            b.node("GPU Core", "61.0 °C", sensor_id=f"{gpu_id}/temperature/0", sensor_type="Temperature"),
+            b.node("GPU Hot Spot", "72.0 °C", sensor_id=f"{gpu_id}/temperature/2", sensor_type="Temperature"),
+            b.node("GPU Memory Junction", f"{vram_temp:.1f} °C", sensor_id=f"{gpu_id}/temperature/3", sensor_type="Temperature"),
+        ]),
+        b.group("Load", gpu_id, "Load", "%", ["GPU Core", "GPU Memory Controller", "GPU Video Engine", "GPU Bus", "GPU Memory"], 85.0),
+        b.group("Fans", gpu_id, "Fan", "RPM", ["GPU Fan 1", "GPU Fan 2"], 1700.0),
+        b.group("Powers", gpu_id, "Power", "W", ["GPU Package"], 380.0),
+        b.group("Data", gpu_id, "SmallData", "MB", ["GPU Memory Free", "GPU Memory Used", "GPU Memory Total"], 8000.0),
+    ])
+
+
+def build_payload(**kwargs) -> bytes:
+    """Serializes the tree the way the LHM web server does (compact UTF-8 JSON)."""
+    return json.dumps(build_tree(**kwargs), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def count_nodes(node: dict) -> int:
+    return 1 + sum(count_nodes(child) for child in node.get("Children", []))
+
+
+if __name__ == "__main__":
+    tree = build_tree()
+    print(f"nodes: {count_nodes(tree)}, payload: {len(build_payload()) / 1024:.1f} KB")
@@ -0,0 +1,57 @@
+"""
+Local stand-in for the LibreHardwareMonitor web server.
+Serves /data.json from a payload that can be swapped while running.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Union
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path != "/data.json":
+            self.send_error(404)
+            return
+        payload = self.server.get_payload()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Streaming clients hang up as soon as they have their sensor
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLHMServer:
+    def __init__(self, payload: Union[bytes, Callable[[], bytes]], port: int = 0):
+        """
+        :param payload: data.json bytes, or a callable returning fresh bytes per request.
+        :param port: 0 picks a free port.
+        """
+        self.payload = payload
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.get_payload = lambda: self.payload() if callable(self.payload) else self.payload
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/data.json"
+
+    def start(self) -> "FakeLHMServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,27 +1,103 @@
+import copy
 import json
 import logging
-import winreg
+import os
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import winreg
+except ImportError:  # Not on Windows (simulation, tooling)
+    winreg = None
 
 logger = logging.getLogger(__name__)
 
+
+class SettingsSnapshot:
+    """
+    Immutable view of the settings at one point in time. The core takes one
+    per cycle, so a single decision never mixes old and new values.
+    """
+
+    __slots__ = ("_data", "version")
+
+    def __init__(self, data: dict, version: int):
+        self._data = MappingProxyType(copy.deepcopy(data))
+        self.version = version
+
+    def get(self, key: str):
+        return self._data.get(key, Settings.DEFAULT_SETTINGS.get(key))
+
+
 class Settings:
     DEFAULT_SETTINGS = {
         "vram_t1_threshold": 92,
         "vram_t2_panic_threshold": 105,
         "cool_down_time_s": 3.0,
         "work_time_s": 2.0,
+        "max_cool_down_time_s": 10.0,
+        "throttle_hysteresis_c": 2.0,
+        "throttle_mode": "pulse",
+        "pi_setpoint_margin_c": 1.0,
+        "pi_kp": 0.05,
+        "pi_ki": 0.01,
+        "pi_min_duty": 0.1,
+        "pi_max_duty": 1.0,
+        "pi_period_s": 5.0,
+        "poll_min_interval_s": 1.0,
+        "poll_max_interval_s": 30.0,
+        "max_detection_latency_s": 2.0,
+        "max_heating_rate_c_per_s": 1.0,
+        "enable_predictive_throttling": False,
+        "predictive_window_s": 10.0,
+        "predictive_horizon_s": 5.0,
+        "predictive_min_confidence": 0.8,
+        "predictive_cool_down_time_s": 1.0,
+        "throttle_selection": "all",
+        "selective_shed_fraction": 0.6,
+        "throttle_never_suspend": [],
+        "throttle_always_suspend": [],
+        "enable_multi_gpu": True,
+        "gpu_bus_map": {},
+        "enable_telemetry": True,
+        "telemetry_retention_h": 24.0,
+        "telemetry_interval_s": 1.0,
+        "enable_metrics": False,
+        "metrics_port": 9877,
+        "metrics_bind_address": "127.0.0.1",
+        "enable_tracing": False,
+        "trace_slow_reaction_s": 2.0,
+        "enable_event_log": False,
+        "control_address": "",
+        "sensor_source": "lhm",
+        "hwmon_sensor_path": "",
+        "replay_trace_path": "",
         "lhm_port": 8085,
+        "lhm_sha256": "",
+        "lhm_offline_package": "",
+        "gpu_process_cache_ttl_s": 5.0,
+        "process_freezer": "auto",
+        "tray_show_temperature": False,
         "enable_notifications": True,
         "enable_audio_alert": True,
         "enable_autostart": False
     }
 
+    RELOAD_CHECK_INTERVAL_S = 1.0  # Minimum time between mtime checks of settings.json
+
     def __init__(self, project_root: Path):
         self.project_root = project_root
         self.filename = project_root / "settings.json"
         self.data = self.DEFAULT_SETTINGS.copy()
+        self._lock = threading.RLock()
+        self._version = 0
+        self._snapshot = None
+        self._file_stamp = None  # (mtime, size) of settings.json as last read or written
+        self._last_reload_check = 0.0
         self._load()
         # Refresh autostart path on every init if enabled
         if self.get("enable_autostart"):
@@ -32,16 +108,34 @@ class Settings:
             self._save()
             return
         try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                self.data.update(json.load(f))
+            self.data.update(self._read_file())
         except Exception as e:
             logger.error(f"Settings load error: {e}. Resetting to defaults.")
             self._save()
 
+    def _stat(self):
+        stat = self.filename.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_file(self) -> dict:
+        stamp = self._stat()
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        if not isinstance(loaded, dict):
+            raise ValueError("settings.json must contain an object")
+        self._file_stamp = stamp
+        return loaded
+
     def _save(self):
+        """Writes settings.json atomically: readers see the old or the new file, never a partial one."""
+        tmp_path = self.filename.with_name(self.filename.name + ".tmp")
         try:
-            with open(self.filename, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(self.data, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.filename)
+            self._file_stamp = self._stat()
         except Exception as e:
             logger.error(f"Settings save error: {e}")
 
@@ -49,12 +143,84 @@ class Settings:
         return self.data.get(key, self.DEFAULT_SETTINGS.get(key))
 
     def set(self, key: str, value):
-        self.data[key] = value
-        self._save()
-        
+        self.update({key: value})
+
+    def update(self, values: dict):
+        """
+        Applies several changes with a single write of settings.json.
+        """
+        with self._lock:
+            changed = {k: v for k, v in values.items() if self.data.get(k) != v}
+            if not changed:
+                return
+            # Copy-on-write so concurrent get() calls see either the old or the new dict
+            self.data = {**self.data, **changed}
+            self._version += 1
+            self._save()
+
         # Special handling for autostart toggle
-        if key == "enable_autostart":
-            self.set_autostart(value)
+        if "enable_autostart" in changed:
+            self.set_autostart(changed["enable_autostart"])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Collects changes and commits them in one write when the block exits
+        without an exception:
+
+            with settings.transaction() as tx:
+                tx["vram_t1_threshold"] = 90
+                tx["cool_down_time_s"] = 4.0
+        """
+        pending = {}
+        yield pending
+        self.update(pending)
+
+    def snapshot(self) -> SettingsSnapshot:
+        """Immutable view of the current settings (rebuilt only after a change)."""
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self._version:
+                self._snapshot = SettingsSnapshot(self.data, self._version)
+            return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        Picks up external edits of settings.json. Cheap enough to call every
+        cycle: the file is only stat()-ed once per RELOAD_CHECK_INTERVAL_S and
+        only parsed when its mtime or size changed. A file that does not parse
+        (e.g. still being written by an editor) is ignored until it changes again.
+        :return: True if new settings were loaded.
+        """
+        now = time.monotonic()
+        if now - self._last_reload_check < self.RELOAD_CHECK_INTERVAL_S:
+            return False
+        self._last_reload_check = now
+
+        with self._lock:
+            try:
+                stamp = self._stat()
+            except OSError:
+                return False
+            if stamp == self._file_stamp:
+                return False
+            try:
+                loaded = self._read_file()
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable settings.json: {e}")
+                self._file_stamp = stamp
+                return False
+
+            data = {**self.DEFAULT_SETTINGS, **loaded}
+            changed = {k: v for k, v in data.items() if self.data.get(k) != v}
+            if not changed:
+                return False
+            self.data = data
+            self._version += 1
+        logger.info(f"Settings reloaded from disk: {', '.join(sorted(changed))}")
+
+        if "enable_autostart" in changed:
+            self.set_autostart(changed["enable_autostart"])
+        return True
 
     def set_autostart(self, enabled: bool):
         """Manages Windows Registry for autostart."""
@@ -62,6 +228,9 @@ class Settings:
         app_name = "VRAMGuard"
         # Path to the launcher bat
         launcher_path = str(self.project_root / "Start_Protection.bat")
+        if winreg is None:
+            logger.warning("Autostart is only supported on Windows.")
+            return
         
         try:
             key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path, 0, winreg.KEY_SET_VALUE)
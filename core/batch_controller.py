@@ -0,0 +1,81 @@
+import logging
+import os
+import time
+import psutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from core.metrics import FAST_LATENCY_BUCKETS, Histogram
+from core.process_freezer import ProcessFreezer, SignalFreezer
+
+logger = logging.getLogger(__name__)
+
+
+class BatchProcessController:
+    """
+    Suspends or resumes a batch of processes with as little skew as possible,
+    so every GPU client is frozen (or released) at nearly the same moment.
+
+    On POSIX a ProcessFreezer does the work (by default SIGSTOP/SIGCONT sent
+    back to back, descendants included; see core.process_freezer). Elsewhere
+    (Windows) the per-process calls run concurrently on a thread pool.
+    """
+
+    def __init__(self, max_workers: int = 8, freezer: Optional[ProcessFreezer] = None):
+        """
+        :param freezer: POSIX backend (SignalFreezer if omitted).
+        """
+        self.max_workers = max_workers
+        self.freezer = freezer if freezer is not None or os.name != 'posix' else SignalFreezer()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+        # Metrics of the last batch
+        self.last_spread_s: Optional[float] = None  # First to last completed operation
+        self.last_duration_s: Optional[float] = None
+        self.last_batch_size = 0
+        self.latency = {'suspend': Histogram(FAST_LATENCY_BUCKETS), 'resume': Histogram(FAST_LATENCY_BUCKETS)}
+
+    def run(self, action: str, processes: List[psutil.Process]) -> List[Optional[Exception]]:
+        """
+        :param action: 'suspend' or 'resume'.
+        :return: One entry per process: None on success, otherwise the exception raised.
+        """
+        if not processes:
+            return []
+
+        started = time.perf_counter()
+        if self.freezer is not None:
+            results, finished = self.freezer.run(action, processes)
+        else:
+            results, finished = self._run_pool(action, processes)
+
+        done = [t for t in finished if t is not None]
+        self.last_spread_s = max(done) - min(done) if done else None
+        self.last_duration_s = time.perf_counter() - started
+        self.last_batch_size = len(processes)
+        self.latency[action].observe(self.last_duration_s)
+        return results
+
+    def _run_pool(self, action: str, processes: List[psutil.Process]):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="BatchControl")
+
+        def control(process: psutil.Process) -> Tuple[Optional[Exception], Optional[float]]:
+            try:
+                if action == 'suspend':
+                    process.suspend()
+                else:
+                    process.resume()
+                return None, time.perf_counter()
+            except Exception as e:
+                return e, None
+
+        outcomes = list(self._pool.map(control, processes))
+        return [error for error, _ in outcomes], [t for _, t in outcomes]
+
+    def shutdown(self):
+        if self.freezer is not None:
+            self.freezer.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
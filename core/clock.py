@@ -0,0 +1,43 @@
+import time
+
+
+class Clock:
+    """
+    Monotonic time source used by the core loop and the sensor sampler.
+    Timeouts are expressed in clock seconds and converted with to_real()
+    before blocking.
+    """
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Wall-clock timestamp (seconds since the epoch) for persisted records."""
+        return time.time()
+
+    def to_real(self, seconds: float) -> float:
+        """Converts a clock duration into wall-clock seconds to block for."""
+        return seconds
+
+    def sleep(self, seconds: float):
+        time.sleep(self.to_real(seconds))
+
+
+class ScaledClock(Clock):
+    """
+    Clock that runs `scale` times faster than real time (used by the simulation harness).
+    """
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self._origin = time.monotonic()
+        self._wall_origin = time.time()
+
+    def monotonic(self) -> float:
+        return self._origin + (time.monotonic() - self._origin) * self.scale
+
+    def time(self) -> float:
+        return self._wall_origin + (time.monotonic() - self._origin) * self.scale
+
+    def to_real(self, seconds: float) -> float:
+        return seconds / self.scale
@@ -0,0 +1,248 @@
+"""
+Local control socket for headless mode.
+
+Clients connect through multiprocessing.connection (a Unix socket on POSIX,
+a named pipe on Windows) and exchange JSON objects, one per message:
+
+    {"cmd": "status"}
+    {"cmd": "pause"} / {"cmd": "resume"}
+    {"cmd": "set", "values": {"vram_t1_threshold": 88}}
+    {"cmd": "stream"}  -> one {"gpu", "t", "temp", "state"} message per new reading until the client disconnects
+
+Every reply has "ok"; failures carry "error".
+
+Usage: python -m core.control status | pause | resume | set key=value ... | stream
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+PIPE_ADDRESS = r"\\.\pipe\vram_guard"
+SOCKET_NAME = "vram_guard.sock"
+
+
+def default_address(project_root: Path) -> str:
+    return PIPE_ADDRESS if os.name == 'nt' else str(project_root / SOCKET_NAME)
+
+
+class ControlServer:
+    """
+    Serves control requests on its own thread, one thread per client.
+    Requests run against the live core and settings objects.
+    """
+
+    STREAM_POLL_S = 0.5  # Multi-GPU streams check every core at this interval
+    # Settings with a fixed set of values; the rest of the code treats anything else as the default
+    CHOICES = {
+        "throttle_mode": ("pulse", "pi"),
+        "throttle_selection": ("all", "selective"),
+        "process_freezer": ("auto", "cgroup", "signals"),
+        "sensor_source": ("lhm", "hwmon", "replay"),
+    }
+
+    def __init__(self, core, settings, address: str):
+        self.core = core
+        self.settings = settings
+        self.address = address
+        if os.name != 'nt' and os.path.exists(address):
+            os.unlink(address)  # Left over from a crashed instance
+        self._listener = Listener(address)
+        if os.name != 'nt':
+            os.chmod(address, 0o600)  # Only the owner may control the guard
+        self._process = psutil.Process()
+        self._thread = threading.Thread(target=self._accept_loop, name="ControlServer", daemon=True)
+
+    def start(self) -> "ControlServer":
+        self._thread.start()
+        logger.info(f"Control socket listening on {self.address}")
+        return self
+
+    def stop(self):
+        self._listener.close()
+        if os.name != 'nt' and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return  # Listener closed
+            except Exception as e:
+                logger.warning(f"Control connection rejected: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), name="ControlClient", daemon=True).start()
+
+    def _serve(self, conn: Connection):
+        with conn:
+            while True:
+                try:
+                    request = json.loads(conn.recv_bytes(64 * 1024))
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    self._send(conn, {"ok": False, "error": "invalid JSON"})
+                    continue
+
+                command = request.get("cmd") if isinstance(request, dict) else None
+                try:
+                    if command == "stream":
+                        self._stream(conn)
+                        return
+                    handler = getattr(self, f"_cmd_{command}", None) if isinstance(command, str) else None
+                    reply = handler(request) if handler else {"ok": False, "error": f"unknown command {command!r}"}
+                except (EOFError, OSError):
+                    return
+                except Exception as e:
+                    logger.error(f"Control command {command!r} failed: {e}")
+                    reply = {"ok": False, "error": str(e)}
+                if not self._send(conn, reply):
+                    return
+
+    @staticmethod
+    def _send(conn: Connection, message: dict) -> bool:
+        try:
+            conn.send_bytes(json.dumps(message).encode("utf-8"))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def _cores(self):
+        # A MultiGpuGuard has no cores until its GPUs are discovered
+        return list(self.core.cores) if hasattr(self.core, "cores") else [self.core]
+
+    def _cmd_status(self, request: dict) -> dict:
+        memory = self._process.memory_info()
+        switches = self._process.num_ctx_switches()
+        return {
+            "ok": True,
+            "paused": self.core.paused,
+            "state": self.core.state.value,
+            "temp": self.core.current_temp,
+            "gpus": [{"label": g.label, "temp": g.temp, "state": g.state.value} for g in self.core.gpu_states],
+            "suspended": sum(len(c.throttler.registry.suspended) for c in self._cores()),
+            "t1": self.settings.get('vram_t1_threshold'),
+            "t2": self.settings.get('vram_t2_panic_threshold'),
+            "rss_mib": round(memory.rss / 2**20, 1),
+            "threads": self._process.num_threads(),
+            "ctx_switches": switches.voluntary + switches.involuntary,
+        }
+
+    def _cmd_pause(self, request: dict) -> dict:
+        self.core.paused = True
+        logger.warning("Protection paused via control socket.")
+        return {"ok": True, "paused": True}
+
+    def _cmd_resume(self, request: dict) -> dict:
+        self.core.paused = False
+        logger.info("Protection resumed via control socket.")
+        return {"ok": True, "paused": False}
+
+    def _cmd_set(self, request: dict) -> dict:
+        values = request.get("values")
+        if not isinstance(values, dict) or not values:
+            return {"ok": False, "error": "'values' must be a non-empty object"}
+        unknown = [key for key in values if key not in self.settings.DEFAULT_SETTINGS]
+        if unknown:
+            return {"ok": False, "error": f"unknown settings: {', '.join(sorted(unknown))}"}
+        # Values must keep the type of their defaults (ints are accepted for floats)
+        for key, value in values.items():
+            default = self.settings.DEFAULT_SETTINGS[key]
+            expected = (int, float) if type(default) is float else type(default)
+            if not isinstance(value, expected) or (isinstance(value, bool) and type(default) is not bool):
+                return {"ok": False, "error": f"{key} must be of type {type(default).__name__}"}
+        error = self._check_values(values)
+        if error:
+            return {"ok": False, "error": error}
+        self.settings.update(values)
+        logger.info(f"Settings changed via control socket: {values}")
+        return {"ok": True, "values": {key: self.settings.get(key) for key in values}}
+
+    def _check_values(self, values: dict) -> str:
+        """Reason why values must not be applied on top of the current settings, or "" if they may."""
+        for key, value in values.items():
+            if key in self.CHOICES and value not in self.CHOICES[key]:
+                return f"{key} must be one of {', '.join(self.CHOICES[key])}"
+            if key.endswith(("_s", "_h")) and value < 0:
+                return f"{key} must not be negative"
+        merged = {key: values.get(key, self.settings.get(key))
+                  for key in ("vram_t1_threshold", "vram_t2_panic_threshold")}
+        if merged["vram_t1_threshold"] >= merged["vram_t2_panic_threshold"]:
+            return (f"vram_t1_threshold ({merged['vram_t1_threshold']}) must be below "
+                    f"vram_t2_panic_threshold ({merged['vram_t2_panic_threshold']})")
+        return ""
+
+    def _stream(self, conn: Connection):
+        """Sends every new reading of every GPU until the client goes away."""
+        cores = self._cores()
+        if not cores:
+            self._send(conn, {"ok": False, "error": "GPUs not discovered yet"})
+            return
+        last = [core.samples.seq for core in cores]
+        while True:
+            if len(cores) == 1:
+                cores[0].samples.wait_for_new(last[0], timeout=5.0)
+            else:
+                time.sleep(self.STREAM_POLL_S)
+            for i, core in enumerate(cores):
+                sample = core.samples.latest()
+                if sample is None or sample.seq == last[i]:
+                    continue
+                last[i] = sample.seq
+                message = {"gpu": core.label or "GPU0", "t": time.time(), "temp": sample.value,
+                           "state": core.state.value}
+                if not self._send(conn, message):
+                    return
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control a headless VRAM Guard.")
+    parser.add_argument("command", choices=["status", "pause", "resume", "set", "stream"])
+    parser.add_argument("values", nargs="*", help="key=value pairs for 'set' (values are JSON)")
+    parser.add_argument("--address", help="Socket path or pipe name (default: next to vram_guard.py)")
+    args = parser.parse_args()
+
+    address = args.address or default_address(Path(__file__).resolve().parent.parent)
+    request = {"cmd": args.command}
+    if args.command == "set":
+        try:
+            request["values"] = {k: _parse_value(v) for k, v in (item.split("=", 1) for item in args.values)}
+        except ValueError:
+            parser.error("set expects key=value pairs")
+
+    try:
+        conn = Client(address)
+    except (OSError, EOFError) as e:
+        print(f"Cannot connect to {address}: {e}", file=sys.stderr)
+        sys.exit(1)
+    with conn:
+        conn.send_bytes(json.dumps(request).encode("utf-8"))
+        try:
+            while True:
+                reply = json.loads(conn.recv_bytes())
+                print(json.dumps(reply, indent=None if args.command == "stream" else 2), flush=True)
+                if args.command != "stream":
+                    sys.exit(0 if reply.get("ok") else 1)
+        except (EOFError, KeyboardInterrupt):
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PIDutyCycleController:
+    """
+    PI controller that turns the distance to a temperature setpoint into a
+    duty cycle: the fraction of each throttle period GPU processes may run.
+
+    Anti-windup: an integration step is discarded while the output is
+    saturated and the error would push it further into saturation, and the
+    integral itself is clamped to the output range.
+    """
+
+    def __init__(self, kp: float, ki: float, min_duty: float, max_duty: float, initial_duty: float):
+        """
+        :param kp: Duty change per °C of headroom.
+        :param ki: Duty change per °C·s of accumulated headroom.
+        :param initial_duty: Starting point of the integral term (bumpless engagement).
+        """
+        self.kp = kp
+        self.ki = ki
+        self.min_duty = min_duty
+        self.max_duty = max_duty
+        self.integral = self._clamp(initial_duty)
+        self.duty = self.integral
+        self._last_time: Optional[float] = None
+
+    def _clamp(self, value: float) -> float:
+        return min(self.max_duty, max(self.min_duty, value))
+
+    @property
+    def is_saturated_high(self) -> bool:
+        return self.duty >= self.max_duty
+
+    def update(self, temp: float, setpoint: float, now: float) -> float:
+        """
+        :return: New duty cycle in [min_duty, max_duty].
+        """
+        error = setpoint - temp  # Positive: headroom left, allow more work
+        dt = 0.0 if self._last_time is None else max(0.0, now - self._last_time)
+        self._last_time = now
+
+        integral = self.integral + self.ki * error * dt
+        raw = integral + self.kp * error
+        duty = self._clamp(raw)
+
+        winding_up = (raw > self.max_duty and error > 0) or (raw < self.min_duty and error < 0)
+        if not winding_up:
+            self.integral = self._clamp(integral)
+
+        self.duty = duty
+        return duty
@@ -0,0 +1,61 @@
+"""
+Optional machine-readable event stream, one JSON object per line:
+
+    {"ts": 1760000000.123, "event": "throttle_start", "gpu": "GPU0", "temp": 93.0, ...}
+
+Events: throttle_start / throttle_stop (a throttle cycle begins or ends),
+panic_start / panic_kill / panic_abort, and sensor_link_up / sensor_link_down.
+Records are written by a background thread, so emitting never blocks on disk.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("vram_guard.events")
+logger.propagate = False  # Never mixed into the free-text log
+logger.setLevel(logging.INFO)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({"ts": round(record.created, 3), "event": record.getMessage(),
+                           **getattr(record, "fields", {})})
+
+
+def emit(event: str, **fields):
+    """Records an event. Costs one attribute check while the stream is disabled."""
+    if logger.handlers:
+        logger.info(event, extra={"fields": fields})
+
+
+def start(path: Path, max_bytes: int = 5 * 1024 * 1024):
+    """Starts writing events to path (rotated at max_bytes, one backup)."""
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=1, encoding='utf-8')
+    handler.setFormatter(JsonLinesFormatter())
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    atexit.register(stop)
+
+
+def stop():
+    """Flushes pending events and closes the file."""
+    global _listener
+    if _listener is None:
+        return
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -0,0 +1,282 @@
+"""
+Watches the LHM web servers of many machines from one process.
+
+Every host is polled by its own asyncio task over one persistent HTTP/1.1
+connection. Slow hosts time out, failing hosts back off exponentially, and
+all hosts feed a single stream of readings and alerts. The VRAM sensor is
+found with the same matching and path caching as LHMClient, one
+VramSensorMatcher per host.
+
+Usage: python -m core.fleet_monitor hosts.txt [--interval 2] [--timeout 2]
+       (hosts.txt: one host[:port] per line, default port 8085; '#' starts a comment)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple, Union
+
+from core.lhm_sensors import VramSensorMatcher
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8085
+
+
+class HostReading(NamedTuple):
+    host: str
+    timestamp: float  # Seconds since the epoch
+    temp: Optional[float]  # None if the host has no VRAM sensor
+    sensor: str
+    latency_s: float
+
+
+class HostAlert(NamedTuple):
+    host: str
+    timestamp: float
+    level: str  # "ok", "warning" (>= T1), "critical" (>= T2) or "down"
+    message: str
+
+
+class _KeepAliveConnection:
+    """
+    A single persistent HTTP/1.1 connection to one host. It is reopened on
+    the next request after an error or when the server closes it.
+    """
+
+    def __init__(self, host: str, port: int, path: str = "/data.json"):
+        self.host = host
+        self.port = port
+        self._request = (f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                         f"Accept: application/json\r\nConnection: keep-alive\r\n\r\n").encode("ascii")
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self.opened = 0  # Connections opened so far
+
+    async def get(self) -> bytes:
+        if self._writer is None or self._writer.is_closing():
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+        self._writer.write(self._request)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        version, status = status_line.split(None, 2)[:2]
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip().lower()
+
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection") != "close"
+        if "content-length" in headers:
+            body = await self._reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding") == "chunked":
+            body = await self._read_chunked()
+        else:
+            body = await self._reader.read()  # Delimited by the server closing the connection
+            keep_alive = False
+
+        if not keep_alive:
+            self.close()
+        if status != b"200":
+            raise ConnectionError(f"HTTP {status.decode('ascii', 'replace')}")
+        return body
+
+    async def _read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int((await self._reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await self._reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # Trailer
+                return b"".join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)  # CRLF after the chunk
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+class _Host:
+    def __init__(self, name: str, host: str, port: int):
+        self.name = name
+        self.connection = _KeepAliveConnection(host, port)
+        self.sensor = VramSensorMatcher()
+        self.failures = 0
+        self.level: Optional[str] = None
+
+
+def parse_host(text: str) -> Tuple[str, int]:
+    """"host:port" or "host" (default LHM port) -> (host, port)."""
+    host, separator, port = text.strip().rpartition(":")
+    if not separator:
+        return text.strip(), DEFAULT_PORT
+    return host, int(port)
+
+
+class FleetMonitor:
+    """
+    Polls data.json on many hosts concurrently and publishes HostReading and
+    HostAlert events. Alerts are only raised when a host changes level.
+    """
+
+    DOWN_AFTER_FAILURES = 3
+    QUEUE_SIZE = 10000
+
+    def __init__(self, hosts: List[str], interval_s: float = 2.0, timeout_s: float = 2.0,
+                 max_backoff_s: float = 60.0, t1: float = 92.0, t2: float = 105.0, max_concurrency: int = 64):
+        """
+        :param hosts: "host" or "host:port" entries.
+        :param timeout_s: Per request, including connecting.
+        :param max_backoff_s: Longest delay between attempts on a failing host.
+        :param max_concurrency: Requests in flight at once.
+        """
+        self.hosts = [_Host(entry, *parse_host(entry)) for entry in hosts]
+        self.interval_s = interval_s
+        self.timeout_s = timeout_s
+        self.max_backoff_s = max_backoff_s
+        self.t1 = t1
+        self.t2 = t2
+        self.max_concurrency = max_concurrency
+
+        self.polls = 0
+        self.errors = 0
+        self.dropped = 0  # Readings discarded because the consumer fell behind
+        self.latency = Histogram()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    @property
+    def connections_opened(self) -> int:
+        return sum(host.connection.opened for host in self.hosts)
+
+    def start(self):
+        """Starts one polling task per host on the running event loop."""
+        self._queue = asyncio.Queue(self.QUEUE_SIZE)
+        self._stopping = False
+        limit = asyncio.Semaphore(self.max_concurrency)
+        self._tasks = [asyncio.ensure_future(self._watch(host, limit)) for host in self.hosts]
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for host in self.hosts:
+            host.connection.close()
+
+    async def events(self) -> AsyncIterator[Union[HostReading, HostAlert]]:
+        if self._queue is None:
+            self.start()
+        while True:
+            yield await self._queue.get()
+
+    def _level(self, temp: Optional[float]) -> str:
+        if temp is None or temp < self.t1:
+            return "ok"
+        return "critical" if temp >= self.t2 else "warning"
+
+    async def _alert(self, host: _Host, level: str, message: str):
+        if level == host.level:
+            return
+        first = host.level is None
+        host.level = level
+        if first and level == "ok":
+            return  # Nothing to report for a healthy host coming online
+        await self._queue.put(HostAlert(host.name, time.time(), level, message))
+
+    async def _watch(self, host: _Host, limit: asyncio.Semaphore):
+        await asyncio.sleep(random.uniform(0, self.interval_s))  # Spread the hosts over the interval
+        while True:
+            started = time.perf_counter()
+            try:
+                async with limit:
+                    body = await asyncio.wait_for(host.connection.get(), self.timeout_s)
+                if self._stopping:
+                    # wait_for() returns the request's result instead of the cancellation
+                    # when both happen at once; the task must end anyway
+                    raise asyncio.CancelledError()
+                temp, sensor = host.sensor.lookup(json.loads(body))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._stopping:
+                    raise asyncio.CancelledError() from e  # The request's error hid the cancellation (see above)
+                host.connection.close()
+                host.failures += 1
+                self.errors += 1
+                if host.failures >= self.DOWN_AFTER_FAILURES:
+                    await self._alert(host, "down", f"{host.failures} failed polls: {e or type(e).__name__}")
+                delay = min(self.interval_s * 2 ** host.failures, self.max_backoff_s)
+                await asyncio.sleep(delay * random.uniform(0.9, 1.1))
+                continue
+
+            latency = time.perf_counter() - started
+            self.polls += 1
+            self.latency.observe(latency)
+            host.failures = 0
+            try:
+                self._queue.put_nowait(HostReading(host.name, time.time(), temp, sensor, latency))
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+            level = self._level(temp)
+            if level == "ok":
+                message = "recovered" if host.level == "down" else f"VRAM {temp}°C"
+            else:
+                message = f"VRAM {temp}°C >= {self.t2 if level == 'critical' else self.t1}°C"
+            await self._alert(host, level, message)
+            await asyncio.sleep(max(0.0, self.interval_s - latency))
+
+
+def _load_hosts(path: Path) -> List[str]:
+    hosts = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            hosts.append(line)
+    return hosts
+
+
+async def _print_events(monitor: FleetMonitor, alerts_only: bool):
+    async for event in monitor.events():
+        if alerts_only and isinstance(event, HostReading):
+            continue
+        record = {"type": "alert" if isinstance(event, HostAlert) else "reading", **event._asdict()}
+        print(json.dumps(record), flush=True)
+
+
+def main():
+    from config.settings import Settings
+
+    parser = argparse.ArgumentParser(description="Watch the VRAM temperature of many LHM hosts.")
+    parser.add_argument("hosts", help="File with one host[:port] per line")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls of a host")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Per-request timeout in seconds")
+    parser.add_argument("--t1", type=float, default=Settings.DEFAULT_SETTINGS['vram_t1_threshold'])
+    parser.add_argument("--t2", type=float, default=Settings.DEFAULT_SETTINGS['vram_t2_panic_threshold'])
+    parser.add_argument("--alerts-only", action="store_true", help="Print alerts but not readings")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    monitor = FleetMonitor(_load_hosts(Path(args.hosts)), args.interval, args.timeout, t1=args.t1, t2=args.t2)
+    try:
+        asyncio.run(_print_events(monitor, args.alerts_only))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
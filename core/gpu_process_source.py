@@ -0,0 +1,328 @@
+import ctypes
+import logging
+import os
+import subprocess
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class GpuProcess(NamedTuple):
+    pid: int
+    gpu_bus_id: str
+    used_memory_mib: Optional[float] = None
+    sm_util: Optional[float] = None  # % of streaming multiprocessor time (NVML only)
+    mem_util: Optional[float] = None  # % of memory controller time (NVML only)
+
+
+class GpuProcessSource:
+    """
+    Discovers processes that currently hold a context on an NVIDIA GPU.
+    Results are cached for ttl_s so back-to-back throttle cycles reuse them.
+    """
+
+    name = "base"
+
+    def __init__(self, ttl_s: float = 0.0):
+        self.ttl_s = ttl_s
+        self._cache: Optional[List[GpuProcess]] = None
+        self._cache_time = 0.0
+        self._lock = threading.Lock()
+        self.query_latency = Histogram()
+
+    def list_processes(self) -> List[GpuProcess]:
+        with self._lock:
+            now = time.monotonic()
+            if self._cache is not None and now - self._cache_time < self.ttl_s:
+                return self._cache
+
+            started = time.perf_counter()
+            processes = self._query()
+            self.query_latency.observe(time.perf_counter() - started)
+            if processes is None:
+                # Failed queries are not cached so the next call retries
+                return []
+            self._cache = processes
+            self._cache_time = now
+            return processes
+
+    def invalidate(self):
+        """Drops cached results (e.g. after processes were killed)."""
+        with self._lock:
+            self._cache = None
+
+    def close(self):
+        pass
+
+    def list_gpus(self) -> List[str]:
+        """
+        PCI bus IDs of the NVIDIA GPUs in the system (empty if unknown).
+        """
+        return []
+
+    def _query(self) -> Optional[List[GpuProcess]]:
+        """
+        Backend-specific query.
+        :return: List of processes, or None if the query failed.
+        """
+        raise NotImplementedError
+
+
+class NvidiaSmiProcessSource(GpuProcessSource):
+    """
+    Spawns nvidia-smi and parses its CSV output. Slow (one process per query)
+    but works with any driver that ships nvidia-smi.
+    """
+
+    name = "nvidia-smi"
+
+    def _query(self) -> Optional[List[GpuProcess]]:
+        processes = []
+        try:
+            # Command to query PIDs and memory usage
+            cmd = ["nvidia-smi", "--query-compute-apps=pid,gpu_bus_id,used_memory", "--format=csv,noheader,nounits"]
+
+            # Use a short timeout to prevent hanging if the GPU is asleep/unresponsive
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
+
+            for line in result.stdout.strip().split('\n'):
+                if line.strip():
+                    try:
+                        # Format is typically: pid, gpu_bus_id, used_memory
+                        fields = [f.strip() for f in line.split(',')]
+                        used_memory = float(fields[2]) if len(fields) > 2 and fields[2].isdigit() else None
+                        processes.append(GpuProcess(int(fields[0]), fields[1] if len(fields) > 1 else "", used_memory))
+                    except ValueError:
+                        continue
+            return processes
+
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"nvidia-smi failed (Code {e.returncode}). Is NVIDIA driver installed? Output: {e.stderr.strip()}")
+        except FileNotFoundError:
+            logger.critical("nvidia-smi not found. Ensure it is in PATH.")
+        except subprocess.TimeoutExpired:
+            logger.error("nvidia-smi timed out. GPU might be unresponsive.")
+        except Exception as e:
+            logger.error(f"Error during PID detection: {e}")
+        return None
+
+    def list_gpus(self) -> List[str]:
+        try:
+            cmd = ["nvidia-smi", "--query-gpu=pci.bus_id", "--format=csv,noheader"]
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
+            return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        except Exception as e:
+            logger.error(f"nvidia-smi GPU query failed: {e}")
+            return []
+
+
+class NvmlError(Exception):
+    pass
+
+
+class _NvmlPciInfo(ctypes.Structure):
+    _fields_ = [
+        ("busIdLegacy", ctypes.c_char * 16),
+        ("domain", ctypes.c_uint),
+        ("bus", ctypes.c_uint),
+        ("device", ctypes.c_uint),
+        ("pciDeviceId", ctypes.c_uint),
+        ("pciSubSystemId", ctypes.c_uint),
+        ("busId", ctypes.c_char * 32),
+    ]
+
+
+class _NvmlProcessInfo(ctypes.Structure):
+    # nvmlProcessInfo_t as used by the _v2/_v3 process queries
+    _fields_ = [
+        ("pid", ctypes.c_uint),
+        ("usedGpuMemory", ctypes.c_ulonglong),
+        ("gpuInstanceId", ctypes.c_uint),
+        ("computeInstanceId", ctypes.c_uint),
+    ]
+
+
+class _NvmlProcessInfoV1(ctypes.Structure):
+    _fields_ = [
+        ("pid", ctypes.c_uint),
+        ("usedGpuMemory", ctypes.c_ulonglong),
+    ]
+
+
+class _NvmlProcessUtilizationSample(ctypes.Structure):
+    _fields_ = [
+        ("pid", ctypes.c_uint),
+        ("timeStamp", ctypes.c_ulonglong),
+        ("smUtil", ctypes.c_uint),
+        ("memUtil", ctypes.c_uint),
+        ("encUtil", ctypes.c_uint),
+        ("decUtil", ctypes.c_uint),
+    ]
+
+
+class NvmlProcessSource(GpuProcessSource):
+    """
+    Queries the NVIDIA Management Library in-process through ctypes.
+    The library is initialized once and device handles are kept for the
+    lifetime of the source, so a query costs a few driver calls instead
+    of a process spawn.
+    """
+
+    name = "nvml"
+
+    NVML_SUCCESS = 0
+    NVML_ERROR_NOT_FOUND = 6
+    NVML_ERROR_INSUFFICIENT_SIZE = 7
+    NVML_VALUE_NOT_AVAILABLE = 0xFFFFFFFFFFFFFFFF
+    MAX_PROCESSES = 64  # Initial buffer size, grown on demand
+
+    def __init__(self, ttl_s: float = 0.0):
+        super().__init__(ttl_s)
+        self._nvml = self._load_library()
+        self._check(self._nvml.nvmlInit_v2(), "nvmlInit_v2")
+
+        count = ctypes.c_uint()
+        self._check(self._nvml.nvmlDeviceGetCount_v2(ctypes.byref(count)), "nvmlDeviceGetCount_v2")
+        self._devices = []
+        for index in range(count.value):
+            handle = ctypes.c_void_p()
+            self._check(self._nvml.nvmlDeviceGetHandleByIndex_v2(index, ctypes.byref(handle)), "nvmlDeviceGetHandleByIndex_v2")
+            pci = _NvmlPciInfo()
+            self._check(self._nvml.nvmlDeviceGetPciInfo_v3(handle, ctypes.byref(pci)), "nvmlDeviceGetPciInfo_v3")
+            self._devices.append((handle, pci.busId.decode()))
+        # Per-device timestamp of the newest utilization sample already seen
+        self._last_util_timestamp = [0] * len(self._devices)
+
+        # Newer drivers export _v3 with the 4-field struct, old ones only the v1 call
+        try:
+            self._get_processes = self._nvml.nvmlDeviceGetComputeRunningProcesses_v3
+            self._process_struct = _NvmlProcessInfo
+        except AttributeError:
+            self._get_processes = self._nvml.nvmlDeviceGetComputeRunningProcesses
+            self._process_struct = _NvmlProcessInfoV1
+
+        logger.info(f"NVML initialized ({len(self._devices)} GPU(s)).")
+
+    def _load_library(self):
+        if os.name == 'nt':
+            candidates = [
+                "nvml.dll",
+                os.path.join(os.environ.get("ProgramFiles", r"C:\Program Files"), "NVIDIA Corporation", "NVSMI", "nvml.dll"),
+            ]
+        else:
+            candidates = ["libnvidia-ml.so.1", "libnvidia-ml.so"]
+
+        for candidate in candidates:
+            try:
+                return ctypes.CDLL(candidate)
+            except OSError:
+                continue
+        raise NvmlError("NVML library not found")
+
+    def _check(self, code: int, func: str):
+        if code != self.NVML_SUCCESS:
+            raise NvmlError(f"{func} failed with code {code}")
+
+    def _device_processes(self, handle) -> list:
+        capacity = self.MAX_PROCESSES
+        while True:
+            count = ctypes.c_uint(capacity)
+            infos = (self._process_struct * capacity)()
+            code = self._get_processes(handle, ctypes.byref(count), infos)
+            if code == self.NVML_ERROR_INSUFFICIENT_SIZE:
+                capacity = count.value + 8  # Processes may appear between the two calls
+                continue
+            self._check(code, "nvmlDeviceGetComputeRunningProcesses")
+            return infos[:count.value]
+
+    def _device_utilization(self, index: int, handle) -> dict:
+        """
+        Per-process SM/memory-controller utilization since the previous query.
+        :return: {pid: (sm_util, mem_util)}; empty if the driver has no samples.
+        """
+        count = ctypes.c_uint(0)
+        last_seen = ctypes.c_ulonglong(self._last_util_timestamp[index])
+        code = self._nvml.nvmlDeviceGetProcessUtilization(handle, None, ctypes.byref(count), last_seen)
+        if code == self.NVML_ERROR_NOT_FOUND or count.value == 0:
+            return {}
+        if code not in (self.NVML_SUCCESS, self.NVML_ERROR_INSUFFICIENT_SIZE):
+            return {}
+
+        samples = (_NvmlProcessUtilizationSample * count.value)()
+        code = self._nvml.nvmlDeviceGetProcessUtilization(handle, samples, ctypes.byref(count), last_seen)
+        if code != self.NVML_SUCCESS:
+            return {}
+
+        utilization = {}
+        for sample in samples[:count.value]:
+            sm, mem = utilization.get(sample.pid, (0, 0))
+            utilization[sample.pid] = (max(sm, sample.smUtil), max(mem, sample.memUtil))
+            self._last_util_timestamp[index] = max(self._last_util_timestamp[index], sample.timeStamp)
+        return utilization
+
+    def _query(self) -> Optional[List[GpuProcess]]:
+        processes = []
+        try:
+            for index, (handle, bus_id) in enumerate(self._devices):
+                utilization = self._device_utilization(index, handle)
+                for info in self._device_processes(handle):
+                    used = info.usedGpuMemory
+                    used_mib = None if used == self.NVML_VALUE_NOT_AVAILABLE else used / (1024 * 1024)
+                    sm_util, mem_util = utilization.get(info.pid, (None, None))
+                    processes.append(GpuProcess(info.pid, bus_id, used_mib, sm_util, mem_util))
+            return processes
+        except Exception as e:
+            logger.error(f"NVML process query failed: {e}")
+            return None
+
+    def list_gpus(self) -> List[str]:
+        return [bus_id for _, bus_id in self._devices]
+
+    def close(self):
+        try:
+            self._nvml.nvmlShutdown()
+        except Exception:
+            pass
+
+
+class FakeGpuProcessSource(GpuProcessSource):
+    """
+    In-memory source for tests and simulations.
+    """
+
+    name = "fake"
+
+    def __init__(self, processes: Optional[List[GpuProcess]] = None, ttl_s: float = 0.0,
+                 gpu_bus_ids: Optional[List[str]] = None):
+        super().__init__(ttl_s)
+        self.processes: List[GpuProcess] = list(processes or [])
+        self.gpu_bus_ids = gpu_bus_ids
+        self.query_count = 0
+
+    def list_gpus(self) -> List[str]:
+        if self.gpu_bus_ids is not None:
+            return list(self.gpu_bus_ids)
+        return sorted({p.gpu_bus_id for p in self.processes})
+
+    def set_processes(self, processes: List[GpuProcess]):
+        self.processes = list(processes)
+        self.invalidate()
+
+    def _query(self) -> Optional[List[GpuProcess]]:
+        self.query_count += 1
+        return list(self.processes)
+
+
+def create_gpu_process_source(ttl_s: float = 0.0) -> GpuProcessSource:
+    """
+    Returns the NVML backend if the library can be loaded, otherwise nvidia-smi.
+    """
+    try:
+        return NvmlProcessSource(ttl_s)
+    except Exception as e:
+        logger.info(f"NVML unavailable ({e}). Falling back to nvidia-smi.")
+        return NvidiaSmiProcessSource(ttl_s)
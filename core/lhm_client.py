@@ -1,33 +1,138 @@
 import logging
+import psutil
 import requests
 import subprocess
 import time
 import socket
-import zipfile
-import io
-import os
 import re
+import json
+import threading
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
+
+from core.lhm_provisioner import LHM_SHA256, LHMProvisioner
+from core.lhm_sensors import VramSensorMatcher, find_all_sensors, read_node, select_sensor, unit_suffix
+from core.sensor_source import SensorSource, SensorsNotReadyError
+from core.tracing import traced
 
 logger = logging.getLogger(__name__)
 
-class LHMClient:
-    def __init__(self, project_root: Path):
+class LHMClient(SensorSource):
+    """
+    Reads sensors from the LibreHardwareMonitor web server (data.json),
+    starting or adopting an LHM instance as needed.
+    """
+
+    name = "LHM"
+    STREAM_CHUNK_SIZE = 16 * 1024  # Bytes read per step while streaming data.json
+    NVIDIA_GPU_PREFIX = "/gpu-nvidia/"  # LHM hardware ids of NVIDIA cards: /gpu-nvidia/<index>
+    GPU_SNAPSHOT_MAX_AGE_S = 0.5  # Per-GPU samplers polling within this window share one request
+    PROCESS_NAME = "LibreHardwareMonitor.exe"
+    PORT_RANGE = range(8085, 8095)
+    PROBE_TIMEOUT_S = 0.5  # Per request while checking whether the API answers
+    READY_TIMEOUT_S = 30.0  # Longest wait for a freshly started LHM to serve data.json
+    READY_BACKOFF_S = (0.05, 1.0)  # First and longest delay between readiness probes
+
+    def __init__(self, project_root: Path, package_sha256: Optional[str] = None,
+                 offline_package: Optional[Path] = None):
+        """
+        :param package_sha256: Expected SHA-256 of the LHM release zip (default: LHM_SHA256).
+        :param offline_package: Local copy of the release zip, used instead of downloading.
+        """
         self.project_root = project_root
         self.lhm_dir = self.project_root / "resources" / "LibreHardwareMonitor"
         self.lhm_exe = self.lhm_dir / "LibreHardwareMonitor.exe"
         self.lhm_config = self.lhm_dir / "LibreHardwareMonitor.config"
+        self.provisioner = LHMProvisioner(self.lhm_dir, self.project_root / "resources" / "cache",
+                                          sha256=package_sha256 or LHM_SHA256, offline_package=offline_package,
+                                          exe_name=self.lhm_exe.name)
         self.port: Optional[int] = None
         self.lhm_process: Optional[subprocess.Popen] = None
+        self.adopted_processes: List[psutil.Process] = []  # LHM that was already running at startup
         self.api_url: str = ""
+        self.ready_s: Optional[float] = None  # Time check_and_start() took to get a responsive API
+
+        self.sensor = VramSensorMatcher()  # Resolved VRAM sensor and its cached path
+
+        # Read only as much of data.json as needed to reach the cached sensor
+        self.stream_parsing = True
 
-    def _cleanup_old_instances(self):
+        # Resolved VRAM sensor of every NVIDIA GPU, keyed by LHM hardware id
+        self._gpu_sensors: Dict[str, dict] = {}
+        self._gpu_snapshot: Dict[str, Tuple[Optional[float], str]] = {}
+        self._gpu_snapshot_time: Optional[float] = None
+        self._gpu_lock = threading.Lock()
+        self._start_lock = threading.Lock()  # Several control loops may call check_and_start()
+
+    def _find_running_instances(self) -> List[psutil.Process]:
+        instances = []
+        for proc in psutil.process_iter(['name']):
+            if (proc.info['name'] or "").lower() == self.PROCESS_NAME.lower():
+                instances.append(proc)
+        return instances
+
+    def _configured_port(self) -> Optional[int]:
+        """Port written to LibreHardwareMonitor.config by a previous start."""
         try:
-            subprocess.run(["taskkill", "/F", "/IM", "LibreHardwareMonitor.exe", "/T"], 
-                           capture_output=True, check=False)
-            time.sleep(2)
-        except: pass
+            match = re.search(r'key="listenerPort"\s+value="(\d+)"', self.lhm_config.read_text(encoding="utf-8"))
+            return int(match.group(1)) if match else None
+        except (OSError, ValueError):
+            return None
+
+    def _probe(self, port: int) -> bool:
+        """True if data.json on the port is served by LHM."""
+        try:
+            response = requests.get(f"http://127.0.0.1:{port}/data.json", timeout=self.PROBE_TIMEOUT_S)
+            return response.status_code == 200 and "Children" in response.json()
+        except Exception:
+            return False
+
+    def _use_port(self, port: int):
+        self.port = port
+        self.api_url = f"http://127.0.0.1:{port}/data.json"
+        self.sensor.invalidate()
+        with self._gpu_lock:
+            self._gpu_sensors = {}
+            self._gpu_snapshot_time = None
+
+    def _adopt_running_instance(self, instances: List[psutil.Process]) -> bool:
+        """
+        Reuses an LHM that is already running with its web server enabled,
+        instead of killing it and paying for a cold start.
+        """
+        ports = list(self.PORT_RANGE)
+        configured = self._configured_port()
+        if configured is not None:
+            ports.insert(0, configured)
+
+        for port in dict.fromkeys(ports):
+            if self._probe(port):
+                self._use_port(port)
+                self.adopted_processes = instances
+                logger.info(f"Adopted running LHM instance on port {port}.")
+                return True
+        return False
+
+    def _cleanup_old_instances(self, instances: List[psutil.Process]):
+        for proc in instances:
+            try: proc.kill()
+            except psutil.Error: pass
+        # Wait until they are gone (and their port is released) rather than for a fixed time
+        psutil.wait_procs(instances, timeout=2)
+
+    def _wait_until_ready(self) -> bool:
+        """Polls the API with exponential backoff until it answers or LHM exits."""
+        delay, max_delay = self.READY_BACKOFF_S
+        deadline = time.monotonic() + self.READY_TIMEOUT_S
+        while time.monotonic() < deadline:
+            if self._probe(self.port):
+                return True
+            if self.lhm_process.poll() is not None:
+                logger.error(f"LHM exited during startup (code {self.lhm_process.returncode}).")
+                return False
+            time.sleep(max(0.0, min(delay, deadline - time.monotonic())))
+            delay = min(delay * 2, max_delay)
+        return False
 
     def _create_config(self, port: int):
         xml_content = f"""<?xml version="1.0" encoding="utf-8"?>
@@ -46,21 +151,8 @@ class LHMClient:
         except Exception as e:
             logger.error(f"Config error: {e}")
 
-    def _download_lhm(self) -> bool:
-        logger.info("Downloading LHM v0.9.5...")
-        try:
-            self.lhm_dir.mkdir(parents=True, exist_ok=True)
-            headers = {'User-Agent': 'VRAM-Guard/1.4.1'}
-            response = requests.get("https://github.com/LibreHardwareMonitor/LibreHardwareMonitor/releases/download/v0.9.5/LibreHardwareMonitor.zip", headers=headers, timeout=30)
-            with zipfile.ZipFile(io.BytesIO(response.content)) as zip_ref:
-                zip_ref.extractall(self.lhm_dir)
-            return True
-        except Exception as e:
-            logger.error(f"Download failed: {e}")
-            return False
-
     def _find_free_port(self) -> Optional[int]:
-        for port in range(8085, 8095):
+        for port in self.PORT_RANGE:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
                 try:
                     s.bind(("127.0.0.1", port))
@@ -69,14 +161,19 @@ class LHMClient:
         return None
 
     def _start_lhm(self) -> bool:
-        if not self.lhm_exe.exists():
-            if not self._download_lhm(): return False
-        self._cleanup_old_instances()
-        self.port = self._find_free_port()
-        if not self.port: return False
-        self._create_config(self.port)
-        self.api_url = f"http://127.0.0.1:{self.port}/data.json"
-        
+        instances = self._find_running_instances()
+        if instances:
+            if self._adopt_running_instance(instances):
+                return True
+            logger.info("Running LHM instance does not answer. Restarting it...")
+            self._cleanup_old_instances(instances)
+
+        if not self.provisioner.ensure_installed(): return False
+        port = self._find_free_port()
+        if not port: return False
+        self._create_config(port)
+        self._use_port(port)
+
         startupinfo = subprocess.STARTUPINFO()
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
         startupinfo.wShowWindow = 0 
@@ -88,80 +185,185 @@ class LHMClient:
                 creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
             )
             logger.info(f"LHM process started (PID: {self.lhm_process.pid})")
-            
-            for i in range(15):
-                try:
-                    requests.get(self.api_url, timeout=1)
-                    logger.info("LHM API is online.")
-                    return True
-                except: 
-                    if i % 5 == 0: logger.info(f"Waiting for API... ({i}s)")
-                    time.sleep(2)
+
+            if self._wait_until_ready():
+                logger.info("LHM API is online.")
+                return True
+            logger.error("LHM API did not come online.")
             return False
         except Exception as e:
             logger.error(f"LHM start error: {e}")
             return False
 
-    def _extract_float(self, value_str: str) -> Optional[float]:
+    @traced("lhm.stream_sensor")
+    def _stream_cached_sensor(self) -> Optional[float]:
         """
-        Extracts a float number from a string like '64.5 °C' or '64,5 °C'.
-        Uses regex for maximum reliability.
+        Streams data.json and stops as soon as the cached sensor node has been read,
+        without building the rest of the tree.
+        Returns None if the sensor was not found (the caller falls back to a full parse).
         """
-        try:
-            # Find the first sequence of digits, dots, or commas
-            match = re.search(r"([0-9]+(?:[.,][0-9]+)?)", value_str)
-            if match:
-                num_str = match.group(1).replace(',', '.')
-                return float(num_str)
-        except Exception as e:
-            logger.debug(f"Failed to parse value '{value_str}': {e}")
-        return None
-
-    def _find_all_sensors(self, node: dict, found_sensors: list):
-        text = node.get('Text', '')
-        value = node.get('Value', '')
-        children = node.get('Children', [])
+        marker = self.sensor.marker
+        keep = 64  # Tail kept between chunks so a marker split across chunks is still found
+        buffer = bytearray()
+        found = False
 
-        # We look for anything that looks like a temperature
-        if value and ("°C" in value or "C" in value):
-            found_sensors.append({'name': text, 'value': value})
+        with requests.get(self.api_url, timeout=1, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                buffer += chunk
+                if not found:
+                    match = marker.search(buffer)
+                    if not match:
+                        del buffer[:-keep]
+                        continue
+                    del buffer[:match.start()]
+                    found = True
 
-        for child in children:
-            self._find_all_sensors(child, found_sensors)
+                end = buffer.find(b'}')
+                if end < 0:
+                    continue
+                try:
+                    node = json.loads(bytes(buffer[:end + 1]))
+                except ValueError:
+                    return None  # Not a leaf node any more, the tree changed
+                return self.sensor.read_cached_node(node)
+        return None
 
+    @traced("lhm.get_vram_temp")
     def get_vram_temp(self) -> Tuple[Optional[float], str]:
         if not self.api_url: return None, "Unknown"
         try:
+            if self.stream_parsing and self.sensor.marker is not None:
+                val = self._stream_cached_sensor()
+                if val is not None:
+                    return val, self.sensor.name
+                logger.info("Cached sensor '%s' not found in stream. Re-resolving...", self.sensor.name)
+                self.sensor.invalidate()
+
+            # Single full pass: parse the whole tree and (re)resolve the sensor
             response = requests.get(self.api_url, timeout=1)
             data = response.json()
-            
-            sensors = []
-            self._find_all_sensors(data, sensors)
-            
-            # Search for the VRAM sensor (prioritizing "Junction" as seen in your screenshot)
-            for s in sensors:
-                name = s['name'].lower()
-                # Match "GPU Memory Junction" or "GPU Memory" or just "Memory" if it's a GPU sensor
-                if "memory" in name and ("junction" in name or "gpu" in name):
-                    val = self._extract_float(s['value'])
-                    if val is not None:
-                        return val, s['name']
-
-            # Fallback: Any sensor with "Memory"
-            for s in sensors:
-                if "memory" in s['name'].lower():
-                    val = self._extract_float(s['value'])
-                    if val is not None:
-                        return val, s['name']
-                
-            return None, "Not Found"
+            return self.sensor.lookup(data)
         except Exception as e:
             return None, str(e)
 
+    @staticmethod
+    def _hardware_id(sensor_id: Optional[str]) -> Optional[str]:
+        # '/gpu-nvidia/0/temperature/3' -> '/gpu-nvidia/0'
+        parts = (sensor_id or '').split('/')
+        return '/'.join(parts[:3]) if len(parts) > 3 else None
+
+    @classmethod
+    def gpu_index(cls, hardware_id: str) -> int:
+        """NVIDIA GPU number in LHM's enumeration order ('/gpu-nvidia/1' -> 1)."""
+        try:
+            return int(hardware_id[len(cls.NVIDIA_GPU_PREFIX):])
+        except ValueError:
+            return -1
+
+    def _resolve_gpu_sensors(self, data: dict) -> Dict[str, dict]:
+        """
+        Finds the VRAM sensor of every NVIDIA GPU hardware node (Sensor > Computer > Hardware).
+        """
+        gpus = {}
+        populated = False
+        for ci, computer in enumerate(data.get('Children', [])):
+            for hi, hardware in enumerate(computer.get('Children', [])):
+                sensors = []
+                find_all_sensors(hardware, sensors, (ci, hi))
+                populated = populated or bool(sensors)
+                hw_id = next((h for h in (self._hardware_id(s['sensor_id']) for s in sensors)
+                              if h and h.startswith(self.NVIDIA_GPU_PREFIX)), None)
+                if hw_id is None:
+                    continue
+                match = select_sensor(sensors)
+                if match is None:
+                    continue
+                sensor, _ = match
+                sensor['hardware'] = hardware.get('Text', hw_id)
+                sensor['unit'] = unit_suffix(sensor['value'])
+                gpus[hw_id] = sensor
+                logger.debug("Resolved VRAM sensor '%s' of %s (%s) at path %s",
+                             sensor['name'], hw_id, sensor['hardware'], sensor['path'])
+        if not populated:
+            raise SensorsNotReadyError("LHM has not published any sensors yet")
+        return dict(sorted(gpus.items(), key=lambda item: self.gpu_index(item[0])))
+
+    def _read_gpu_sensors(self, data: dict) -> Optional[Dict[str, Tuple[Optional[float], str]]]:
+        """
+        Reads every resolved GPU sensor through its cached path.
+        Returns None if nothing is resolved yet or any sensor moved.
+        """
+        if not self._gpu_sensors:
+            return None
+        temps = {}
+        for hw_id, sensor in self._gpu_sensors.items():
+            node = data
+            try:
+                for index in sensor['path']:
+                    node = node['Children'][index]
+            except (KeyError, IndexError, TypeError):
+                return None
+            val = read_node(node, sensor['id'], sensor['name'], sensor['sensor_id'], sensor['unit'])
+            if val is None:
+                return None
+            temps[hw_id] = (val, sensor['name'])
+        return temps
+
+    @traced("lhm.fetch_gpu_temps")
+    def _fetch_gpu_temps(self) -> Dict[str, Tuple[Optional[float], str]]:
+        response = requests.get(self.api_url, timeout=1)
+        data = response.json()
+        temps = self._read_gpu_sensors(data)
+        if temps is None:
+            if self._gpu_sensors:
+                logger.info("Cached GPU sensors no longer match. Re-resolving...")
+            self._gpu_sensors = self._resolve_gpu_sensors(data)
+            temps = self._read_gpu_sensors(data) or {}
+        return temps
+
+    def list_gpus(self) -> List[Tuple[str, str]]:
+        """
+        NVIDIA GPUs that expose a VRAM temperature sensor, in LHM order.
+        :return: List of (hardware id, hardware name).
+        """
+        if not self.api_url: return []
+        with self._gpu_lock:
+            self._gpu_snapshot = self._fetch_gpu_temps()
+            self._gpu_snapshot_time = time.monotonic()
+            return [(hw_id, sensor['hardware']) for hw_id, sensor in self._gpu_sensors.items()]
+
+    def get_gpu_temp(self, hardware_id: str) -> Tuple[Optional[float], str]:
+        """
+        VRAM temperature of one GPU. One request serves all GPUs polled within
+        GPU_SNAPSHOT_MAX_AGE_S of each other.
+        """
+        if not self.api_url: return None, "Unknown"
+        with self._gpu_lock:
+            now = time.monotonic()
+            if self._gpu_snapshot_time is None or now - self._gpu_snapshot_time >= self.GPU_SNAPSHOT_MAX_AGE_S:
+                try:
+                    self._gpu_snapshot = self._fetch_gpu_temps()
+                except Exception as e:
+                    return None, str(e)
+                self._gpu_snapshot_time = now
+            return self._gpu_snapshot.get(hardware_id, (None, "Not Found"))
+
+    @traced("lhm.check_and_start")
     def check_and_start(self) -> bool:
-        if self.lhm_process and self.lhm_process.poll() is None:
-            return True
-        return self._start_lhm()
+        with self._start_lock:
+            if self.lhm_process and self.lhm_process.poll() is None:
+                return True
+            if any(proc.is_running() for proc in self.adopted_processes):
+                return True
+            self.adopted_processes = []
+
+            started = time.perf_counter()
+            ready = self._start_lhm()
+            if ready and self.ready_s is None:
+                self.ready_s = time.perf_counter() - started
+                logger.info(f"Startup: LHM ready after {self.ready_s:.2f}s")
+            return ready
 
     def stop(self):
         if self.lhm_process:
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import shutil
+import time
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+LHM_VERSION = "0.9.5"
+LHM_URL = f"https://github.com/LibreHardwareMonitor/LibreHardwareMonitor/releases/download/v{LHM_VERSION}/LibreHardwareMonitor.zip"
+# Published SHA-256 of the release archive (overridable through the lhm_sha256 setting).
+# While it is unset, the first verified download is trusted and its digest recorded next
+# to the cached package, so a later cached copy must match what was fetched from LHM_URL.
+LHM_SHA256: Optional[str] = None
+
+
+class ProvisioningError(Exception):
+    pass
+
+
+class LHMProvisioner:
+    """
+    Installs LibreHardwareMonitor into a directory.
+
+    Sources, in order: an offline bundle (a copy of the release zip), the
+    local package cache, and a download. Packages are checked against the
+    configured SHA-256, or else the digest recorded when the package was
+    downloaded; an offline bundle placed by the user is only checked for
+    archive integrity unless a hash is set. Downloads are streamed to a
+    .part file in the cache, resumed with a Range request after an
+    interruption, verified, and only then moved into the cache. Extraction
+    goes to a temporary directory first, and the executable is moved into
+    place last, so a present executable always means a complete install.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    TIMEOUT_S = 30
+    RETRY_INTERVAL_S = 60.0  # Minimum time between download attempts after a failure
+
+    def __init__(self, target_dir: Path, cache_dir: Path, url: str = LHM_URL, sha256: Optional[str] = LHM_SHA256,
+                 offline_package: Optional[Path] = None, exe_name: str = "LibreHardwareMonitor.exe"):
+        self.target_dir = Path(target_dir)
+        self.cache_dir = Path(cache_dir)
+        self.url = url
+        self.sha256 = sha256.lower() if sha256 else None
+        self.offline_package = Path(offline_package) if offline_package else None
+        self.exe_name = exe_name
+
+        self.package_path = self.cache_dir / f"LibreHardwareMonitor-{LHM_VERSION}.zip"
+        self.partial_path = self.package_path.with_name(self.package_path.name + ".part")
+        self.digest_path = self.package_path.with_name(self.package_path.name + ".sha256")
+        self._last_failure: Optional[float] = None
+
+    def ensure_installed(self) -> bool:
+        """
+        :return: True if the executable is present (installing it if needed).
+        """
+        if (self.target_dir / self.exe_name).exists():
+            return True
+
+        for package in (self.offline_package, self.package_path):
+            if package is not None and package.exists():
+                try:
+                    if package == self.package_path and not self._expected_sha256():
+                        raise ProvisioningError("no SHA-256 to check the cached package against")
+                    self._verify(package)
+                    self._extract(package)
+                    logger.info(f"LHM installed from {package}")
+                    return True
+                except (ProvisioningError, OSError, zipfile.BadZipFile) as e:
+                    logger.error(f"LHM package {package} rejected: {e}")
+                    if package == self.package_path:
+                        package.unlink(missing_ok=True)
+                        self.digest_path.unlink(missing_ok=True)
+
+        if self._last_failure is not None and time.monotonic() - self._last_failure < self.RETRY_INTERVAL_S:
+            return False
+        try:
+            self._download()
+            self._extract(self.package_path)
+            logger.info(f"LHM v{LHM_VERSION} downloaded and installed.")
+            self._last_failure = None
+            return True
+        except (ProvisioningError, OSError, requests.RequestException, zipfile.BadZipFile) as e:
+            logger.error(f"LHM download failed: {e}")
+            self._last_failure = time.monotonic()
+            return False
+
+    def _download(self):
+        """Streams the archive into the .part file, resuming a previous partial download."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        offset = self.partial_path.stat().st_size if self.partial_path.exists() else 0
+        headers = {'User-Agent': 'VRAM-Guard/1.4.1'}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            logger.info(f"Resuming LHM download at {offset} bytes...")
+        else:
+            logger.info(f"Downloading LHM v{LHM_VERSION}...")
+
+        with requests.get(self.url, headers=headers, timeout=self.TIMEOUT_S, stream=True) as response:
+            if response.status_code == 416:
+                # Nothing left to fetch, or the part file does not belong to this archive
+                self.partial_path.unlink(missing_ok=True)
+                raise ProvisioningError("server rejected the resume range, restarting next time")
+            response.raise_for_status()
+
+            if response.status_code == 206:
+                expected = self._total_size(response.headers.get('Content-Range'))
+                mode = 'ab'
+            else:
+                offset = 0  # Server ignored the Range header: start over
+                expected = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+                mode = 'wb'
+
+            written = offset
+            with open(self.partial_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    f.write(chunk)
+                    written += len(chunk)
+
+        if expected is not None and written < expected:
+            raise ProvisioningError(f"download truncated at {written} of {expected} bytes (will resume)")
+
+        try:
+            self._verify(self.partial_path)
+        except (ProvisioningError, zipfile.BadZipFile):
+            self.partial_path.unlink(missing_ok=True)  # Complete but corrupt: resuming would not help
+            raise
+        if not self.sha256:
+            digest = self._sha256_of(self.partial_path)
+            self.digest_path.write_text(digest + "\n", encoding="utf-8")
+            logger.warning("LHM package has no pinned SHA-256; trusting this download (SHA-256 %s). "
+                           "Set lhm_sha256 to pin it.", digest)
+        os.replace(self.partial_path, self.package_path)
+
+    @staticmethod
+    def _total_size(content_range: Optional[str]) -> Optional[int]:
+        # "bytes 100-199/200"
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            if total.isdigit():
+                return int(total)
+        return None
+
+    def _expected_sha256(self) -> Optional[str]:
+        """The configured hash, or the one recorded when the cached package was downloaded."""
+        if self.sha256:
+            return self.sha256
+        try:
+            return self.digest_path.read_text(encoding="utf-8").strip().lower() or None
+        except OSError:
+            return None
+
+    def _sha256_of(self, package: Path) -> str:
+        digest = hashlib.sha256()
+        with open(package, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _verify(self, package: Path):
+        expected = self.sha256 if package != self.package_path else self._expected_sha256()
+        if expected:
+            actual = self._sha256_of(package)
+            if actual != expected:
+                raise ProvisioningError(f"SHA-256 mismatch (got {actual})")
+
+        with zipfile.ZipFile(package) as archive:
+            bad = archive.testzip()
+            if bad is not None:
+                raise ProvisioningError(f"corrupt archive member '{bad}'")
+            if self.exe_name not in archive.namelist():
+                raise ProvisioningError(f"archive has no {self.exe_name}")
+
+    def _extract(self, package: Path):
+        staging = self.target_dir.with_name(self.target_dir.name + ".extracting")
+        shutil.rmtree(staging, ignore_errors=True)
+        with zipfile.ZipFile(package) as archive:
+            archive.extractall(staging)
+
+        self.target_dir.mkdir(parents=True, exist_ok=True)
+        # The executable goes last so a crash here never leaves a runnable but incomplete install
+        entries = sorted(staging.iterdir(), key=lambda p: p.name == self.exe_name)
+        for entry in entries:
+            destination = self.target_dir / entry.name
+            if destination.is_dir() and not destination.is_symlink():
+                shutil.rmtree(destination)
+            os.replace(entry, destination)
+        shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,173 @@
+"""
+Finding the VRAM temperature in a LibreHardwareMonitor data.json tree.
+
+The matching and the cached sensor path are independent of how the tree
+was fetched, so LHMClient (one local LHM) and the fleet monitor (many
+remote ones) share them.
+"""
+import logging
+import re
+from typing import List, Optional, Tuple
+
+from core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+def extract_float(value_str: str) -> Optional[float]:
+    """
+    Extracts a float number from a string like '64.5 °C' or '64,5 °C'.
+    Uses regex for maximum reliability.
+    """
+    try:
+        # Find the first sequence of digits, dots, or commas
+        match = re.search(r"([0-9]+(?:[.,][0-9]+)?)", value_str)
+        if match:
+            num_str = match.group(1).replace(',', '.')
+            return float(num_str)
+    except Exception as e:
+        logger.debug("Failed to parse value '%s': %s", value_str, e)
+    return None
+
+
+def unit_suffix(value: str) -> str:
+    # Keep whatever follows the number (e.g. ' °C') so the next polls can skip the regex
+    number = re.search(r"[0-9]+(?:[.,][0-9]+)?", value)
+    return value[number.end():] if number else ""
+
+
+def find_all_sensors(node: dict, found_sensors: list, path: Tuple[int, ...] = ()):
+    """Collects every temperature-like sensor below node, with its path of child indices."""
+    text = node.get('Text', '')
+    value = node.get('Value', '')
+    children = node.get('Children', [])
+
+    # We look for anything that looks like a temperature
+    if value and ("°C" in value or "C" in value):
+        found_sensors.append({
+            'name': text, 'value': value, 'path': path,
+            'id': node.get('id'), 'sensor_id': node.get('SensorId')
+        })
+
+    for index, child in enumerate(children):
+        find_all_sensors(child, found_sensors, path + (index,))
+
+
+def select_sensor(sensors: List[dict]) -> Optional[Tuple[dict, float]]:
+    """
+    Picks the VRAM sensor out of all temperature-like sensors.
+    :return: (sensor, value) or None if nothing matches.
+    """
+    # Search for the VRAM sensor (prioritizing "Junction" as seen in your screenshot)
+    for s in sensors:
+        name = s['name'].lower()
+        # Match "GPU Memory Junction" or "GPU Memory" or just "Memory" if it's a GPU sensor
+        if "memory" in name and ("junction" in name or "gpu" in name):
+            val = extract_float(s['value'])
+            if val is not None:
+                return s, val
+
+    # Fallback: Any sensor with "Memory"
+    for s in sensors:
+        if "memory" in s['name'].lower():
+            val = extract_float(s['value'])
+            if val is not None:
+                return s, val
+    return None
+
+
+def read_node(node: dict, node_id: Optional[int], name: str, sensor_id: Optional[str],
+              unit: str) -> Optional[float]:
+    """Value of node if it is still the sensor identified by node_id, name and sensor_id, else None."""
+    # LHM numbers nodes sequentially, so any added/removed hardware shifts the ids
+    if node.get('id') != node_id or node.get('Text') != name:
+        return None
+    if sensor_id is not None and node.get('SensorId') != sensor_id:
+        return None
+
+    value = node.get('Value', '')
+    if unit and value.endswith(unit):
+        try:
+            return float(value[:-len(unit)].replace(',', '.'))
+        except ValueError:
+            pass
+    return extract_float(value) if value else None
+
+
+class VramSensorMatcher:
+    """
+    Finds the VRAM sensor in a data.json tree once and then follows the
+    cached path straight to it, resolving again when the tree changes.
+    One instance per LHM server.
+    """
+
+    def __init__(self):
+        # The path is a tuple of child indices from the root of data.json down to the sensor node
+        self.path: Optional[Tuple[int, ...]] = None
+        self.node_id: Optional[int] = None
+        self.sensor_id: Optional[str] = None
+        self.name: str = ""
+        self.unit: str = ""
+        # Sensors are leaf nodes that start with their id: {"id":42,"Text":...,"Children":[]}
+        self.marker: Optional[re.Pattern] = None
+
+    def resolve(self, data: dict) -> Optional[Tuple[float, str]]:
+        """
+        Walks the full LHM tree once and caches the location of the VRAM sensor.
+        """
+        self.invalidate()
+        sensors = []
+        find_all_sensors(data, sensors)
+        match = select_sensor(sensors)
+        if match is None:
+            return None
+
+        sensor, val = match
+        self.path = sensor['path']
+        self.node_id = sensor['id']
+        self.sensor_id = sensor['sensor_id']
+        self.name = sensor['name']
+        self.unit = unit_suffix(sensor['value'])
+        if self.node_id is not None:
+            self.marker = re.compile(rb'\{\s*"id"\s*:\s*%d\s*,' % self.node_id)
+        logger.debug("Resolved VRAM sensor '%s' at path %s", self.name, self.path)
+        return val, sensor['name']
+
+    def invalidate(self):
+        self.path = None
+        self.node_id = None
+        self.sensor_id = None
+        self.name = ""
+        self.unit = ""
+        self.marker = None
+
+    def read_cached(self, data: dict) -> Optional[float]:
+        """
+        Follows the cached path directly to the sensor node.
+        Returns None if the node moved or the hardware tree changed.
+        """
+        node = data
+        try:
+            for index in self.path:
+                node = node['Children'][index]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+        return self.read_cached_node(node)
+
+    def read_cached_node(self, node: dict) -> Optional[float]:
+        return read_node(node, self.node_id, self.name, self.sensor_id, self.unit)
+
+    @traced("lhm.lookup_sensor")
+    def lookup(self, data: dict) -> Tuple[Optional[float], str]:
+        """VRAM temperature in an already fetched tree: (value, sensor name) or (None, "Not Found")."""
+        if self.path is not None:
+            val = self.read_cached(data)
+            if val is not None:
+                return val, self.name
+            logger.info("Cached sensor '%s' no longer matches. Re-resolving...", self.name)
+
+        resolved = self.resolve(data)
+        if resolved is None:
+            return None, "Not Found"
+        return resolved
@@ -0,0 +1,170 @@
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+from core.throttle_controller import ThrottleState
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FAST_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Every histogram has a single writer thread (the sampler, a process
+    source under its lock, or a core loop), so observe() is three plain
+    increments without a lock. Readers may see a sample counted in one
+    field but not yet in another, which a scrape tolerates.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    def escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Family:
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.lines: List[str] = []
+
+    def sample(self, value: Optional[float], **labels):
+        if value is not None:
+            self.lines.append(f"{self.name}{_labels(labels)} {float(value):g}")
+
+    def histogram(self, histogram: Histogram, **labels):
+        cumulative = 0
+        bounds = [f"{b:g}" for b in histogram.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, histogram.counts):
+            cumulative += count
+            self.lines.append(f"{self.name}_bucket{_labels(dict(labels, le=bound))} {cumulative}")
+        self.lines.append(f"{self.name}_sum{_labels(labels)} {histogram.sum:g}")
+        self.lines.append(f"{self.name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        if not self.lines:
+            return ""
+        return f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n" + "\n".join(self.lines) + "\n"
+
+
+def render_metrics(core) -> str:
+    """
+    Prometheus text exposition (version 0.0.4) of a VRAMGuardCore or
+    MultiGpuGuard. Everything is read from the live objects at scrape time.
+    """
+    families = {}
+
+    def family(name: str, kind: str, help_text: str) -> _Family:
+        if name not in families:
+            families[name] = _Family(f"vram_guard_{name}", kind, help_text)
+        return families[name]
+
+    cores = list(getattr(core, "cores", None) or [core])
+    sources = {}
+    for gpu_core in cores:
+        if not hasattr(gpu_core, "controller"):
+            continue
+        gpu = gpu_core.label or "GPU0"
+        controller = gpu_core.controller
+        throttler = gpu_core.throttler
+
+        family("vram_temperature_celsius", "gauge", "Latest VRAM temperature reading.").sample(gpu_core.current_temp, gpu=gpu)
+        family("vram_temperature_max_celsius", "gauge", "Highest VRAM temperature since start.").sample(gpu_core.max_temp, gpu=gpu)
+        state_family = family("throttle_state", "gauge", "Current throttle state (1 for the active state).")
+        for state in ThrottleState:
+            state_family.sample(1 if controller.state == state else 0, gpu=gpu, state=state.value)
+        family("suspended_processes", "gauge", "Processes currently suspended.").sample(len(throttler.registry.suspended), gpu=gpu)
+        family("suspended_seconds_total", "counter", "Time GPU processes spent suspended.").sample(controller.suspended_s_total, gpu=gpu)
+        family("panic_events_total", "counter", "Times the T2 panic timer expired.").sample(controller.panic_count, gpu=gpu)
+        family("panic_kills_total", "counter", "Processes terminated by panic mode.").sample(throttler.killed_total, gpu=gpu)
+        family("duty_cycle_ratio", "gauge", "Achieved duty cycle over the last minute of throttling.").sample(controller.achieved_duty, gpu=gpu)
+        for key, value in controller.prediction_stats.items():
+            family(f"{key}_total", "counter", f"Throttle predictions: {key.replace('_', ' ')}.").sample(value, gpu=gpu)
+        family("time_to_first_reading_seconds", "gauge", "Application launch to the first VRAM reading.").sample(gpu_core.time_to_first_reading, gpu=gpu)
+        family("batch_spread_seconds", "gauge", "First-to-last skew of the last suspend/resume batch.").sample(throttler.batch.last_spread_s, gpu=gpu)
+
+        family("reaction_seconds", "histogram", "Last cool reading to GPU processes frozen, per throttle event.").histogram(gpu_core.reaction_latency, gpu=gpu)
+        scheduler = gpu_core.poll_scheduler
+        family("poll_interval_seconds", "histogram", "Polling intervals chosen by the adaptive scheduler.").histogram(scheduler.intervals, gpu=gpu)
+        family("poll_interval_current_seconds", "gauge", "Polling interval in effect.").sample(scheduler.last_interval_s, gpu=gpu)
+        family("detection_latency_seconds", "histogram", "Estimated T1 crossing to the reading that showed it.").histogram(scheduler.detection_latency, gpu=gpu)
+        family("late_detections_total", "counter", "T1 crossings seen later than max_detection_latency_s.").sample(scheduler.late_detections, gpu=gpu)
+        family("lhm_poll_seconds", "histogram", "Latency of reading the VRAM sensor (LHM, hwmon or replay).").histogram(gpu_core.sampler.poll_latency, gpu=gpu)
+        control = family("process_control_seconds", "histogram", "Duration of one suspend or resume batch.")
+        for action, histogram in throttler.batch.latency.items():
+            control.histogram(histogram, gpu=gpu, action=action)
+        sources[id(throttler.process_source)] = throttler.process_source
+
+    discovery = family("gpu_discovery_seconds", "histogram", "Latency of querying the processes running on the GPU.")
+    for source in sources.values():
+        discovery.histogram(source.query_latency, source=source.name)
+
+    return "".join(f.render() for f in families.values())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics(self.server.core).encode("utf-8")
+        except Exception as e:
+            logger.error(f"Metrics rendering failed: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """
+    Serves /metrics for Prometheus on its own thread. Nothing is computed
+    between scrapes.
+    """
+
+    def __init__(self, core, port: int = 9877, host: str = "127.0.0.1"):
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.core = core
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on http://{self._server.server_address[0]}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
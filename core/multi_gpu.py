@@ -0,0 +1,242 @@
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from core.clock import Clock
+from core.lhm_client import LHMClient
+from core.process_throttler import Throttler
+from core.sensor_source import SensorsNotReadyError
+from core.throttle_controller import ThrottleState
+from core.vram_guard_core import GpuStatus, VRAMGuardCore
+
+logger = logging.getLogger(__name__)
+
+
+class GpuBinding(NamedTuple):
+    index: int  # NVIDIA GPU number in LHM ('/gpu-nvidia/<index>')
+    hardware_id: str
+    name: str
+    bus_id: str
+
+    @property
+    def label(self) -> str:
+        return f"GPU{self.index}"
+
+
+class GpuSensor:
+    """
+    VRAM sensor of a single GPU, polled by that GPU's SensorSampler.
+    """
+
+    def __init__(self, sensor_source, hardware_id: str):
+        self.sensor_source = sensor_source
+        self.hardware_id = hardware_id
+
+    def get_vram_temp(self):
+        return self.sensor_source.get_gpu_temp(self.hardware_id)
+
+
+def bind_gpus(lhm_gpus: List[tuple], bus_ids: List[str], overrides: Optional[Dict[str, str]] = None) -> List[GpuBinding]:
+    """
+    Maps LHM GPU hardware nodes to PCI bus IDs.
+
+    LHM and NVML both enumerate NVIDIA cards in PCI bus order, so the n-th
+    LHM GPU is matched with the n-th bus ID after sorting. Entries in
+    overrides ({hardware id: bus id}) take precedence.
+    """
+    ordered = sorted(bus_id.lower() for bus_id in bus_ids)
+    overrides = {k: v.lower() for k, v in (overrides or {}).items()}
+    bindings = []
+    for hardware_id, name in lhm_gpus:
+        index = LHMClient.gpu_index(hardware_id)
+        bus_id = overrides.get(hardware_id)
+        if bus_id is None and 0 <= index < len(ordered):
+            bus_id = ordered[index]
+        if bus_id is None:
+            logger.warning(f"No PCI bus ID found for {hardware_id} ({name}). Add it to 'gpu_bus_map'.")
+            continue
+        bindings.append(GpuBinding(index, hardware_id, name, bus_id))
+    return bindings
+
+
+class MultiGpuGuard:
+    """
+    Runs one VRAMGuardCore per GPU, each with its own sensor, controller and
+    Throttler restricted to the processes on that GPU, so a hot card only
+    throttles its own jobs. Falls back to a single core (whole-system
+    behaviour) when fewer than two GPUs can be mapped.
+
+    Exposes the same state properties as VRAMGuardCore for the tray.
+    """
+
+    DISCOVERY_ATTEMPTS = 5  # Failed or not-ready sensor lookups before falling back to single-GPU mode
+    DISCOVERY_RETRY_S = 2.0
+
+    def __init__(self, settings, license_manager, sensor_source, throttler, clock: Optional[Clock] = None,
+                 telemetry=None, launched_at: Optional[float] = None):
+        """
+        :param throttler: Used as-is in single-GPU mode; per-GPU throttlers share its process source.
+        :param telemetry: TelemetryStore shared by all GPUs (optional).
+        :param launched_at: Wall-clock time the application started (see VRAMGuardCore).
+        """
+        self.settings = settings
+        self.license_manager = license_manager
+        self.sensor_source = sensor_source
+        self.throttler = throttler
+        self.clock = clock or Clock()
+        self.telemetry = telemetry
+        self.launched_at = launched_at
+
+        self.gpus: List[GpuBinding] = []
+        self.cores: List[VRAMGuardCore] = []
+        self._is_running = True
+        self._paused = False
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self._is_running
+
+    @is_running.setter
+    def is_running(self, value: bool):
+        self._is_running = value
+        for core in self.cores:
+            core.is_running = value
+
+    def stop(self):
+        self._is_running = False
+        for core in self.cores:
+            core.stop()
+
+    def close(self):
+        """Releases the shared throttler and every per-GPU one (see VRAMGuardCore.close)."""
+        self.throttler.close()
+        for core in self.cores:
+            core.close()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @paused.setter
+    def paused(self, value: bool):
+        self._paused = value
+        for core in self.cores:
+            core.paused = value
+
+    def subscribe(self, callback: Callable[[], None]):
+        """Registers a change callback with every GPU core (see VRAMGuardCore.subscribe)."""
+        self._listeners.append(callback)
+        for core in self.cores:
+            core.subscribe(callback)
+
+    def _set_cores(self, cores: List[VRAMGuardCore]):
+        for core in cores:
+            for callback in self._listeners:
+                core.subscribe(callback)
+        self.cores = cores
+        for callback in self._listeners:
+            callback()
+
+    @property
+    def gpu_states(self) -> List[GpuStatus]:
+        return [status for core in self.cores for status in core.gpu_states]
+
+    @property
+    def current_temp(self) -> Optional[float]:
+        """Hottest VRAM reading across all GPUs."""
+        temps = [core.current_temp for core in self.cores if core.current_temp is not None]
+        return max(temps) if temps else None
+
+    @property
+    def is_throttling(self) -> bool:
+        return any(core.is_throttling for core in self.cores)
+
+    @property
+    def state(self) -> ThrottleState:
+        """Most severe state of any GPU."""
+        states = [core.state for core in self.cores]
+        for state in (ThrottleState.PANIC, ThrottleState.SUSPENDED, ThrottleState.WORKING):
+            if state in states:
+                return state
+        return ThrottleState.IDLE
+
+    @property
+    def prediction_stats(self) -> dict:
+        totals: Dict[str, int] = {}
+        for core in self.cores:
+            for key, value in core.prediction_stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _telemetry_writer(self, gpu: int):
+        if self.telemetry is None:
+            return None
+        return self.telemetry.writer(gpu, self.settings.get('telemetry_interval_s'))
+
+    def _discover(self) -> List[GpuBinding]:
+        """
+        Only a failed lookup or a sensor tree that is not populated yet is
+        retried. An empty answer means a single sensor: monitoring starts at once.
+        """
+        attempts = 0
+        lhm_gpus = []
+        while self.is_running and attempts < self.DISCOVERY_ATTEMPTS:
+            if not self.sensor_source.check_and_start():
+                logger.warning(f"{self.sensor_source.name} not available. Retrying in 10s...")
+                self.clock.sleep(10)
+                continue
+            try:
+                lhm_gpus = self.sensor_source.list_gpus()
+                break
+            except SensorsNotReadyError as e:
+                logger.debug("GPU sensors not ready: %s", e)
+            except Exception as e:
+                logger.debug("GPU sensor discovery failed: %s", e)
+            attempts += 1
+            self.clock.sleep(self.DISCOVERY_RETRY_S)
+
+        if len(lhm_gpus) < 2:
+            return []
+        return bind_gpus(lhm_gpus, self.throttler.process_source.list_gpus(), self.settings.get('gpu_bus_map'))
+
+    def run_monitoring_loop(self):
+        """
+        Discovers the GPUs and runs their control loops in parallel. Blocks until stopped.
+        """
+        gpus = self._discover()
+        if not self.is_running:
+            return
+
+        if len(gpus) < 2:
+            logger.info("Single-GPU mode.")
+            core = VRAMGuardCore(self.settings, self.license_manager, self.sensor_source, self.throttler, self.clock,
+                                 telemetry=self._telemetry_writer(0), launched_at=self.launched_at)
+            self._set_cores([core])
+            core.is_running = self._is_running
+            core.paused = self._paused
+            core.run_monitoring_loop()
+            return
+
+        # The shared throttler only lends its process source to the per-GPU ones
+        process_source = self.throttler.process_source
+        self.throttler.close()
+        cores = []
+        for gpu in gpus:
+            logger.info(f"{gpu.label}: {gpu.name} ({gpu.hardware_id}) on bus {gpu.bus_id}")
+            throttler = Throttler(process_source, self.settings, gpu.bus_id)
+            cores.append(VRAMGuardCore(self.settings, self.license_manager, self.sensor_source, throttler, self.clock,
+                                       sensor=GpuSensor(self.sensor_source, gpu.hardware_id), label=gpu.label,
+                                       telemetry=self._telemetry_writer(gpu.index), launched_at=self.launched_at))
+        self.gpus = gpus
+        self._set_cores(cores)
+        # Stop or pause requested while the cores were being built
+        self.is_running = self._is_running
+        self.paused = self._paused
+
+        threads = [threading.Thread(target=core.run_monitoring_loop, name=f"VRAMGuardCore-{core.label}", daemon=True)
+                   for core in cores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,79 @@
+import logging
+from typing import Optional
+
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_BUCKETS = (0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0)
+DETECTION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+
+class PollScheduler:
+    """
+    Chooses the time until the next sensor poll from the headroom below T1
+    and the heating rate.
+
+    VRAM cannot heat faster than max_heating_rate_c_per_s, so from a reading
+    h °C below T1 the crossing is at least h / rate seconds away. Polling
+    within h / rate + max_detection_latency_s therefore sees any crossing
+    within max_detection_latency_s. When the fitted trend is rising, polls
+    are additionally spaced so that several readings precede the predicted
+    crossing (for predictive throttling). Far from T1 the interval grows to
+    poll_max_interval_s, which keeps idle wakeups rare.
+    """
+
+    SAMPLES_BEFORE_CROSSING = 4  # Readings wanted between now and a predicted crossing
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.last_interval_s: Optional[float] = None
+        self.intervals = Histogram(POLL_INTERVAL_BUCKETS)
+        # Estimated time from a T1 crossing to the reading that showed it
+        self.detection_latency = Histogram(DETECTION_BUCKETS)
+        self.late_detections = 0  # Crossings seen later than max_detection_latency_s
+        self._previous: Optional[tuple] = None  # (timestamp, temp) of the previous reading
+
+    def observe(self, timestamp: float, temp: float, t1: float):
+        """
+        Records a reading. On an upward T1 crossing, the crossing time is
+        interpolated between the two readings to estimate the detection latency.
+        """
+        previous = self._previous
+        self._previous = (timestamp, temp)
+        if previous is None:
+            return
+        prev_time, prev_temp = previous
+        if not prev_temp < t1 <= temp or timestamp <= prev_time:
+            return
+        crossed_at = prev_time + (t1 - prev_temp) / (temp - prev_temp) * (timestamp - prev_time)
+        latency = timestamp - crossed_at
+        self.detection_latency.observe(latency)
+        if latency > self.settings.get('max_detection_latency_s'):
+            self.late_detections += 1
+            logger.debug("T1 crossing detected %.1fs late (%s°C -> %s°C in %.1fs)",
+                         latency, prev_temp, temp, timestamp - prev_time)
+
+    def next_interval(self, temp: float, t1: float, slope_c_per_s: Optional[float] = None,
+                      throttling: bool = False) -> float:
+        """
+        :param slope_c_per_s: Fitted heating rate, if known.
+        :param throttling: A throttle cycle is running (the controller needs every reading).
+        """
+        settings = self.settings
+        min_interval = settings.get('poll_min_interval_s')
+        max_interval = settings.get('poll_max_interval_s')
+
+        headroom = t1 - temp
+        if throttling or headroom <= 0:
+            interval = min_interval
+        else:
+            # The latency bound is never relaxed, not even by poll_min_interval_s
+            bound = headroom / settings.get('max_heating_rate_c_per_s') + settings.get('max_detection_latency_s')
+            interval = min(bound, max_interval)
+            if slope_c_per_s is not None and slope_c_per_s > 0:
+                interval = min(interval, max(headroom / slope_c_per_s / self.SAMPLES_BEFORE_CROSSING, min_interval))
+
+        self.last_interval_s = interval
+        self.intervals.observe(interval)
+        return interval
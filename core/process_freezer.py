@@ -0,0 +1,429 @@
+"""
+POSIX backends that stop and continue GPU processes together with their
+descendants (worker children, data loaders, helpers that may open new GPU
+contexts during a cool-down).
+
+- CgroupFreezer (Linux, cgroup v2): the processes are moved into a dedicated
+  cgroup and the whole tree is frozen or thawed with one write to
+  cgroup.freeze. Children forked later are born inside the cgroup.
+- SignalFreezer: SIGSTOP/SIGCONT to every process of the tree, parents first
+  so a stopped parent cannot fork behind the walk.
+"""
+import logging
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+Results = Tuple[List[Optional[Exception]], List[Optional[float]]]
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """Parent PID -> child PIDs of every process on the system (one /proc scan)."""
+    children: Dict[int, List[int]] = {}
+    for process in psutil.process_iter(['ppid']):
+        ppid = process.info['ppid']
+        if ppid:
+            children.setdefault(ppid, []).append(process.pid)
+    return children
+
+
+def _descendants(pids: Iterable[int], children: Dict[int, List[int]]) -> List[int]:
+    """All descendants of pids, parents before children (never this process)."""
+    own_pid = os.getpid()
+    found, seen = [], set(pids)
+    frontier = list(seen)
+    while frontier:
+        for child in children.get(frontier.pop(), ()):
+            if child not in seen and child != own_pid:
+                seen.add(child)
+                found.append(child)
+                frontier.append(child)
+    return found
+
+
+def _validate(processes: List[psutil.Process], results: List[Optional[Exception]]) -> List[int]:
+    """Indexes of processes that still run (PID reuse is checked up front, outside the timed loop)."""
+    ready = []
+    for i, process in enumerate(processes):
+        try:
+            if not process.is_running():
+                raise psutil.NoSuchProcess(process.pid)
+            ready.append(i)
+        except psutil.Error as e:
+            results[i] = e
+    return ready
+
+
+class ProcessFreezer:
+    """
+    Stops ('suspend') or continues ('resume') processes and their descendants.
+    Results are reported per requested process; descendants are tracked internally.
+    """
+
+    name = "base"
+
+    def run(self, action: str, processes: List[psutil.Process]) -> Results:
+        """
+        :return: Per process, None or the exception raised, and the
+                 perf_counter() time the operation completed (None on failure).
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases everything still stopped by this freezer."""
+
+
+class SignalFreezer(ProcessFreezer):
+    """
+    SIGSTOP/SIGCONT, sent back to back. With include_descendants, the
+    children of every stopped process are stopped as well, and only the
+    descendants this freezer stopped are continued again.
+    """
+
+    name = "signals"
+    MAX_SCANS = 4  # Bounds the walk if a child that cannot be stopped keeps forking
+
+    def __init__(self, include_descendants: bool = True):
+        self.include_descendants = include_descendants
+        self._descendants: Dict[int, List[psutil.Process]] = {}  # Root PID -> descendants it stopped
+
+    def run(self, action: str, processes: List[psutil.Process]) -> Results:
+        sig = signal.SIGSTOP if action == 'suspend' else signal.SIGCONT
+        results: List[Optional[Exception]] = [None] * len(processes)
+        finished: List[Optional[float]] = [None] * len(processes)
+        ready = _validate(processes, results)
+
+        if action == 'resume':
+            # Children first: a parent never runs while its workers are still stopped
+            for i in ready:
+                self._continue(self._descendants.pop(processes[i].pid, ()))
+
+        for i in ready:
+            try:
+                os.kill(processes[i].pid, sig)
+                finished[i] = time.perf_counter()
+            except ProcessLookupError:
+                results[i] = psutil.NoSuchProcess(processes[i].pid)
+            except PermissionError:
+                results[i] = psutil.AccessDenied(processes[i].pid)
+
+        if action == 'suspend' and self.include_descendants:
+            stopped = [processes[i] for i in ready if results[i] is None]
+            if stopped:
+                self._stop_descendants(stopped)
+        return results, finished
+
+    def _stop_descendants(self, roots: List[psutil.Process]):
+        """
+        Stops the process trees below the (already stopped) roots. A child
+        that was forked while the tree was walked is caught by the next scan,
+        which finds nothing new once every parent is stopped.
+        """
+        owner = {root.pid: root.pid for root in roots}  # PID -> root whose tree it belongs to
+        for _ in range(self.MAX_SCANS):
+            children = _children_map()
+            new = _descendants(owner, children)
+            if not new:
+                return
+            parents = {child: ppid for ppid, kids in children.items() for child in kids}
+            for pid in new:
+                owner[pid] = owner[parents[pid]]  # Parents come first
+                try:
+                    process = psutil.Process(pid)
+                    if process.status() == psutil.STATUS_STOPPED:
+                        continue  # Stopped by someone else (e.g. job control): not ours to continue
+                    os.kill(pid, signal.SIGSTOP)
+                    self._descendants.setdefault(owner[pid], []).append(process)
+                except (psutil.Error, ProcessLookupError, PermissionError):
+                    pass
+
+    @staticmethod
+    def _continue(processes: Iterable[psutil.Process]):
+        for process in reversed(list(processes)):
+            try:
+                if process.is_running():  # Same process, not a recycled PID
+                    os.kill(process.pid, signal.SIGCONT)
+            except (psutil.Error, ProcessLookupError, PermissionError):
+                pass
+
+    def close(self):
+        for descendants in self._descendants.values():
+            self._continue(descendants)
+        self._descendants.clear()
+
+
+def cgroup2_mount() -> Optional[Path]:
+    """Mount point of the cgroup v2 hierarchy (/sys/fs/cgroup, or .../unified on hybrid systems)."""
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8") as f:
+            for line in f:
+                fields, _, fstype = line.partition(" - ")
+                if fstype.split(" ", 1)[0] == "cgroup2":
+                    return Path(fields.split()[4])
+    except OSError:
+        pass
+    return None
+
+
+def _cgroup_of(pid: int) -> Optional[str]:
+    """cgroup v2 path of a process, relative to the mount ("/user.slice/...")."""
+    try:
+        with open(f"/proc/{pid}/cgroup", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return line[3:].strip()
+    except OSError:
+        pass
+    return None
+
+
+def is_cgroup_frozen(pid: int) -> bool:
+    """True if the process's cgroup v2 group is set to frozen (its status still reads sleeping)."""
+    mount, path = cgroup2_mount(), _cgroup_of(pid)
+    if mount is None or path is None or path == "/":
+        return False
+    try:
+        return (mount / path.lstrip("/") / "cgroup.freeze").read_text().strip() == "1"
+    except OSError:
+        return False
+
+
+class CgroupFreezer(ProcessFreezer):
+    """
+    Freezes processes through a dedicated cgroup v2 group (Linux 5.2+).
+
+    Suspending moves the requested processes into the group and writes "1"
+    to cgroup.freeze, which stops every task in the group at once.
+    Descendants are then pulled in with a single scan, and processes no
+    longer requested are moved back to the cgroup they came from. Resuming
+    all of them is a single "0" write, after which every member returns to
+    its original cgroup (and so to its service's or container's limits);
+    resuming some (e.g. after a panic kill) moves those out of the group.
+
+    Processes that cannot be moved (e.g. in a threaded cgroup) are stopped
+    with SIGSTOP instead.
+    """
+
+    name = "cgroup"
+
+    def __init__(self, path: Path):
+        """
+        :param path: cgroup directory to use, created if missing (its parent must be a cgroup v2 directory).
+        """
+        mount = cgroup2_mount()
+        if mount is None:
+            raise OSError("no cgroup v2 hierarchy mounted")
+        self.mount = mount
+        self.path = path
+        path.mkdir(exist_ok=True)
+        if not (path / "cgroup.freeze").exists():
+            raise OSError("cgroup.freeze not supported (Linux 5.2+ required)")
+        self.relative = "/" + str(path.relative_to(mount))
+        self._procs_fd = os.open(path / "cgroup.procs", os.O_WRONLY)
+        self._freeze_fd = os.open(path / "cgroup.freeze", os.O_WRONLY)
+        self._fallback = SignalFreezer()
+        self._signalled: Set[int] = set()  # Roots stopped by the fallback
+        self._roots: Set[int] = set()  # Requested processes that are frozen
+        self._origin: Dict[int, str] = {}  # PID -> cgroup it was moved from
+        self.frozen = False
+
+        # A crashed instance may have left the group frozen
+        self._set_frozen(False)
+        leftover = self._members()
+        if leftover:
+            logger.warning(f"Thawed {len(leftover)} process(es) left in {path} by a previous run.")
+
+    def _set_frozen(self, frozen: bool):
+        os.pwrite(self._freeze_fd, b"1" if frozen else b"0", 0)
+        self.frozen = frozen
+
+    def is_frozen(self) -> bool:
+        """True once the kernel reports every task in the group as frozen (freezing is asynchronous)."""
+        with open(self.path / "cgroup.events", encoding="ascii") as f:
+            return any(line.strip() == "frozen 1" for line in f)
+
+    def _members(self) -> Set[int]:
+        with open(self.path / "cgroup.procs", encoding="ascii") as f:
+            return {int(line) for line in f if line.strip()}
+
+    def _move_in(self, pid: int):
+        origin = _cgroup_of(pid)
+        if origin != self.relative:
+            self._origin[pid] = origin or "/"
+            os.write(self._procs_fd, str(pid).encode("ascii"))
+
+    def _move_out(self, pid: int, children: Dict[int, List[int]]):
+        """
+        Returns pid to the cgroup it came from (or its nearest moved ancestor's), which also thaws it.
+        The recorded origin is kept so descendants moved later still find it; callers drop it.
+        """
+        origin = self._origin.get(pid)
+        if origin is None:
+            parents = {child: ppid for ppid, kids in children.items() for child in kids}
+            ancestor = parents.get(pid)
+            while ancestor is not None and ancestor not in self._origin:
+                ancestor = parents.get(ancestor)
+            origin = self._origin.get(ancestor, "/")
+        target = self.mount / origin.lstrip("/") / "cgroup.procs"
+        try:
+            with open(target, "w", encoding="ascii") as f:
+                f.write(str(pid))
+        except OSError:
+            with open(self.mount / "cgroup.procs", "w", encoding="ascii") as f:
+                f.write(str(pid))  # Origin is gone (e.g. a finished transient scope)
+
+    def run(self, action: str, processes: List[psutil.Process]) -> Results:
+        results: List[Optional[Exception]] = [None] * len(processes)
+        finished: List[Optional[float]] = [None] * len(processes)
+        ready = _validate(processes, results)
+        if action == 'suspend':
+            self._suspend(processes, ready, results, finished)
+        else:
+            self._resume(processes, ready, results, finished)
+        return results, finished
+
+    def _suspend(self, processes, ready, results, finished):
+        moved = []
+        for i in ready:
+            pid = processes[i].pid
+            try:
+                self._move_in(pid)
+                moved.append(i)
+            except ProcessLookupError:
+                results[i] = psutil.NoSuchProcess(pid)
+            except OSError as e:
+                logger.warning("Cannot move PID %d into %s (%s). Using SIGSTOP.", pid, self.path, e)
+                fallback = [processes[i]]
+                results[i] = self._fallback.run('suspend', fallback)[0][0]
+                if results[i] is None:
+                    finished[i] = time.perf_counter()
+                    self._signalled.add(pid)
+
+        if not moved:
+            return
+        try:
+            self._set_frozen(True)
+        except OSError as e:
+            logger.error("Writing %s failed (%s). Using SIGSTOP.", self.path / "cgroup.freeze", e)
+            fallback = [processes[i] for i in moved]
+            for i, (error, at) in zip(moved, zip(*self._fallback.run('suspend', fallback))):
+                results[i], finished[i] = error, at
+                if error is None:
+                    self._signalled.add(processes[i].pid)
+            return
+        done = time.perf_counter()
+        for i in moved:
+            finished[i] = done
+            self._roots.add(processes[i].pid)
+        self._reconcile()
+
+    def _reconcile(self):
+        """One scan: pulls in descendants of frozen roots and releases everything else."""
+        children = _children_map()
+        wanted = self._roots | set(_descendants(self._roots, children))
+        members = self._members()
+        for pid in wanted - members:
+            try:
+                self._move_in(pid)
+            except OSError:
+                pass  # Exited, or not movable
+        for pid in members - wanted:
+            try:
+                self._move_out(pid, children)
+            except OSError:
+                pass
+        for pid in list(self._origin):
+            if pid not in wanted:
+                del self._origin[pid]  # Exited while in the group
+
+    def _resume(self, processes, ready, results, finished):
+        signalled = [processes[i] for i in ready if processes[i].pid in self._signalled]
+        if signalled:
+            self._fallback.run('resume', signalled)
+            self._signalled.difference_update(p.pid for p in signalled)
+        pids = {processes[i].pid for i in ready}
+        requested = {process.pid for process in processes}
+        self._roots = {pid for pid in self._roots if pid in requested or psutil.pid_exists(pid)}
+
+        if self._roots <= requested:
+            # Everything frozen is released: one write, then the members go home
+            self._set_frozen(False)
+            done = time.perf_counter()
+            self._roots.clear()
+            self._release_members()
+        else:
+            children = _children_map()
+            for pid in pids & self._roots:
+                self._roots.discard(pid)
+                members = [pid] + _descendants([pid], children)
+                for member in members:
+                    try:
+                        self._move_out(member, children)
+                    except OSError:
+                        pass
+                for member in members:
+                    self._origin.pop(member, None)
+            done = time.perf_counter()
+        for i in ready:
+            finished[i] = done
+
+    def _release_members(self):
+        """Moves every member back to its original cgroup, including children forked meanwhile."""
+        for _ in range(SignalFreezer.MAX_SCANS):
+            members = self._members()
+            if not members:
+                break
+            children = _children_map()
+            for pid in members:
+                try:
+                    self._move_out(pid, children)
+                except OSError:
+                    pass  # Exited
+        self._origin.clear()
+
+    def close(self):
+        """Returns the processes to their cgroups (which thaws them) and removes the group."""
+        try:
+            self._fallback.close()
+            # Frozen members cannot fork back into the group while it is emptied
+            self._set_frozen(True)
+            children = _children_map()
+            for pid in self._members():
+                try:
+                    self._move_out(pid, children)
+                except OSError:
+                    pass
+            self._set_frozen(False)
+            os.close(self._procs_fd)
+            os.close(self._freeze_fd)
+            self.path.rmdir()
+        except OSError as e:
+            logger.warning(f"Could not remove {self.path}: {e}")
+
+
+def create_process_freezer(backend: str = "auto", name: str = "vram_guard") -> Optional[ProcessFreezer]:
+    """
+    :param backend: "auto" (cgroup where possible, else signals), "cgroup" or "signals".
+    :param name: Name of the cgroup (one per Throttler).
+    :return: None where processes are not controlled by signals (Windows).
+    """
+    if os.name != 'posix':
+        return None
+    if backend in ("auto", "cgroup") and os.uname().sysname == "Linux":
+        mount = cgroup2_mount()
+        try:
+            if mount is None:
+                raise OSError("no cgroup v2 hierarchy mounted")
+            freezer = CgroupFreezer(mount / name)
+            logger.info(f"Freezing GPU process trees via cgroup {freezer.path}")
+            return freezer
+        except (OSError, ValueError) as e:
+            log = logger.warning if backend == "cgroup" else logger.info
+            log(f"cgroup v2 freezer unavailable ({e}). Falling back to SIGSTOP/SIGCONT.")
+    return SignalFreezer()
@@ -0,0 +1,74 @@
+import logging
+import psutil
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A process is identified by its PID *and* creation time, so a recycled PID
+# never matches an entry that belonged to the previous owner.
+ProcessKey = Tuple[int, float]
+
+
+class ProcessRegistry:
+    """
+    Keeps psutil handles of GPU processes alive across throttle cycles and
+    tracks which of them are currently suspended.
+
+    psutil verifies on suspend/resume/terminate that the handle's process is
+    still the same one (PID + creation time) and raises NoSuchProcess otherwise,
+    so a cached handle can never act on an unrelated process.
+    """
+
+    def __init__(self):
+        self._handles: Dict[int, psutil.Process] = {}
+        self._names: Dict[ProcessKey, str] = {}
+        self.suspended: Set[ProcessKey] = set()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def get(self, pid: int) -> Optional[Tuple[ProcessKey, psutil.Process]]:
+        """
+        Returns the cached handle for pid, creating it on first use.
+        :return: (key, handle) or None if no such process exists.
+        """
+        handle = self._handles.get(pid)
+        if handle is None:
+            try:
+                handle = psutil.Process(pid)
+                key = (pid, handle.create_time())
+            except psutil.NoSuchProcess:
+                return None
+            self._handles[pid] = handle
+            return key, handle
+        return (pid, handle.create_time()), handle
+
+    def name(self, key: ProcessKey) -> str:
+        """Process name, looked up once per process."""
+        name = self._names.get(key)
+        if name is None:
+            handle = self._handles.get(key[0])
+            try:
+                name = handle.name() if handle else "?"
+            except psutil.Error:
+                name = "?"
+            self._names[key] = name
+        return name
+
+    def evict(self, pid: int):
+        """Forgets a process that has exited (or whose PID was recycled)."""
+        handle = self._handles.pop(pid, None)
+        if handle is not None:
+            key = (pid, handle.create_time())
+            self.suspended.discard(key)
+            self._names.pop(key, None)
+
+    def prune(self, active_pids: Iterable[int]):
+        """
+        Evicts handles that are neither among active_pids nor suspended,
+        and suspended entries whose process is gone.
+        """
+        keep = set(active_pids) | {pid for pid, _ in self.suspended}
+        for pid in list(self._handles):
+            if pid not in keep or not self._handles[pid].is_running():
+                self.evict(pid)
@@ -0,0 +1,85 @@
+import logging
+from typing import Dict, List
+
+from core.gpu_process_source import GpuProcess
+
+logger = logging.getLogger(__name__)
+
+
+class WeightedProcessSelector:
+    """
+    Picks the smallest set of GPU processes whose suspension sheds the
+    requested share of GPU load, and rotates between processes of similar
+    weight with smooth weighted round-robin so no single peer is always
+    the one frozen.
+    """
+
+    PEER_RATIO = 0.8  # Processes within this ratio of the lightest required one are interchangeable
+
+    def __init__(self):
+        self._current: Dict[int, float] = {}  # Smooth WRR state per PID
+
+    @staticmethod
+    def weight(process: GpuProcess, total_memory_mib: float) -> float:
+        """
+        Estimated share of the GPU load caused by a process. Memory-controller
+        utilization drives VRAM heat the most; VRAM footprint is the fallback
+        when the backend reports no utilization.
+        """
+        if process.mem_util is not None or process.sm_util is not None:
+            return 0.6 * (process.mem_util or 0.0) + 0.4 * (process.sm_util or 0.0) + 0.01
+        if process.used_memory_mib and total_memory_mib > 0:
+            return 100.0 * process.used_memory_mib / total_memory_mib + 0.01
+        return 1.0
+
+    def select(self, processes: List[GpuProcess], shed_fraction: float) -> List[GpuProcess]:
+        """
+        :param processes: Candidate processes (already filtered by allow/deny lists).
+        :param shed_fraction: Share of the total weight that has to be suspended.
+        """
+        if not processes:
+            return []
+        total_memory = sum(p.used_memory_mib or 0.0 for p in processes)
+        weights = {p.pid: self.weight(p, total_memory) for p in processes}
+        total = sum(weights.values())
+        target = shed_fraction * total
+
+        # Forget rotation state of processes that are gone
+        self._current = {pid: c for pid, c in self._current.items() if pid in weights}
+
+        # Smallest number of processes that can shed the target (heaviest first)
+        ranked = sorted(processes, key=lambda p: weights[p.pid], reverse=True)
+        shed, needed = 0.0, 0
+        for process in ranked:
+            shed += weights[process.pid]
+            needed += 1
+            if shed >= target:
+                break
+        lightest_needed = weights[ranked[needed - 1].pid]
+
+        # Rotate among peers: every candidate earns its weight, the chosen pay back the pool
+        peers = [p for p in ranked if weights[p.pid] >= self.PEER_RATIO * lightest_needed]
+        peer_total = sum(weights[p.pid] for p in peers)
+        for process in peers:
+            self._current[process.pid] = self._current.get(process.pid, 0.0) + weights[process.pid]
+
+        chosen, shed = [], 0.0
+        for process in sorted(peers, key=lambda p: self._current[p.pid], reverse=True):
+            chosen.append(process)
+            shed += weights[process.pid]
+            if shed >= target:
+                break
+        for process in chosen:
+            self._current[process.pid] -= peer_total / len(chosen)
+
+        # Peers slightly lighter than the heaviest may fall short: top up heaviest first
+        for process in ranked:
+            if shed >= target:
+                break
+            if process not in chosen:
+                chosen.append(process)
+                shed += weights[process.pid]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Selective throttling: %s shed %.0f%% of GPU load", [p.pid for p in chosen], shed / total * 100)
+        return chosen
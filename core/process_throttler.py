@@ -1,29 +1,68 @@
 import logging
 import psutil
-import subprocess
 import os
 import ctypes
+import threading
+import time
 from typing import List, Optional
 
+from core.gpu_process_source import GpuProcess, GpuProcessSource, create_gpu_process_source
+from core.process_selector import WeightedProcessSelector
+from core.process_registry import ProcessRegistry
+from core.batch_controller import BatchProcessController
+from core.process_freezer import create_process_freezer
+from core.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 class Throttler:
     """
     Manages the suspension and resumption of GPU-intensive processes.
     Requires Administrator privileges.
+
+    With gpu_bus_id set, only processes holding a context on that GPU are
+    controlled (one Throttler per GPU on multi-GPU systems).
     """
     
-    def __init__(self):
+    def __init__(self, process_source: Optional[GpuProcessSource] = None, settings=None,
+                 gpu_bus_id: Optional[str] = None):
+        """
+        :param process_source: GPU process discovery backend (NVML or nvidia-smi by default).
+        :param settings: Settings for process selection (all GPU processes if omitted).
+        :param gpu_bus_id: PCI bus ID of the GPU to control (all GPUs if omitted).
+        """
         self._is_admin = self._check_admin()
-        self.throttled_pids: List[int] = []
+        self.settings = settings
+        self.gpu_bus_id = gpu_bus_id.lower() if gpu_bus_id else None
+        self.registry = ProcessRegistry()
+        freezer_name = "vram_guard" + (f"-{self.gpu_bus_id.replace(':', '_')}" if self.gpu_bus_id else "")
+        self.batch = BatchProcessController(freezer=create_process_freezer(
+            settings.get('process_freezer') if settings is not None else "auto", freezer_name))
+        self.selector = WeightedProcessSelector()
+        self.killed_total = 0  # Processes terminated by emergency_kill()
+        # Timing of the last suspend_gpu_processes() call (None if that step did not run)
+        self.last_discovery_s: Optional[float] = None
+        self.last_suspend_s: Optional[float] = None
+        self.process_source = process_source or create_gpu_process_source()
+        self._lock = threading.RLock()  # close() may run on another thread than the control loop
+        self._closed = False
         
         if not self._is_admin:
             logger.critical("Throttler initialized without Administrator privileges. Suspend/Resume will fail.")
 
+    @property
+    def throttled_pids(self) -> List[int]:
+        """PIDs currently suspended by the throttler."""
+        return sorted(pid for pid, _ in self.registry.suspended)
+
     def _check_admin(self) -> bool:
         """
         Checks if the script is running with Administrator privileges on Windows.
         """
+        if os.name != 'nt':
+            # POSIX: signalling is permitted per target process (same user or root),
+            # failures are reported per PID as AccessDenied.
+            return True
         try:
             # Check if the process has elevated privileges (Windows specific)
             return ctypes.windll.shell32.IsUserAnAdmin() != 0
@@ -31,98 +70,142 @@ class Throttler:
             logger.error(f"Failed to check admin status: {e}. Assuming non-admin.")
             return False
 
+    @traced("throttler.discover")
+    def _get_gpu_processes(self) -> List[GpuProcess]:
+        """
+        Finds the processes currently using the GPU (one entry per PID).
+        """
+        started = time.perf_counter()
+        processes = {}
+        own_pid = os.getpid()
+        for process in self.process_source.list_processes():
+            # Filter out the current process's PID to prevent self-suspension
+            if process.pid == own_pid:
+                continue
+            if self.gpu_bus_id is not None and process.gpu_bus_id.lower() != self.gpu_bus_id:
+                continue
+            # A process with contexts on several GPUs is listed once per GPU
+            if process.pid not in processes:
+                processes[process.pid] = process
+        self.last_discovery_s = time.perf_counter() - started
+        return list(processes.values())
+
+    @traced("throttler.get_gpu_pids")
     def _get_gpu_pids(self) -> List[int]:
         """
-        Uses nvidia-smi to find the PIDs of processes currently using the GPU.
+        Finds the PIDs of processes currently using the GPU.
         
         :return: List of PIDs.
         """
-        pids = []
-        try:
-            # Command to query PIDs and memory usage
-            cmd = ["nvidia-smi", "--query-compute-apps=pid,gpu_bus_id", "--format=csv,noheader"]
-            
-            # Use a short timeout to prevent hanging if the GPU is asleep/unresponsive
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
-            
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    try:
-                        # Format is typically: pid, gpu_bus_id
-                        pid_str = line.split(',')[0].strip()
-                        pids.append(int(pid_str))
-                    except ValueError:
-                        continue
-            
-            # Filter out the current process's PID to prevent self-suspension
-            if os.getpid() in pids:
-                pids.remove(os.getpid())
-                
-            logger.debug(f"Detected GPU PIDs: {pids}")
-            return pids
-            
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"nvidia-smi failed (Code {e.returncode}). Is NVIDIA driver installed? Output: {e.stderr.strip()}")
-        except FileNotFoundError:
-            logger.critical("nvidia-smi not found. Ensure it is in PATH.")
-        except subprocess.TimeoutExpired:
-            logger.error("nvidia-smi timed out. GPU might be unresponsive.")
-        except Exception as e:
-            logger.error(f"Error during PID detection: {e}")
-            
-        return []
+        pids = [process.pid for process in self._get_gpu_processes()]
+        logger.debug("Detected GPU PIDs: %s (via %s)", pids, self.process_source.name)
+        return pids
 
+    def _matches(self, pid: int, names: List[str]) -> bool:
+        """Checks a process's executable name against a list (case-insensitive)."""
+        if not names:
+            return False
+        entry = self.registry.get(pid)
+        return entry is not None and self.registry.name(entry[0]).lower() in names
+
+    def _select_processes(self) -> List[int]:
+        """
+        Applies the never/always-suspend lists and, in selective mode,
+        picks only the heaviest GPU consumers.
+        """
+        processes = self._get_gpu_processes()
+        if self.settings is None:
+            return [p.pid for p in processes]
+
+        never = [name.lower() for name in self.settings.get('throttle_never_suspend')]
+        always = [name.lower() for name in self.settings.get('throttle_always_suspend')]
+        candidates = [p for p in processes if not self._matches(p.pid, never)]
+        if self.settings.get('throttle_selection') != 'selective':
+            return [p.pid for p in candidates]
+
+        forced = [p for p in candidates if self._matches(p.pid, always)]
+        chosen = self.selector.select([p for p in candidates if p not in forced],
+                                      self.settings.get('selective_shed_fraction'))
+        return [p.pid for p in forced + chosen]
+
+    @traced("throttler.control", arg="action")
     def _control_pids(self, pids: List[int], action: str):
         """
-        Suspends or resumes a list of processes using psutil.
+        Suspends or resumes a list of processes as one concurrent batch.
         :param pids: List of PIDs to control.
         :param action: 'suspend' or 'resume'.
         """
         if not self._is_admin:
-            logger.error(f"Cannot perform '{action}'. Missing admin rights.")
+            logger.error("Cannot perform '%s'. Missing admin rights.", action)
             return
 
-        for pid in pids:
-            try:
-                process = psutil.Process(pid)
-                if action == 'suspend':
-                    process.suspend()
-                    self.throttled_pids.append(pid)
-                    logger.debug(f"Suspended PID {pid} ({process.name()})")
-                elif action == 'resume':
-                    process.resume()
-                    if pid in self.throttled_pids:
-                        self.throttled_pids.remove(pid)
-                    logger.debug(f"Resumed PID {pid} ({process.name()})")
-            except psutil.NoSuchProcess:
-                logger.warning(f"Process with PID {pid} not found (already terminated).")
-            except psutil.AccessDenied:
-                logger.error(f"Access denied to PID {pid}. Cannot {action}.")
-            except Exception as e:
-                logger.error(f"Error during {action} of PID {pid}: {e}")
+        with self._lock:
+            if self._closed and action == 'suspend':
+                logger.warning("Throttler closed. Not suspending PIDs %s.", pids)
+                return
+            suspended = self.registry.suspended
+            keys, processes = [], []
+            for pid in pids:
+                entry = self.registry.get(pid)
+                if entry is None:
+                    logger.warning("Process with PID %d not found (already terminated).", pid)
+                    continue
+                key, process = entry
+                # Skip processes that are already suspended, and never resume
+                # something we did not suspend (e.g. a recycled PID)
+                if (key in suspended) == (action == 'suspend'):
+                    continue
+                keys.append(key)
+                processes.append(process)
+
+            results = self.batch.run(action, processes)
+
+            for key, error in zip(keys, results):
+                pid = key[0]
+                if error is None:
+                    if action == 'suspend':
+                        suspended.add(key)
+                    else:
+                        suspended.discard(key)
+                elif isinstance(error, psutil.NoSuchProcess):
+                    logger.warning("Process with PID %d not found (already terminated).", pid)
+                    self.registry.evict(pid)
+                elif isinstance(error, psutil.AccessDenied):
+                    logger.error("Access denied to PID %d. Cannot %s.", pid, action)
+                else:
+                    logger.error("Error during %s of PID %d: %s", action, pid, error)
+
+            if processes and logger.isEnabledFor(logging.DEBUG):
+                done = sum(1 for error in results if error is None)
+                logger.debug("%s: %d/%d process(es) %s, spread %.3f ms, total %.3f ms",
+                             action, done, len(processes), [k[0] for k in keys],
+                             (self.batch.last_spread_s or 0) * 1000, self.batch.last_duration_s * 1000)
 
     def suspend_gpu_processes(self):
         """
-        Finds all GPU processes and suspends them.
+        Finds GPU processes and suspends them (all of them, or the heaviest in selective mode).
         """
-        pids_to_throttle = self._get_gpu_pids()
+        self.last_discovery_s = self.last_suspend_s = None
+        pids_to_throttle = self._select_processes()
         if not pids_to_throttle:
             logger.info("No GPU processes found to suspend.")
             return
             
+        started = time.perf_counter()
         self._control_pids(pids_to_throttle, 'suspend')
+        self.last_suspend_s = time.perf_counter() - started
 
     def resume_all_processes(self):
         """
         Resumes all processes that were previously suspended by the throttler.
         """
-        if not self.throttled_pids:
+        if not self.registry.suspended:
             logger.info("No processes are currently suspended.")
             return
             
-        # Create a copy of the list to safely iterate and modify
-        pids_to_resume = self.throttled_pids[:]
-        self._control_pids(pids_to_resume, 'resume')
+        self._control_pids(self.throttled_pids, 'resume')
+        # Drop handles of processes that exited or left the GPU
+        self.registry.prune(self._get_gpu_pids())
         
     def emergency_kill(self):
         """
@@ -133,13 +216,38 @@ class Throttler:
             logger.info("No GPU processes found to kill.")
             return
             
-        logger.critical(f"PANIC MODE: Terminating PIDs: {pids_to_kill}")
+        logger.critical("PANIC MODE: Terminating PIDs: %s", pids_to_kill)
         for pid in pids_to_kill:
+            entry = self.registry.get(pid)
+            if entry is None:
+                continue
+            key, process = entry
             try:
-                process = psutil.Process(pid)
                 process.terminate()
-                logger.critical(f"Terminated PID {pid} ({process.name()})")
+                logger.critical("Terminated PID %d (%s)", pid, self.registry.name(key))
+                self.killed_total += 1
+                if key in self.registry.suspended:
+                    # A stopped (or frozen) process only acts on the termination once it runs again
+                    self.batch.run('resume', [process])
             except psutil.NoSuchProcess:
                 pass
             except Exception as e:
-                logger.error(f"Failed to kill PID {pid}: {e}")
\ No newline at end of file
+                logger.error("Failed to kill PID %d: %s", pid, e)
+            self.registry.evict(pid)
+
+        # Killed processes must not be served from the discovery cache
+        self.process_source.invalidate()
+
+    def close(self):
+        """
+        Resumes every process still suspended and releases the freezer's
+        resources (e.g. its cgroup). Later calls do nothing, and suspend
+        requests after it are ignored.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self.registry.suspended:
+                self._control_pids(self.throttled_pids, 'resume')
+            self.batch.shutdown()
\ No newline at end of file
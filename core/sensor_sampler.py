@@ -0,0 +1,176 @@
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import List, NamedTuple, Optional
+
+from core.clock import Clock
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class Sample(NamedTuple):
+    seq: int
+    timestamp: float  # Clock.monotonic() at the moment the reading completed
+    value: Optional[float]
+    sensor_id: str
+    duration: float = 0.0  # How long the reading took (clock seconds)
+
+
+class SampleRingBuffer:
+    """
+    Fixed-size, array-backed history of sensor readings.
+
+    There is a single writer (the sampler thread). Readers never take a lock:
+    they copy the slots they need and retry if the writer lapped them meanwhile.
+    Missing readings are stored as NaN and returned as None.
+    """
+
+    def __init__(self, capacity: int = 600):
+        self.capacity = capacity
+        self._timestamps = array('d', [0.0]) * capacity
+        self._values = array('d', [math.nan]) * capacity
+        self._sensor_ids: List[str] = [""] * capacity
+        self._durations = array('d', [0.0]) * capacity
+        self._count = 0  # Total number of samples ever written (publishes the slot)
+        self._wakeups = 0  # Bumped by wake_all() to release waiters without a new sample
+        self._new_sample = threading.Condition()
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest sample (0 if empty)."""
+        return self._count
+
+    def append(self, timestamp: float, value: Optional[float], sensor_id: str, duration: float = 0.0):
+        index = self._count % self.capacity
+        self._timestamps[index] = timestamp
+        self._values[index] = math.nan if value is None else value
+        self._sensor_ids[index] = sensor_id
+        self._durations[index] = duration
+        self._count += 1
+
+        with self._new_sample:
+            self._new_sample.notify_all()
+
+    def _read_slot(self, seq: int) -> Sample:
+        index = (seq - 1) % self.capacity
+        value = self._values[index]
+        return Sample(seq, self._timestamps[index], None if math.isnan(value) else value, self._sensor_ids[index],
+                      self._durations[index])
+
+    def latest(self) -> Optional[Sample]:
+        while True:
+            count = self._count
+            if count == 0:
+                return None
+            sample = self._read_slot(count)
+            # The writer only touches this slot again once it wraps around the whole buffer
+            if self._count - count < self.capacity - 1:
+                return sample
+
+    def snapshot(self, max_age_s: Optional[float] = None, limit: Optional[int] = None,
+                 now: Optional[float] = None) -> List[Sample]:
+        """
+        Returns the most recent samples in chronological order.
+        :param max_age_s: Only include samples newer than this.
+        :param limit: Maximum number of samples.
+        :param now: Current time on the sampler's clock (default: time.monotonic()).
+        """
+        while True:
+            count = self._count
+            n = min(count, self.capacity - 2, limit if limit is not None else count)
+            samples = [self._read_slot(seq) for seq in range(count - n + 1, count + 1)]
+            if self._count - (count - n + 1) < self.capacity - 1:
+                break
+
+        if max_age_s is not None:
+            cutoff = (time.monotonic() if now is None else now) - max_age_s
+            samples = [s for s in samples if s.timestamp >= cutoff]
+        return samples
+
+    def wait_for_new(self, after_seq: int, timeout: float) -> Optional[Sample]:
+        """
+        Blocks until a sample newer than after_seq is available.
+        :param timeout: Real (wall-clock) seconds.
+        :return: The latest sample, or None on timeout.
+        """
+        with self._new_sample:
+            wakeups = self._wakeups
+            self._new_sample.wait_for(lambda: self._count > after_seq or self._wakeups != wakeups, timeout=timeout)
+        return self.latest() if self._count > after_seq else None
+
+    def wake_all(self):
+        """Makes every wait_for_new() call return now (e.g. on shutdown)."""
+        with self._new_sample:
+            self._wakeups += 1
+            self._new_sample.notify_all()
+
+
+class SensorSampler:
+    """
+    Polls a sensor source on its own thread and records every reading
+    into a SampleRingBuffer.
+    """
+
+    def __init__(self, source, buffer: SampleRingBuffer, interval_s: float = 1.0, clock: Optional[Clock] = None):
+        """
+        :param source: Any object with get_vram_temp() -> (value, sensor_id), e.g. LHMClient.
+        """
+        self.source = source
+        self.buffer = buffer
+        self.interval_s = interval_s
+        self.clock = clock or Clock()
+        self.last_poll_duration_s: Optional[float] = None
+        self.poll_latency = Histogram()
+
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SensorSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def set_interval(self, interval_s: float):
+        """
+        Changes the polling rate. The next poll is due interval_s after the
+        start of the last one; a shorter interval only polls at once if that
+        time has already passed, so small changes never add polls.
+        """
+        shorter = interval_s < self.interval_s
+        self.interval_s = interval_s
+        if shorter:
+            self._wake_event.set()  # The sampler recomputes when the next poll is due
+
+    def _run(self):
+        logger.info("Sensor sampler started.")
+        while not self._stop_event.is_set():
+            started = self.clock.monotonic()
+            try:
+                value, sensor_id = self.source.get_vram_temp()
+            except Exception as e:
+                value, sensor_id = None, str(e)
+            finished = self.clock.monotonic()
+            self.last_poll_duration_s = finished - started
+            self.poll_latency.observe(self.last_poll_duration_s)
+            self.buffer.append(finished, value, sensor_id, self.last_poll_duration_s)
+
+            # Sleep until started + interval_s, re-evaluated whenever the interval changes
+            while not self._stop_event.is_set():
+                remaining = started + self.interval_s - self.clock.monotonic()
+                if remaining <= 0:
+                    break
+                self._wake_event.wait(self.clock.to_real(remaining))
+                self._wake_event.clear()
+        logger.info("Sensor sampler stopped.")
@@ -0,0 +1,220 @@
+import logging
+import os
+import re
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from core.clock import Clock
+
+logger = logging.getLogger(__name__)
+
+
+class SensorsNotReadyError(Exception):
+    """The sensor backend is up but has not enumerated its sensors yet."""
+
+
+class SensorSource:
+    """
+    Where VRAM temperatures come from. VRAMGuardCore calls check_and_start()
+    from its control loop and its SensorSampler polls get_vram_temp().
+    """
+
+    name = "base"
+
+    def check_and_start(self) -> bool:
+        """
+        Makes sure the backend is available (starting it if needed).
+        :return: False if no readings can be taken right now.
+        """
+        return True
+
+    def get_vram_temp(self) -> Tuple[Optional[float], str]:
+        """
+        :return: (temperature in °C or None, sensor name or error text).
+        """
+        raise NotImplementedError
+
+    def list_gpus(self) -> List[Tuple[str, str]]:
+        """
+        GPUs with their own VRAM sensor as (hardware id, name). An empty list
+        means a single sensor, read through get_vram_temp().
+        :raises SensorsNotReadyError: The backend cannot tell yet (e.g. its sensor tree is still empty).
+        """
+        return []
+
+    def get_gpu_temp(self, hardware_id: str) -> Tuple[Optional[float], str]:
+        return self.get_vram_temp()
+
+    def stop(self):
+        pass
+
+
+def _natural_key(path: Path):
+    # hwmon2 before hwmon10
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path.name)]
+
+
+class HwmonSensorSource(SensorSource):
+    """
+    Reads the VRAM temperature straight from Linux hwmon sysfs (e.g. the
+    'mem' sensor of amdgpu). The *_input file is kept open and every poll
+    is a single pread(), without a helper process or HTTP.
+    """
+
+    name = "hwmon"
+    LABEL_KEYWORDS = ("vram", "mem")  # Matched against temp*_label, in order of preference
+    READ_SIZE = 32
+
+    def __init__(self, root: Path = Path("/sys/class/hwmon"), sensor_path: Optional[Path] = None):
+        """
+        :param root: Directory holding the hwmon* devices.
+        :param sensor_path: A temp*_input file to use instead of searching by label.
+        """
+        self.root = Path(root)
+        self.sensor_path = Path(sensor_path) if sensor_path else None
+        self._fd: Optional[int] = None
+        self._sensor_name = ""
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read_text(path: Path) -> str:
+        try:
+            return path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return ""
+
+    def _resolve(self) -> Optional[Tuple[Path, str]]:
+        """Finds the VRAM sensor: (temp*_input path, display name)."""
+        if self.sensor_path is not None:
+            return self.sensor_path, self.sensor_path.name
+
+        candidates = []
+        for device in sorted(self.root.glob("hwmon*"), key=_natural_key):
+            chip = self._read_text(device / "name") or device.name
+            for label_file in sorted(device.glob("temp*_label"), key=_natural_key):
+                label = self._read_text(label_file)
+                input_file = label_file.with_name(label_file.name.replace("_label", "_input"))
+                for rank, keyword in enumerate(self.LABEL_KEYWORDS):
+                    if keyword in label.lower() and input_file.exists():
+                        candidates.append((rank, input_file, f"{chip} {label}"))
+                        break
+        if not candidates:
+            return None
+        _, path, name = min(candidates, key=lambda c: c[0])
+        return path, name
+
+    def _open(self) -> bool:
+        with self._lock:
+            if self._fd is not None:
+                return True
+            resolved = self._resolve()
+            if resolved is None:
+                return False
+            path, name = resolved
+            try:
+                self._fd = os.open(path, os.O_RDONLY)
+            except OSError as e:
+                logger.warning(f"Cannot open hwmon sensor {path}: {e}")
+                return False
+            self._sensor_name = name
+            logger.info(f"Using hwmon sensor '{name}' ({path})")
+            return True
+
+    def _close(self):
+        with self._lock:
+            if self._fd is not None:
+                try: os.close(self._fd)
+                except OSError: pass
+                self._fd = None
+
+    def check_and_start(self) -> bool:
+        return self._open()
+
+    def get_vram_temp(self) -> Tuple[Optional[float], str]:
+        if self._fd is None and not self._open():
+            return None, "Not Found"
+        try:
+            raw = os.pread(self._fd, self.READ_SIZE, 0)
+            return int(raw) / 1000.0, self._sensor_name  # hwmon reports millidegrees
+        except (OSError, ValueError, TypeError) as e:
+            # Device gone (e.g. GPU reset): resolve again on the next poll
+            self._close()
+            return None, str(e)
+
+    def stop(self):
+        self._close()
+
+
+class ReplaySensorSource(SensorSource):
+    """
+    Plays back a recorded temperature trace against the clock, for
+    reproducing incidents and for testing without hardware.
+    """
+
+    name = "replay"
+
+    def __init__(self, points: List[Tuple[float, Optional[float]]], clock: Optional[Clock] = None, loop: bool = True):
+        """
+        :param points: (time in seconds, temperature or None) pairs; times may have any origin.
+        :param loop: Start over at the end of the trace instead of reporting no data.
+        """
+        if not points:
+            raise ValueError("Replay trace is empty")
+        points = sorted(points, key=lambda p: p[0])
+        origin = points[0][0]
+        self._times = [t - origin for t, _ in points]
+        self._temps = [temp for _, temp in points]
+        self.duration = self._times[-1]
+        self.clock = clock or Clock()
+        self.loop = loop
+        self._started: Optional[float] = None
+
+    @classmethod
+    def load(cls, path: Path, clock: Optional[Clock] = None, loop: bool = True, gpu: int = 0) -> "ReplaySensorSource":
+        """Reads a CSV trace (seconds,temperature) or a telemetry history file (see core.telemetry)."""
+        path = Path(path)
+        if path.suffix.lower() == ".csv":
+            points = []
+            for line in path.read_text(encoding="utf-8").splitlines():
+                fields = [f.strip() for f in line.split(",")]
+                try:
+                    points.append((float(fields[0]), float(fields[1]) if len(fields) > 1 and fields[1] else None))
+                except ValueError:
+                    continue  # Header or comment
+        else:
+            from core.telemetry import TelemetryStore
+            store = TelemetryStore(path, readonly=True)
+            try:
+                points = [(r.timestamp, r.temp) for r in store.read(gpu=gpu)]
+            finally:
+                store.close()
+        logger.info(f"Replaying {len(points)} readings from {path}")
+        return cls(points, clock, loop)
+
+    def get_vram_temp(self) -> Tuple[Optional[float], str]:
+        now = self.clock.monotonic()
+        if self._started is None:
+            self._started = now
+        offset = now - self._started
+        if offset > self.duration:
+            if not self.loop:
+                return None, "Replay finished"
+            offset = offset % self.duration if self.duration > 0 else 0.0
+        return self._temps[bisect_right(self._times, offset) - 1], "Replay"
+
+
+def create_sensor_source(settings, project_root: Path, clock: Optional[Clock] = None) -> SensorSource:
+    """
+    Builds the backend selected by the 'sensor_source' setting (LHM by default).
+    """
+    kind = settings.get('sensor_source')
+    if kind == 'hwmon':
+        sensor_path = settings.get('hwmon_sensor_path')
+        return HwmonSensorSource(sensor_path=Path(sensor_path) if sensor_path else None)
+    if kind == 'replay':
+        return ReplaySensorSource.load(Path(settings.get('replay_trace_path')), clock)
+
+    from core.lhm_client import LHMClient  # Imports this module
+    return LHMClient(project_root, settings.get('lhm_sha256'), settings.get('lhm_offline_package') or None)
@@ -0,0 +1,276 @@
+"""
+Binary telemetry history.
+
+Every record is a fixed 20-byte struct in a memory-mapped ring file, so the
+history stays a constant size on disk and can be queried while VRAM Guard
+is running.
+
+Usage: python -m core.telemetry [--file vram_telemetry.bin] [--last 8h] [--threshold 92] [--gpu 1] [--json]
+"""
+import argparse
+import json
+import logging
+import math
+import mmap
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from core.throttle_controller import ThrottleState
+
+logger = logging.getLogger(__name__)
+
+# On-disk codes; never renumber
+STATE_CODES = {ThrottleState.IDLE: 0, ThrottleState.SUSPENDED: 1, ThrottleState.WORKING: 2, ThrottleState.PANIC: 3}
+CODE_STATES = {code: state for state, code in STATE_CODES.items()}
+
+
+class TelemetryRecord(NamedTuple):
+    seq: int
+    timestamp: float  # Seconds since the epoch
+    gpu: int
+    temp: Optional[float]
+    state: ThrottleState
+    duty: Optional[float]  # Latest duty cycle (PI output or achieved duty), if known
+    suspended: int  # Number of processes suspended at this moment
+
+
+class TelemetryStore:
+    """
+    Append-only ring of fixed-size records in a memory-mapped file.
+
+    The header holds the total number of records ever written; record n lives
+    in slot n % capacity. The count is updated after the record, so readers
+    (also in other processes) only see complete records and drop any slot the
+    writer may have overwritten while they were copying.
+    """
+
+    MAGIC = b"VGTM"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHIQ")  # magic, version, record size, capacity, records written
+    COUNT_OFFSET = 12
+    HEADER_SIZE = 32
+    RECORD = struct.Struct("<dffBBH")  # timestamp, temp, duty, state, gpu, suspended
+
+    def __init__(self, path: Path, capacity: int = 86400, readonly: bool = False):
+        """
+        :param capacity: Number of records kept (ignored when opening read-only).
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        if readonly:
+            self._file = open(self.path, "rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size, self.capacity, _ = self.HEADER.unpack_from(self._mm, 0)
+            if magic != self.MAGIC or version != self.VERSION or record_size != self.RECORD.size:
+                self.close()
+                raise ValueError(f"{self.path} is not a VRAM Guard telemetry file")
+            return
+
+        self.capacity = capacity
+        size = self.HEADER_SIZE + capacity * self.RECORD.size
+        if not self._matches_layout(size):
+            if self.path.exists():
+                logger.info(f"Telemetry layout changed. Starting a new history in {self.path}.")
+            with open(self.path, "wb") as f:
+                f.truncate(size)
+                f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.RECORD.size, capacity, 0))
+
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    def _matches_layout(self, size: int) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(self.HEADER.size)
+                f.seek(0, 2)
+                if f.tell() != size:
+                    return False
+            magic, version, record_size, capacity, _ = self.HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        return (magic, version, record_size, capacity) == (self.MAGIC, self.VERSION, self.RECORD.size, self.capacity)
+
+    @property
+    def count(self) -> int:
+        """Total number of records ever written."""
+        return struct.unpack_from("<Q", self._mm, self.COUNT_OFFSET)[0]
+
+    def append(self, timestamp: float, gpu: int, temp: Optional[float], state: ThrottleState,
+               duty: Optional[float], suspended: int):
+        with self._lock:
+            count = self.count
+            offset = self.HEADER_SIZE + (count % self.capacity) * self.RECORD.size
+            self.RECORD.pack_into(self._mm, offset, timestamp,
+                                  math.nan if temp is None else temp,
+                                  math.nan if duty is None else duty,
+                                  STATE_CODES[state], gpu, min(suspended, 0xFFFF))
+            struct.pack_into("<Q", self._mm, self.COUNT_OFFSET, count + 1)
+
+    def read(self, since: Optional[float] = None, until: Optional[float] = None,
+             gpu: Optional[int] = None) -> List[TelemetryRecord]:
+        """
+        Returns records in chronological order.
+        :param since: / until: Epoch timestamps bounding the window.
+        """
+        count = self.count
+        ring = bytes(self._mm[self.HEADER_SIZE:self.HEADER_SIZE + self.capacity * self.RECORD.size])
+        # Slots the writer may have reused while copying are no longer trustworthy
+        first = max(0, self.count - self.capacity + 1)
+
+        records = []
+        for seq in range(first, count):
+            timestamp, temp, duty, state, record_gpu, suspended = self.RECORD.unpack_from(
+                ring, (seq % self.capacity) * self.RECORD.size)
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp > until:
+                continue
+            if gpu is not None and record_gpu != gpu:
+                continue
+            records.append(TelemetryRecord(seq, timestamp, record_gpu,
+                                           None if math.isnan(temp) else temp,
+                                           CODE_STATES.get(state, ThrottleState.IDLE),
+                                           None if math.isnan(duty) else duty, suspended))
+        return records
+
+    def writer(self, gpu: int = 0, interval_s: float = 1.0) -> "TelemetryWriter":
+        return TelemetryWriter(self, gpu, interval_s)
+
+    def close(self):
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+
+class TelemetryWriter:
+    """
+    Records the state of one GPU at most every interval_s, plus every state change.
+    """
+
+    def __init__(self, store: TelemetryStore, gpu: int = 0, interval_s: float = 1.0):
+        self.store = store
+        self.gpu = gpu
+        self.interval_s = interval_s
+        self._last_time: Optional[float] = None
+        self._last_state: Optional[ThrottleState] = None
+
+    def record(self, timestamp: float, temp: Optional[float], state: ThrottleState,
+               duty: Optional[float], suspended: int):
+        if (state == self._last_state and self._last_time is not None
+                and timestamp - self._last_time < self.interval_s):
+            return
+        self.store.append(timestamp, self.gpu, temp, state, duty, suspended)
+        self._last_time = timestamp
+        self._last_state = state
+
+
+def _weighted_percentile(pairs: List[tuple], q: float) -> float:
+    """pairs: (value, weight) sorted by value."""
+    total = sum(w for _, w in pairs)
+    target = q * total
+    acc = 0.0
+    for value, weight in pairs:
+        acc += weight
+        if acc >= target:
+            return value
+    return pairs[-1][0]
+
+
+def summarize(records: List[TelemetryRecord], threshold: Optional[float] = None,
+              max_gap_s: float = 60.0) -> Dict[str, Optional[float]]:
+    """
+    Time-weighted statistics for the records of one GPU. Each record counts
+    until the next one, but at most max_gap_s (VRAM Guard was not running
+    during longer gaps).
+    """
+    durations = [min(max(0.0, b.timestamp - a.timestamp), max_gap_s) for a, b in zip(records, records[1:])]
+    durations.append(0.0)
+    pairs = [(r.temp, d) for r, d in zip(records, durations) if r.temp is not None]
+    if pairs and sum(d for _, d in pairs) == 0.0:
+        pairs = [(t, 1.0) for t, _ in pairs]
+
+    covered = sum(durations)
+    throttled = sum(d for r, d in zip(records, durations) if r.state != ThrottleState.IDLE)
+    suspended = sum(d for r, d in zip(records, durations) if r.state in (ThrottleState.SUSPENDED, ThrottleState.PANIC))
+    summary = {
+        "records": len(records),
+        "start": records[0].timestamp if records else None,
+        "end": records[-1].timestamp if records else None,
+        "covered_s": covered,
+        "min": None, "max": None, "mean": None, "p50": None, "p95": None, "p99": None,
+        "above_threshold_s": None,
+        "throttled_s": throttled,
+        "duty": (covered - suspended) / covered if covered else None,
+        "max_suspended": max((r.suspended for r in records), default=0),
+    }
+    if pairs:
+        weight = sum(w for _, w in pairs)
+        ordered = sorted(pairs)
+        summary.update({
+            "min": ordered[0][0],
+            "max": ordered[-1][0],
+            "mean": sum(t * w for t, w in pairs) / weight,
+            "p50": _weighted_percentile(ordered, 0.50),
+            "p95": _weighted_percentile(ordered, 0.95),
+            "p99": _weighted_percentile(ordered, 0.99),
+        })
+    if threshold is not None:
+        summary["above_threshold_s"] = sum(d for r, d in zip(records, durations)
+                                           if r.temp is not None and r.temp >= threshold)
+    return summary
+
+
+def _parse_duration(text: str) -> float:
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize VRAM Guard telemetry history.")
+    parser.add_argument("--file", default="vram_telemetry.bin", help="Telemetry file")
+    parser.add_argument("--last", default="24h", help="Window length, e.g. 90m, 8h, 2d")
+    parser.add_argument("--threshold", type=float, help="Report time at or above this temperature (°C)")
+    parser.add_argument("--gpu", type=int, help="Only this GPU")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    store = TelemetryStore(Path(args.file), readonly=True)
+    try:
+        records = store.read(since=time.time() - _parse_duration(args.last), gpu=args.gpu)
+    finally:
+        store.close()
+
+    by_gpu: Dict[int, List[TelemetryRecord]] = {}
+    for record in records:
+        by_gpu.setdefault(record.gpu, []).append(record)
+    summaries = {gpu: summarize(recs, args.threshold) for gpu, recs in sorted(by_gpu.items())}
+
+    if args.json:
+        print(json.dumps({str(gpu): s for gpu, s in summaries.items()}, indent=2))
+        return
+    if not summaries:
+        print(f"No records in the last {args.last}.")
+    for gpu, s in summaries.items():
+        start = datetime.fromtimestamp(s["start"]).strftime("%Y-%m-%d %H:%M:%S")
+        end = datetime.fromtimestamp(s["end"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"GPU{gpu}: {s['records']} records, {start} .. {end}")
+        if s["max"] is not None:
+            print(f"  VRAM °C   min {s['min']:.1f}  mean {s['mean']:.1f}  p50 {s['p50']:.1f}  "
+                  f"p95 {s['p95']:.1f}  p99 {s['p99']:.1f}  max {s['max']:.1f}")
+        if s["above_threshold_s"] is not None:
+            print(f"  >= {args.threshold:g}°C  {s['above_threshold_s']:.0f}s")
+        duty = f"{s['duty']:.1%}" if s["duty"] is not None else "n/a"
+        print(f"  throttled {s['throttled_s']:.0f}s of {s['covered_s']:.0f}s, duty {duty}, "
+              f"max suspended processes {s['max_suspended']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+import logging
+from enum import Enum
+from typing import Optional
+
+from core import events
+from core.duty_cycle_controller import PIDutyCycleController
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottleState(str, Enum):
+    IDLE = "idle"
+    SUSPENDED = "suspended"
+    WORKING = "working"
+    PANIC = "panic"
+
+
+class ThrottleController:
+    """
+    Pulse throttling state machine (IDLE -> SUSPENDED <-> WORKING, PANIC).
+
+    It never sleeps: the caller feeds it samples and deadline ticks via
+    update(), and waits at most time_to_deadline() between calls.
+
+    In 'pulse' mode the configured cool-down/work times are used and phases
+    end early or are extended based on the measured temperature. In 'pi' mode
+    a PIDutyCycleController sets the suspend/work split of every period to
+    hold VRAM just under T1.
+
+    pre_throttle() starts a short, gentle pulse before T1 is reached when a
+    temperature trend predicts a crossing.
+    """
+
+    PANIC_DURATION_S = 10.0  # Time allowed above T2 before emergency kill
+    MIN_COOL_DOWN_S = 0.5  # Shortest suspension before an early resume is allowed
+    DUTY_LOG_INTERVAL_S = 60.0  # How often the achieved duty cycle is logged
+
+    def __init__(self, settings, throttler, label: str = ""):
+        """
+        :param label: GPU name used in log records (empty on single-GPU systems).
+        """
+        self.settings = settings
+        self.throttler = throttler
+        self.label = label or "GPU0"
+        self.logger = logger.getChild(label) if label else logger
+
+        self.state = ThrottleState.IDLE
+        self.phase_start = 0.0
+        self.deadline: Optional[float] = None
+        self.panic_start_time: Optional[float] = None
+        self.last_temp: Optional[float] = None
+        self.duty_controller: Optional[PIDutyCycleController] = None
+        self._cool_time: Optional[float] = None  # Nominal length of the current suspension
+        self._suspend_temp: Optional[float] = None  # Temperature when the current suspension began
+
+        # Predicted vs. actual T1 crossings
+        self.predicted_crossings = 0
+        self.actual_crossings = 0
+        self.prediction_hits = 0  # Actual crossings that followed a prediction within the horizon
+        self._prediction_time: Optional[float] = None
+
+        # Achieved duty cycle: time processes were allowed to run vs. suspended
+        self.achieved_duty: Optional[float] = None
+        self._last_account_time: Optional[float] = None
+        self._window_work_s = 0.0
+        self._window_suspended_s = 0.0
+        self._window_start: Optional[float] = None
+
+        # Lifetime counters (exported as metrics)
+        self.suspended_s_total = 0.0
+        self.panic_count = 0
+
+    @property
+    def is_throttling(self) -> bool:
+        return self.state != ThrottleState.IDLE
+
+    def time_to_deadline(self, now: float) -> Optional[float]:
+        """Seconds until the current phase must be re-evaluated (None when idle)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - now)
+
+    def update(self, temp: Optional[float], now: float):
+        """
+        Advances the state machine.
+        :param temp: New reading, or None for a deadline tick without a new sample.
+        :param now: time.monotonic() timestamp.
+        """
+        self._account(now)
+        T1 = self.settings.get('vram_t1_threshold')
+        if temp is not None:
+            if self.last_temp is not None and self.last_temp < T1 <= temp:
+                self._count_crossing(now)
+            self.last_temp = temp
+        temp = self.last_temp
+        if temp is None:
+            return
+
+        if self._handle_panic(temp, now):
+            return
+
+        if self.settings.get('throttle_mode') == 'pi':
+            self._update_pi(temp, now, T1)
+        elif self.state == ThrottleState.IDLE:
+            if temp >= T1:
+                self._suspend(temp, now, "THROTTLING: %s°C >= %s°C. Suspending GPU processes...", temp, T1)
+        elif self.state == ThrottleState.SUSPENDED:
+            self._update_suspended(temp, now, T1)
+        elif self.state == ThrottleState.WORKING:
+            self._update_working(temp, now, T1)
+
+    def pre_throttle(self, temp: float, now: float, time_to_threshold_s: float, confidence: float) -> bool:
+        """
+        Starts a short suspension ahead of a predicted T1 crossing (pulse mode only).
+        :return: True if a pre-emptive throttle was started.
+        """
+        if self.state != ThrottleState.IDLE or self.settings.get('throttle_mode') == 'pi':
+            return False
+        self.predicted_crossings += 1
+        self._prediction_time = now
+        self._suspend(temp, now, "PREDICTIVE THROTTLING: %s°C, T1 expected in %.1fs (confidence %.2f). "
+                                 "Suspending GPU processes briefly...", temp, time_to_threshold_s, confidence,
+                      duration=self.settings.get('predictive_cool_down_time_s'))
+        return True
+
+    @property
+    def prediction_stats(self) -> dict:
+        return {
+            "predicted_crossings": self.predicted_crossings,
+            "actual_crossings": self.actual_crossings,
+            "prediction_hits": self.prediction_hits,
+        }
+
+    def _count_crossing(self, now: float):
+        self.actual_crossings += 1
+        if self._prediction_time is not None:
+            if now - self._prediction_time <= self.settings.get('predictive_horizon_s'):
+                self.prediction_hits += 1
+            self._prediction_time = None
+
+    def stop(self):
+        """Releases any suspended processes (e.g. on shutdown)."""
+        if self.state in (ThrottleState.SUSPENDED, ThrottleState.PANIC):
+            self.throttler.resume_all_processes()
+        self._enter(ThrottleState.IDLE, 0.0, None)
+
+    def _account(self, now: float):
+        """Accumulates run/suspended time and logs the achieved duty cycle periodically."""
+        if self._last_account_time is None:
+            self._last_account_time = self._window_start = now
+            return
+        elapsed = max(0.0, now - self._last_account_time)
+        self._last_account_time = now
+        if self.state in (ThrottleState.SUSPENDED, ThrottleState.PANIC):
+            self._window_suspended_s += elapsed
+            self.suspended_s_total += elapsed
+        else:
+            self._window_work_s += elapsed
+
+        window = now - self._window_start
+        if window >= self.DUTY_LOG_INTERVAL_S:
+            if self._window_suspended_s > 0:
+                self.achieved_duty = self._window_work_s / window
+                pi_info = f", PI output {self.duty_controller.duty:.0%}" if self.duty_controller else ""
+                self.logger.info("Duty cycle over last %.0fs: %.0f%% (suspended %.1fs%s, VRAM %s°C)",
+                                 window, self.achieved_duty * 100, self._window_suspended_s, pi_info, self.last_temp)
+            else:
+                self.achieved_duty = None
+            self._window_work_s = self._window_suspended_s = 0.0
+            self._window_start = now
+
+    def _enter(self, state: ThrottleState, now: float, deadline: Optional[float]):
+        if (self.state == ThrottleState.IDLE) != (state == ThrottleState.IDLE):
+            events.emit("throttle_start" if self.state == ThrottleState.IDLE else "throttle_stop",
+                        gpu=self.label, temp=self.last_temp, state=state.value,
+                        mode=self.settings.get('throttle_mode'))
+        self.state = state
+        self.phase_start = now
+        self.deadline = deadline
+
+    def _handle_panic(self, temp: float, now: float) -> bool:
+        """
+        Monitors T2 threshold and performs emergency kill if necessary.
+        :return: True if the panic logic handled this update.
+        """
+        T2 = self.settings.get('vram_t2_panic_threshold')
+
+        if temp >= T2:
+            if self.state != ThrottleState.PANIC:
+                self.panic_start_time = now
+                if self.state != ThrottleState.SUSPENDED:
+                    self.throttler.suspend_gpu_processes()
+                self.logger.critical("CRITICAL: VRAM %s°C >= T2 %s°C! Panic timer started.", temp, T2)
+                events.emit("panic_start", gpu=self.label, temp=temp, t2=T2)
+                self._enter(ThrottleState.PANIC, now, now + self.PANIC_DURATION_S)
+
+            elapsed = now - self.panic_start_time
+            if elapsed >= self.PANIC_DURATION_S:
+                self.logger.critical("PANIC ACTIVATED: VRAM at %s°C for %.1fs. Killing processes!", temp, elapsed)
+                self.panic_count += 1
+                self.throttler.emergency_kill()
+                events.emit("panic_kill", gpu=self.label, temp=temp, elapsed_s=round(elapsed, 3))
+                # Release whatever survived; the next sample decides whether to throttle again
+                self.throttler.resume_all_processes()
+                self.panic_start_time = None
+                self._enter(ThrottleState.IDLE, now, None)
+            return True
+
+        if self.state == ThrottleState.PANIC:
+            self.logger.info("Panic aborted. VRAM cooled down to %s°C.", temp)
+            events.emit("panic_abort", gpu=self.label, temp=temp)
+            self.panic_start_time = None
+            # Processes are still suspended: continue with a regular cool-down
+            self._cool_time = self.settings.get('cool_down_time_s')
+            self._suspend_temp = temp
+            self._enter(ThrottleState.SUSPENDED, now, now + self._cool_time)
+            return True
+        return False
+
+    def _suspend(self, temp: float, now: float, message: str, *args, duration: Optional[float] = None):
+        """
+        :param message: Log format string with its args, formatted only after the processes are suspended.
+        """
+        COOL_TIME = self.settings.get('cool_down_time_s') if duration is None else duration
+        self.throttler.suspend_gpu_processes()
+        self.logger.warning(message, *args)
+        self._cool_time = COOL_TIME
+        self._suspend_temp = temp
+        self._enter(ThrottleState.SUSPENDED, now, now + COOL_TIME)
+
+    def _resume(self, now: float, message: str, *args, duration: Optional[float] = None):
+        WORK_TIME = self.settings.get('work_time_s') if duration is None else duration
+        self.throttler.resume_all_processes()
+        self.logger.info(message + " Resuming work for %.1fs...", *args, WORK_TIME)
+        self._enter(ThrottleState.WORKING, now, now + WORK_TIME)
+
+    def _update_suspended(self, temp: float, now: float, T1: float):
+        COOL_TIME = self._cool_time if self._cool_time is not None else self.settings.get('cool_down_time_s')
+        MAX_COOL_TIME = max(COOL_TIME, self.settings.get('max_cool_down_time_s'))
+        hysteresis = self.settings.get('throttle_hysteresis_c')
+        elapsed = now - self.phase_start
+
+        # Early resume once clearly below T1 and below where the suspension started
+        # (a predictive suspension starts below T1 already)
+        if temp <= min(T1, self._suspend_temp) - hysteresis and elapsed >= self.MIN_COOL_DOWN_S:
+            self._resume(now, "Resume: VRAM cooled to %s°C after %.1fs.", temp, elapsed)
+        elif temp < T1 and elapsed >= COOL_TIME:
+            self._resume(now, "Resume: Cooling phase over.")
+        elif now >= self.deadline:
+            if temp >= T1 and self.deadline < self.phase_start + MAX_COOL_TIME:
+                # Still hot: keep processes suspended up to the maximum cool-down
+                self.logger.info("VRAM still at %s°C after %.1fs. Extending cool-down up to %ss.",
+                                 temp, elapsed, MAX_COOL_TIME)
+                self.deadline = self.phase_start + MAX_COOL_TIME
+            else:
+                self._resume(now, "Resume: Cooling phase over.")
+
+    def _update_working(self, temp: float, now: float, T1: float):
+        hysteresis = self.settings.get('throttle_hysteresis_c')
+
+        if temp >= T1 + hysteresis:
+            self._suspend(temp, now, "THROTTLING: %s°C during work phase. Suspending GPU processes early...", temp)
+        elif now >= self.deadline:
+            if temp >= T1:
+                self._suspend(temp, now, "THROTTLING: %s°C >= %s°C. Suspending GPU processes...", temp, T1)
+            else:
+                self.logger.info("VRAM at %s°C, below T1 %s°C. Throttling stopped.", temp, T1)
+                self._enter(ThrottleState.IDLE, now, None)
+
+    def _update_pi(self, temp: float, now: float, T1: float):
+        setpoint = T1 - self.settings.get('pi_setpoint_margin_c')
+        period = self.settings.get('pi_period_s')
+
+        if self.state == ThrottleState.IDLE:
+            if temp < setpoint:
+                return
+            COOL_TIME = self.settings.get('cool_down_time_s')
+            WORK_TIME = self.settings.get('work_time_s')
+            # Start from the pulse-mode ratio and let the controller adjust from there
+            self.duty_controller = PIDutyCycleController(
+                self.settings.get('pi_kp'), self.settings.get('pi_ki'),
+                self.settings.get('pi_min_duty'), self.settings.get('pi_max_duty'),
+                WORK_TIME / (COOL_TIME + WORK_TIME)
+            )
+            self.duty_controller.update(temp, setpoint, now)
+            self._start_pi_cycle(temp, now, setpoint, period)
+            return
+
+        if self.duty_controller is None:
+            # Entered from panic: begin with the most conservative duty cycle
+            min_duty = self.settings.get('pi_min_duty')
+            self.duty_controller = PIDutyCycleController(
+                self.settings.get('pi_kp'), self.settings.get('pi_ki'),
+                min_duty, self.settings.get('pi_max_duty'), min_duty
+            )
+        duty = self.duty_controller.update(temp, setpoint, now)
+        if now < self.deadline:
+            return
+
+        if self.state == ThrottleState.SUSPENDED:
+            self._resume(now, "Resume (PI): duty %.0f%%, VRAM %s°C.", duty * 100, temp, duration=duty * period)
+        elif self.state == ThrottleState.WORKING:
+            hysteresis = self.settings.get('throttle_hysteresis_c')
+            if self.duty_controller.is_saturated_high and temp < setpoint - hysteresis:
+                self.logger.info("VRAM at %s°C, well below setpoint %s°C. Throttling stopped.", temp, setpoint)
+                self.duty_controller = None
+                self._enter(ThrottleState.IDLE, now, None)
+            else:
+                self._start_pi_cycle(temp, now, setpoint, period)
+
+    def _start_pi_cycle(self, temp: float, now: float, setpoint: float, period: float):
+        duty = self.duty_controller.duty
+        cool_time = (1.0 - duty) * period
+        if cool_time < self.MIN_COOL_DOWN_S:
+            # Thermals allow (almost) full duty: keep working for another period
+            self._enter(ThrottleState.WORKING, now, now + period)
+            return
+        self._suspend(temp, now, "THROTTLING (PI): %s°C, setpoint %s°C. Suspending GPU processes for %.1fs "
+                                 "(duty %.0f%%)...", temp, setpoint, cool_time, duty * 100, duration=cool_time)
@@ -0,0 +1,133 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Span(NamedTuple):
+    name: str
+    start: float  # time.perf_counter()
+    duration: float
+    thread: str
+    args: Optional[dict]
+
+
+class Tracer:
+    """
+    Records timed spans of the hot path (LHM polls, GPU process discovery,
+    suspend/resume) into a bounded in-memory ring. Disabled by default; a
+    disabled span costs one attribute check.
+    """
+
+    def __init__(self, capacity: int = 20000):
+        self.enabled = False
+        self.spans: Deque[Span] = deque(maxlen=capacity)
+        self.events: Deque[Span] = deque(maxlen=1000)  # Instant events (e.g. reaction breakdowns)
+
+    def record(self, name: str, start: float, duration: float, args: Optional[dict] = None):
+        self.spans.append(Span(name, start, duration, threading.current_thread().name, args))
+
+    def event(self, name: str, args: Optional[dict] = None):
+        if self.enabled:
+            self.events.append(Span(name, time.perf_counter(), 0.0, threading.current_thread().name, args))
+
+    def export_chrome(self, path: Path):
+        """Writes the recorded spans in Chrome trace format (chrome://tracing, Perfetto)."""
+        threads: Dict[str, int] = {}
+        trace = []
+        for phase, spans in (("X", list(self.spans)), ("i", list(self.events))):
+            for span in spans:
+                entry = {"name": span.name, "ph": phase, "ts": span.start * 1e6, "pid": 1,
+                         "tid": threads.setdefault(span.thread, len(threads) + 1), "args": span.args or {}}
+                if phase == "X":
+                    entry["dur"] = span.duration * 1e6
+                else:
+                    entry["s"] = "g"  # Global instant event
+                trace.append(entry)
+        trace.extend({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                     for name, tid in threads.items())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+def traced(name: str, arg: Optional[str] = None):
+    """
+    Decorator recording a span around every call while tracing is enabled.
+    :param arg: Name of a parameter whose value is stored with the span.
+    """
+    def decorator(func):
+        position = list(inspect.signature(func).parameters).index(arg) if arg else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                span_args = None
+                if arg:
+                    value = kwargs.get(arg, args[position] if position < len(args) else None)
+                    span_args = {arg: value}
+                tracer.record(name, started, time.perf_counter() - started, span_args)
+        return wrapper
+    return decorator
+
+
+class ReactionBreakdown(NamedTuple):
+    """Real seconds from the last reading below T1 until the GPU processes were frozen."""
+    poll_wait_s: float  # Idle time between the previous reading and the poll that saw the crossing
+    sensor_read_s: float  # HTTP fetch + parse of that poll
+    handoff_s: float  # Sample published -> control loop acting on it
+    discovery_s: float  # GPU process discovery
+    suspend_s: float  # Suspend batch
+    total_s: float
+    temp: float
+
+    def describe(self) -> str:
+        return (f"{self.total_s * 1000:.1f} ms (wait {self.poll_wait_s * 1000:.1f}, "
+                f"sensor {self.sensor_read_s * 1000:.1f}, handoff {self.handoff_s * 1000:.1f}, "
+                f"discovery {self.discovery_s * 1000:.1f}, suspend {self.suspend_s * 1000:.2f})")
+
+
+class ReactionStats:
+    """
+    Rolling window of reaction breakdowns with per-component percentiles.
+    """
+
+    COMPONENTS = ("poll_wait_s", "sensor_read_s", "handoff_s", "discovery_s", "suspend_s", "total_s")
+
+    def __init__(self, window: int = 200):
+        self.events: Deque[ReactionBreakdown] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, breakdown: ReactionBreakdown):
+        self.events.append(breakdown)
+        self.count += 1
+
+    @staticmethod
+    def _percentile(values: List[float], q: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{component: {"p50": s, "p95": s, "p99": s}} over the window (empty without events)."""
+        events = list(self.events)
+        if not events:
+            return {}
+        return {
+            component: {f"p{int(q * 100)}": self._percentile([getattr(e, component) for e in events], q)
+                        for q in (0.50, 0.95, 0.99)}
+            for component in self.COMPONENTS
+        }
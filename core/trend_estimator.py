@@ -0,0 +1,48 @@
+import logging
+from typing import List, NamedTuple, Optional
+
+from core.sensor_sampler import Sample
+
+logger = logging.getLogger(__name__)
+
+
+class TrendEstimate(NamedTuple):
+    slope_c_per_s: float
+    confidence: float  # Coefficient of determination (R²) of the linear fit
+    fitted_temp: float  # Fitted temperature at the newest sample
+    time_to_threshold_s: Optional[float]  # None if not heading towards the threshold
+
+
+class TrendEstimator:
+    """
+    Least-squares linear fit over the most recent samples, used to predict
+    when VRAM will cross a threshold.
+    """
+
+    def __init__(self, min_samples: int = 4):
+        self.min_samples = min_samples
+
+    def estimate(self, samples: List[Sample], threshold: float) -> Optional[TrendEstimate]:
+        points = [(s.timestamp, s.value) for s in samples if s.value is not None]
+        n = len(points)
+        if n < self.min_samples:
+            return None
+
+        t0 = points[-1][0]
+        mean_t = sum(t - t0 for t, _ in points) / n
+        mean_v = sum(v for _, v in points) / n
+        s_tt = sum((t - t0 - mean_t) ** 2 for t, _ in points)
+        if s_tt <= 0.0:
+            return None
+        s_tv = sum((t - t0 - mean_t) * (v - mean_v) for t, v in points)
+        s_vv = sum((v - mean_v) ** 2 for _, v in points)
+
+        slope = s_tv / s_tt
+        fitted = mean_v + slope * (0.0 - mean_t)
+        # A flat, noise-free series fits perfectly but predicts nothing
+        confidence = (s_tv * s_tv) / (s_tt * s_vv) if s_vv > 0.0 else 0.0
+
+        time_to_threshold = None
+        if slope > 0.0:
+            time_to_threshold = max(0.0, (threshold - fitted) / slope)
+        return TrendEstimate(slope, confidence, fitted, time_to_threshold)
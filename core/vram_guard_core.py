@@ -1,9 +1,25 @@
 import logging
 import time
-from typing import Optional
+from typing import Callable, List, NamedTuple, Optional
+
+from core import events
+from core.clock import Clock
+from core.metrics import Histogram
+from core.poll_scheduler import PollScheduler
+from core.sensor_sampler import SampleRingBuffer, SensorSampler
+from core.throttle_controller import ThrottleController, ThrottleState
+from core.tracing import ReactionBreakdown, ReactionStats, tracer
+from core.trend_estimator import TrendEstimate, TrendEstimator
 
 logger = logging.getLogger(__name__)
 
+
+class GpuStatus(NamedTuple):
+    label: str
+    temp: Optional[float]
+    state: ThrottleState
+
+
 class VRAMGuardCore:
     """
     The main logic core for VRAM Guard v1.4.1.
@@ -12,117 +28,300 @@ class VRAMGuardCore:
     """
     
     # --- CONSTANTS ---
-    PANIC_DURATION_S = 10.0  # Time allowed above T2 before emergency kill
+    SAMPLE_HISTORY_SIZE = 600  # Ring buffer capacity (10 minutes at 1 Hz)
+    SENSOR_RETRY_INTERVAL_S = 2.0  # Sampling rate while waiting for the sensor to appear
+    REACTION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
     
-    def __init__(self, settings, license_manager, lhm_client, throttler):
+    def __init__(self, settings, license_manager, sensor_source, throttler, clock: Optional[Clock] = None,
+                 sensor=None, label: str = "", telemetry=None, launched_at: Optional[float] = None):
         """
         Initializes the core with required components.
+        :param clock: Time source (a ScaledClock lets simulations run faster than real time).
+        :param sensor_source: SensorSource backend (LHM, hwmon, replay).
+        :param sensor: Object with get_vram_temp() to sample (default: sensor_source itself).
+        :param label: GPU name for logs and the UI when one core runs per GPU.
+        :param telemetry: TelemetryWriter for the binary history (optional).
+        :param launched_at: Wall-clock time the application started, for the time-to-first-reading metric (default: now).
         """
         self.settings = settings
+        self.config = settings.snapshot()  # Settings in effect for the current cycle
         self.license_manager = license_manager
-        self.lhm_client = lhm_client
+        self.sensor_source = sensor_source
         self.throttler = throttler
+        self.clock = clock or Clock()
+        self.label = label
+        self.telemetry = telemetry
+        self.logger = logger.getChild(label) if label else logger
+
+        # Sensor readings are taken on a dedicated thread and shared through the buffer
+        self.samples = SampleRingBuffer(self.SAMPLE_HISTORY_SIZE)
+        self.sampler = SensorSampler(sensor or sensor_source, self.samples, clock=self.clock)
+
+        # Suspend/work/panic decisions are made by a deadline-driven state machine
+        self.controller = ThrottleController(self.config, throttler, label)
+        self.trend = TrendEstimator()
+        self.poll_scheduler = PollScheduler(self.config)
+
+        # Time from the last cool reading to the GPU processes being frozen, per throttle event
+        self.reactions = ReactionStats()
+        self.reaction_latency = Histogram(self.REACTION_BUCKETS)
         
         # State variables
         self.is_running = True
-        self.is_throttling = False
-        self.current_temp: Optional[float] = None
-        self.panic_start_time: Optional[float] = None
+        self.paused = False  # Protection paused: keep sampling, never throttle
+        self.max_temp: Optional[float] = None  # Highest reading since start
+        self.launched_at = launched_at if launched_at is not None else time.time()
+        self.time_to_first_reading: Optional[float] = None
+
+        # Called (on the core thread) when the displayed temperature or the state changes
+        self._listeners: List[Callable[[], None]] = []
+        self._shown = None
         self.first_run = True
+        self._linked = False  # Readings are arriving (for sensor_link_up/down events)
+
+    @property
+    def state(self) -> ThrottleState:
+        return self.controller.state
+
+    @property
+    def is_throttling(self) -> bool:
+        return self.controller.is_throttling
+
+    @property
+    def current_temp(self) -> Optional[float]:
+        """Latest VRAM reading from the sample buffer (shared with the UI)."""
+        sample = self.samples.latest()
+        return sample.value if sample else None
+
+    @property
+    def gpu_states(self) -> List[GpuStatus]:
+        """Per-GPU temperature and throttle state (a single entry here)."""
+        return [GpuStatus(self.label or "VRAM", self.current_temp, self.state)]
+
+    @property
+    def prediction_stats(self) -> dict:
+        """Predicted vs. actual T1 crossings."""
+        return self.controller.prediction_stats
 
-    def _handle_panic_mode(self, temp: float):
+    def _estimate_trend(self, temp: float, now: float) -> Optional[TrendEstimate]:
+        """Heating trend below T1 (None while throttling or without enough readings)."""
+        T1 = self.config.get('vram_t1_threshold')
+        if self.controller.is_throttling or temp >= T1:
+            return None
+        samples = self.samples.snapshot(max_age_s=self.config.get('predictive_window_s'), now=now)
+        return self.trend.estimate(samples, T1)
+
+    def _check_prediction(self, temp: float, now: float, estimate: Optional[TrendEstimate]):
         """
-        Monitors T2 threshold and performs emergency kill if necessary.
+        Predictive throttling: starts a short throttle early if the fitted
+        trend crosses T1 within the horizon.
         """
-        T2 = self.settings.get('vram_t2_panic_threshold')
-        
-        if temp >= T2:
-            if self.panic_start_time is None:
-                self.panic_start_time = time.time()
-                logger.critical(f"CRITICAL: VRAM {temp}°C >= T2 {T2}°C! Panic timer started.")
-                
-            elapsed = time.time() - self.panic_start_time
-            if elapsed >= self.PANIC_DURATION_S:
-                logger.critical(f"PANIC ACTIVATED: VRAM at {temp}°C for {elapsed:.1f}s. Killing processes!")
-                self.throttler.emergency_kill()
-                # We don't stop the core, but we reset the timer
-                self.panic_start_time = None
-        else:
-            if self.panic_start_time is not None:
-                logger.info(f"Panic aborted. VRAM cooled down to {temp}°C.")
-                self.panic_start_time = None
-
-    def _perform_throttling_cycle(self, temp: float):
-        """
-        Executes one cycle of Suspend -> Sleep -> Resume -> Sleep.
-        """
-        T1 = self.settings.get('vram_t1_threshold')
-        COOL_TIME = self.settings.get('cool_down_time_s')
-        WORK_TIME = self.settings.get('work_time_s')
-
-        self.is_throttling = True
-        logger.warning(f"THROTTLING: {temp}°C >= {T1}°C. Suspending GPU processes...")
-        
-        # Phase 1: Suspend
-        self.throttler.suspend_gpu_processes()
-        time.sleep(COOL_TIME)
-        
-        # Phase 2: Resume
-        logger.info(f"Resume: Cooling phase over. Resuming work for {WORK_TIME}s...")
-        self.throttler.resume_all_processes()
-        time.sleep(WORK_TIME)
+        if not self.config.get('enable_predictive_throttling') or self.controller.is_throttling:
+            return
+        if estimate is None or estimate.time_to_threshold_s is None:
+            return
+        if (estimate.time_to_threshold_s <= self.config.get('predictive_horizon_s')
+                and estimate.confidence >= self.config.get('predictive_min_confidence')):
+            self.controller.pre_throttle(temp, now, estimate.time_to_threshold_s, estimate.confidence)
+
+    def _record_reaction(self, sample, acted_at: float):
+        """
+        Breaks down how long VRAM kept heating unchecked: the crossing happened
+        at the latest right after the previous (cool) reading.
+        """
+        frozen_at = self.clock.monotonic()
+        previous = next((s for s in self.samples.snapshot(limit=8) if s.seq == sample.seq - 1), None)
+        poll_start = sample.timestamp - sample.duration
+        last_cool = previous.timestamp if previous else poll_start
+        to_real = self.clock.to_real
+
+        breakdown = ReactionBreakdown(
+            poll_wait_s=to_real(max(0.0, poll_start - last_cool)),
+            sensor_read_s=to_real(sample.duration),
+            handoff_s=to_real(max(0.0, acted_at - sample.timestamp)),
+            discovery_s=self.throttler.last_discovery_s or 0.0,
+            suspend_s=self.throttler.last_suspend_s or 0.0,
+            total_s=to_real(frozen_at - last_cool),
+            temp=sample.value,
+        )
+        self.reactions.add(breakdown)
+        self.reaction_latency.observe(breakdown.total_s)
+        self.logger.info(f"Reaction latency at {sample.value}°C: {breakdown.describe()}")
+
+        if tracer.enabled:
+            tracer.event("reaction", breakdown._asdict())
+            if breakdown.total_s >= self.config.get('trace_slow_reaction_s'):
+                path = self.settings.project_root / "vram_guard_trace.json"
+                try:
+                    tracer.export_chrome(path)
+                    self.logger.info(f"Slow reaction ({breakdown.total_s:.2f}s). Trace written to {path}")
+                except OSError as e:
+                    self.logger.error(f"Trace export failed: {e}")
+
+    def _log_reaction_summary(self):
+        summary = self.reactions.summary()
+        if summary:
+            parts = ", ".join(f"{name[:-2]} {v['p50'] * 1000:.1f}/{v['p95'] * 1000:.1f}/{v['p99'] * 1000:.1f}"
+                              for name, v in summary.items())
+            self.logger.info(f"Reaction latency p50/p95/p99 (ms) over {len(self.reactions.events)} events: {parts}")
+
+    def stop(self):
+        """Ends run_monitoring_loop() without waiting for the next reading."""
+        self.is_running = False
+        self.samples.wake_all()
+
+    def close(self):
+        """
+        Resumes the processes this core suspended and releases its throttler,
+        even if the loop has not wound down yet. Call after stop().
+        """
+        self.throttler.close()
+
+    def subscribe(self, callback: Callable[[], None]):
+        """
+        Registers a callback for UI-relevant changes (whole-degree temperature
+        or throttle state). It runs on the core thread and must return quickly.
+        """
+        self._listeners.append(callback)
+
+    def _publish(self, temp: Optional[float]):
+        """Hands the result of a control step to telemetry and, if it changed, to listeners."""
+        self._record_telemetry(temp)
+        current = self.current_temp
+        shown = (None if current is None else round(current), self.controller.state)
+        if shown != self._shown:
+            self._shown = shown
+            for callback in self._listeners:
+                callback()
+
+    def _record_telemetry(self, temp: Optional[float]):
+        if self.telemetry is None:
+            return
+        controller = self.controller
+        duty = controller.duty_controller.duty if controller.duty_controller else controller.achieved_duty
+        self.telemetry.record(self.clock.time(), temp, controller.state, duty,
+                              len(self.throttler.registry.suspended))
+
+    def _refresh_settings(self):
+        """
+        Picks up edits of settings.json and takes one snapshot for the whole
+        cycle, so a decision never mixes values from before and after a change.
+        """
+        self.settings.reload_if_changed()
+        config = self.settings.snapshot()
+        if config is not self.config:
+            self.config = config
+            self.controller.settings = config
+            self.poll_scheduler.settings = config
+            if self.throttler.settings is not None:
+                self.throttler.settings = config
+
+    def _link_lost(self, reason: str):
+        if self._linked:
+            self._linked = False
+            events.emit("sensor_link_down", gpu=self.label or "GPU0", source=self.sensor_source.name,
+                        reason=reason)
+
+    def _adaptive_interval(self, temp: float, estimate: Optional[TrendEstimate] = None) -> float:
+        """
+        Adaptive Polling (Idle Optimization).
+        If cool, sample less often to let GPU sleep (D3 Cold); see PollScheduler.
+        """
+        return self.poll_scheduler.next_interval(temp, self.config.get('vram_t1_threshold'),
+                                                 estimate.slope_c_per_s if estimate else None,
+                                                 self.controller.is_throttling)
 
     def run_monitoring_loop(self):
         """
         Continuous monitoring loop. Should be run in a separate thread.
         """
-        logger.info("VRAM Guard Core loop started.")
+        self.logger.info("VRAM Guard Core loop started.")
         wait_count = 0
+        last_seq = 0
+        self.sampler.start()
 
         while self.is_running:
-            # 1. Ensure LHM is running and responding
-            if not self.lhm_client.check_and_start():
-                logger.warning("LHM not available. Retrying in 10s...")
-                time.sleep(10)
+            self._refresh_settings()
+
+            # 1. Ensure the sensor backend (e.g. LHM) is running and responding
+            if not self.sensor_source.check_and_start():
+                self.logger.warning(f"{self.sensor_source.name} not available. Retrying in 10s...")
+                self._link_lost(f"{self.sensor_source.name} not available")
+                self.clock.sleep(10)
                 continue
 
-            # 2. Fetch current temperature
-            temp, sensor_name = self.lhm_client.get_vram_temp()
-            self.current_temp = temp # Shared with UI
+            if self.paused and self.controller.is_throttling:
+                self.logger.info("Protection paused. Releasing GPU processes.")
+                self.controller.stop()
+                self._publish(self.controller.last_temp)
+
+            # 2. Wait for the next reading, or until the current throttle phase is due
+            timeout = self.sampler.interval_s + 1.0
+            until_deadline = self.controller.time_to_deadline(self.clock.monotonic())
+            if until_deadline is not None:
+                timeout = min(timeout, until_deadline)
+
+            sample = self.samples.wait_for_new(last_seq, timeout=self.clock.to_real(timeout))
+            if not self.is_running:
+                break
+            if sample is None and self.paused:
+                continue
+            if sample is None:
+                # No new reading: let the state machine act on its deadline
+                self.controller.update(None, self.clock.monotonic())
+                self._publish(self.controller.last_temp)
+                continue
+            last_seq = sample.seq
+            temp, sensor_name = sample.value, sample.sensor_id
 
             if temp is None:
                 wait_count += 1
                 if wait_count % 5 == 0:
-                    logger.info("Waiting for VRAM sensor data from LHM...")
-                time.sleep(2)
+                    self.logger.info(f"Waiting for VRAM sensor data from {self.sensor_source.name}...")
+                self._link_lost("no VRAM reading")
+                self.controller.update(None, self.clock.monotonic())
+                self._publish(None)
+                self.sampler.set_interval(self.SENSOR_RETRY_INTERVAL_S)
                 continue
 
             # 3. Handle first successful detection
             if self.first_run:
-                logger.info(f"SUCCESS: Linked to sensor '{sensor_name}'")
-                logger.info(f"Initial VRAM Temp: {temp}°C")
+                self.logger.info(f"SUCCESS: Linked to sensor '{sensor_name}'")
+                self.logger.info(f"Initial VRAM Temp: {temp}°C")
+                self.time_to_first_reading = time.time() - self.launched_at
+                self.logger.info(f"Startup: first VRAM reading {self.time_to_first_reading:.2f}s after launch")
                 self.first_run = False
                 wait_count = 0
+            if not self._linked:
+                self._linked = True
+                events.emit("sensor_link_up", gpu=self.label or "GPU0", source=self.sensor_source.name,
+                            sensor=sensor_name, temp=temp, startup_s=self.time_to_first_reading)
+
+            if self.max_temp is None or temp > self.max_temp:
+                self.max_temp = temp
+
+            if self.paused:
+                self._publish(temp)
+                self.sampler.set_interval(self._adaptive_interval(temp))
+                continue
+
+            self.poll_scheduler.observe(sample.timestamp, temp, self.config.get('vram_t1_threshold'))
+
+            # 4. Panic (T2) and throttling (T1) decisions
+            now = self.clock.monotonic()
+            was_idle = self.controller.state == ThrottleState.IDLE
+            self.controller.update(temp, now)
+            if was_idle and self.controller.state in (ThrottleState.SUSPENDED, ThrottleState.PANIC):
+                self._record_reaction(sample, now)
+            estimate = self._estimate_trend(temp, now)
+            self._check_prediction(temp, now, estimate)
+            self._publish(temp)
+
+            # 5. Next poll from headroom and heating rate (full rate while a throttle cycle is active)
+            self.sampler.set_interval(self._adaptive_interval(temp, estimate))
 
-            # 4. Check Panic Threshold (T2)
-            self._handle_panic_mode(temp)
-
-            # 5. Check Throttling Threshold (T1)
-            T1 = self.settings.get('vram_t1_threshold')
-            if temp >= T1:
-                self._perform_throttling_cycle(temp)
-            else:
-                self.is_throttling = False
-                
-                # 6. Adaptive Polling (Idle Optimization)
-                # If cool, check less often to let GPU sleep (D3 Cold)
-                if temp < 60:
-                    sleep_time = 30.0 
-                elif temp < 80:
-                    sleep_time = 5.0
-                else:
-                    sleep_time = 1.0
-                
-                time.sleep(sleep_time)
-
-        logger.info("VRAM Guard Core loop stopped.")
\ No newline at end of file
+        self.controller.stop()
+        self.throttler.close()
+        self.sampler.stop()
+        self._log_reaction_summary()
+        self.logger.info("VRAM Guard Core loop stopped.")
\ No newline at end of file
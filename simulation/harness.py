@@ -0,0 +1,139 @@
+"""
+Offline comparison of throttling policies without a GPU.
+
+A first-order thermal model stands in for the VRAM, a local HTTP server
+serves it as LHM data.json, and dummy child processes stand in for GPU jobs:
+suspending them lowers the simulated load. VRAMGuardCore runs end to end on
+a ScaledClock, so an hour of simulated time takes a few minutes.
+
+Usage: python -m simulation.harness [--duration 1800] [--scale 30] [--policy pulse --policy pi]
+"""
+import argparse
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from benchmarks.lhm_fixture import build_payload
+from benchmarks.lhm_server import FakeLHMServer
+from config.settings import Settings
+from core.clock import ScaledClock
+from core.lhm_client import LHMClient
+from core.process_throttler import Throttler
+from core.vram_guard_core import VRAMGuardCore
+from simulation.thermal_model import ModelRunner, ThermalModel
+from simulation.workers import DummyGpuWorkers
+
+logger = logging.getLogger(__name__)
+
+# Settings overrides per policy
+POLICIES: Dict[str, dict] = {
+    "pulse": {"throttle_mode": "pulse"},
+    "pi": {"throttle_mode": "pi"},
+    "predictive": {"throttle_mode": "pulse", "enable_predictive_throttling": True},
+    "selective": {"throttle_mode": "pulse", "throttle_selection": "selective"},
+}
+
+
+class SimulationResult(NamedTuple):
+    policy: str
+    duration_s: float
+    peak_temp: float
+    above_t1_s: float
+    work_retained: float  # Share of GPU work time kept compared to running unthrottled
+    workers_killed: int
+    predicted_crossings: int
+    actual_crossings: int
+
+
+class SimulatedLHMClient(LHMClient):
+    """LHMClient pointed at the stand-in server. Never launches LibreHardwareMonitor."""
+
+    def __init__(self, api_url: str):
+        super().__init__(Path(tempfile.gettempdir()))
+        self.api_url = api_url
+
+    def check_and_start(self) -> bool:
+        return True
+
+    def stop(self):
+        pass
+
+
+def run_policy(policy: str, overrides: dict, duration_s: float = 1800.0, scale: float = 30.0,
+               worker_count: int = 3, model_kwargs: Optional[dict] = None) -> SimulationResult:
+    """
+    Runs one simulation and returns its statistics.
+    :param duration_s: Simulated seconds.
+    :param scale: How many times faster than real time the simulation runs.
+    """
+    clock = ScaledClock(scale)
+    model = ThermalModel(**(model_kwargs or {}))
+    workers = DummyGpuWorkers(worker_count)
+
+    with tempfile.TemporaryDirectory() as settings_dir:
+        settings = Settings(Path(settings_dir))
+        settings.update(overrides)
+
+        server = FakeLHMServer(lambda: build_payload(cores=8, dimms=2, disks=2, nics=1,
+                                                     vram_temp=model.reading())).start()
+        runner = ModelRunner(model, workers.load, clock, settings.get('vram_t1_threshold'))
+        core = VRAMGuardCore(settings, None, SimulatedLHMClient(server.url),
+                             Throttler(workers.process_source(), settings), clock=clock)
+        core_thread = threading.Thread(target=core.run_monitoring_loop, name="VRAMGuardCore", daemon=True)
+
+        try:
+            runner.start()
+            core_thread.start()
+            clock.sleep(duration_s)
+        finally:
+            core.stop()
+            core_thread.join(timeout=5)
+            core.close()  # Resumes any worker still suspended, even if the loop did not wind down
+            runner.stop()
+            killed = sum(1 for p in workers.processes if p.poll() is not None)
+            workers.stop()
+            server.stop()
+
+    return SimulationResult(
+        policy=policy,
+        duration_s=runner.elapsed_s,
+        peak_temp=runner.peak_temp,
+        above_t1_s=runner.above_threshold_s,
+        work_retained=runner.work_s / runner.elapsed_s if runner.elapsed_s else 0.0,
+        workers_killed=killed,
+        predicted_crossings=core.prediction_stats["predicted_crossings"],
+        actual_crossings=core.prediction_stats["actual_crossings"],
+    )
+
+
+def print_report(results: List[SimulationResult]):
+    print(f"{'policy':<12}{'sim time':>10}{'peak °C':>10}{'above T1':>10}{'work kept':>11}{'killed':>8}"
+          f"{'predicted':>11}{'crossed':>9}")
+    for r in results:
+        print(f"{r.policy:<12}{r.duration_s:>9.0f}s{r.peak_temp:>10.1f}{r.above_t1_s:>9.1f}s"
+              f"{r.work_retained:>10.1%}{r.workers_killed:>8}{r.predicted_crossings:>11}{r.actual_crossings:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare VRAM Guard throttling policies on a simulated GPU.")
+    parser.add_argument("--duration", type=float, default=1800.0, help="Simulated seconds per policy")
+    parser.add_argument("--scale", type=float, default=30.0, help="Speed-up over real time")
+    parser.add_argument("--workers", type=int, default=3, help="Number of dummy GPU processes")
+    parser.add_argument("--policy", action="append", choices=sorted(POLICIES), help="Policies to run (default: all)")
+    parser.add_argument("--verbose", action="store_true", help="Show VRAM Guard log output")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    results = []
+    for policy in args.policy or list(POLICIES):
+        print(f"Running '{policy}' for {args.duration:.0f}s simulated ({args.duration / args.scale:.0f}s real)...")
+        results.append(run_policy(policy, POLICIES[policy], args.duration, args.scale, args.workers))
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
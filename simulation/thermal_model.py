@@ -0,0 +1,93 @@
+import math
+import random
+import threading
+from typing import Callable, Optional
+
+from core.clock import Clock
+
+
+class ThermalModel:
+    """
+    First-order model of VRAM junction temperature:
+
+        dT/dt = (T_eq(load) - T) / tau,   T_eq = idle + load * (full_load - idle)
+
+    Heating and cooling use separate time constants (heat soak is slower
+    to build than to shed once the load drops).
+    """
+
+    def __init__(self, idle_temp: float = 55.0, full_load_temp: float = 102.0,
+                 tau_heat_s: float = 40.0, tau_cool_s: float = 25.0,
+                 initial_temp: Optional[float] = None, noise_c: float = 0.1, seed: int = 1):
+        self.idle_temp = idle_temp
+        self.full_load_temp = full_load_temp
+        self.tau_heat_s = tau_heat_s
+        self.tau_cool_s = tau_cool_s
+        self.temp = idle_temp if initial_temp is None else initial_temp
+        self.noise_c = noise_c
+        self._random = random.Random(seed)
+
+    def equilibrium(self, load: float) -> float:
+        return self.idle_temp + load * (self.full_load_temp - self.idle_temp)
+
+    def step(self, dt: float, load: float) -> float:
+        target = self.equilibrium(load)
+        tau = self.tau_heat_s if target > self.temp else self.tau_cool_s
+        # Exact solution of the first-order step keeps large dt stable
+        alpha = 1.0 - math.exp(-dt / tau)
+        self.temp += (target - self.temp) * alpha
+        return self.temp
+
+    def reading(self) -> float:
+        """Sensor reading as LHM would report it (noise, 0.1 °C resolution)."""
+        return round(self.temp + self._random.gauss(0.0, self.noise_c), 1)
+
+
+class ModelRunner:
+    """
+    Advances a ThermalModel on its own thread using the (possibly scaled)
+    simulation clock, and accumulates statistics for the report.
+    """
+
+    def __init__(self, model: ThermalModel, load_fn: Callable[[], float], clock: Clock,
+                 threshold: float, step_s: float = 0.1):
+        """
+        :param load_fn: Returns the current GPU load in [0, 1].
+        :param threshold: T1, for the time-above-threshold statistic.
+        :param step_s: Model step in simulated seconds.
+        """
+        self.model = model
+        self.load_fn = load_fn
+        self.clock = clock
+        self.threshold = threshold
+        self.step_s = step_s
+
+        self.elapsed_s = 0.0
+        self.work_s = 0.0
+        self.above_threshold_s = 0.0
+        self.peak_temp = model.temp
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ThermalModel", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join(timeout=2)
+
+    def _run(self):
+        last = self.clock.monotonic()
+        while not self._stop_event.wait(self.clock.to_real(self.step_s)):
+            now = self.clock.monotonic()
+            dt = now - last
+            last = now
+            load = self.load_fn()
+            temp = self.model.step(dt, load)
+
+            self.elapsed_s += dt
+            self.work_s += load * dt
+            if temp >= self.threshold:
+                self.above_threshold_s += dt
+            self.peak_temp = max(self.peak_temp, temp)
@@ -0,0 +1,53 @@
+import logging
+import subprocess
+import sys
+import psutil
+from typing import List
+
+from core.gpu_process_source import FakeGpuProcessSource, GpuProcess
+from core.process_freezer import is_cgroup_frozen
+
+logger = logging.getLogger(__name__)
+
+# Idle placeholder for a GPU job: it only has to exist so it can be suspended
+_WORKER_CODE = "import time\nwhile True:\n    time.sleep(3600)\n"
+
+
+class DummyGpuWorkers:
+    """
+    Child processes standing in for GPU jobs. The simulated load is the
+    share of workers that are not currently stopped by the throttler.
+    """
+
+    def __init__(self, count: int = 3, bus_id: str = "00000000:01:00.0"):
+        self.bus_id = bus_id
+        self.processes: List[subprocess.Popen] = [
+            subprocess.Popen([sys.executable, "-c", _WORKER_CODE]) for _ in range(count)
+        ]
+        self._handles = [psutil.Process(p.pid) for p in self.processes]
+
+    @property
+    def pids(self) -> List[int]:
+        return [p.pid for p in self.processes]
+
+    def process_source(self) -> FakeGpuProcessSource:
+        """Discovery backend that reports the workers as GPU processes."""
+        return FakeGpuProcessSource([GpuProcess(pid, self.bus_id, 1024.0) for pid in self.pids])
+
+    def load(self) -> float:
+        running = 0
+        for handle in self._handles:
+            try:
+                if handle.status() != psutil.STATUS_STOPPED and not is_cgroup_frozen(handle.pid):
+                    running += 1
+            except psutil.NoSuchProcess:
+                pass  # Killed by panic mode
+        return running / len(self._handles) if self._handles else 0.0
+
+    def stop(self):
+        for process in self.processes:
+            try:
+                process.kill()
+                process.wait(timeout=2)
+            except Exception as e:
+                logger.debug(f"Failed to stop worker {process.pid}: {e}")
@@ -0,0 +1,83 @@
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.settings import Settings
+
+
+class StandInServer:
+    """
+    Local HTTP server for one file. respond(handler) may be replaced by a
+    test to misbehave (truncate, corrupt, fail); requests records the
+    headers of every request.
+    """
+
+    def __init__(self, body: bytes = b""):
+        self.body = body
+        self.requests = []
+        self.respond = self.serve_range
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                server.respond(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/file"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def serve_range(self, handler, body: bytes = None, declared: int = None):
+        """Serves body, honouring "Range: bytes=N-". declared overrides the advertised length (truncation)."""
+        body = self.body if body is None else body
+        start = 0
+        requested = handler.headers.get("Range")
+        if requested:
+            start = int(requested.split("=", 1)[1].rstrip("-"))
+            if start >= len(body):
+                handler.send_response(416)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+            handler.send_response(206)
+            handler.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            handler.send_response(200)
+        part = body[start:]
+        handler.send_header("Content-Length", str(declared - start if declared else len(part)))
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.wfile.write(part)
+        handler.wfile.flush()
+        handler.close_connection = True
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Default settings in a temporary directory. Signals freeze processes, so tests create no cgroups."""
+    settings = Settings(tmp_path)
+    settings.update({"process_freezer": "signals"})
+    return settings
@@ -0,0 +1,68 @@
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from core.batch_controller import BatchProcessController
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="checks SIGSTOP states")
+
+
+@pytest.fixture
+def jobs():
+    procs = [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]) for _ in range(4)]
+    yield [psutil.Process(proc.pid) for proc in procs]
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+
+def _all_settle(processes, stopped: bool, timeout_s: float = 2.0) -> bool:
+    """Signals are delivered asynchronously: waits for every process to reach the expected state."""
+    deadline = time.monotonic() + timeout_s
+    while any((p.status() == psutil.STATUS_STOPPED) != stopped for p in processes):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture(params=["freezer", "pool"])
+def batch(request):
+    batch = BatchProcessController()
+    if request.param == "pool":
+        batch.freezer.close()
+        batch.freezer = None  # The per-process thread pool used on Windows
+    yield batch
+    batch.shutdown()
+
+
+def test_suspends_and_resumes_every_process(batch, jobs):
+    assert batch.run('suspend', jobs) == [None] * 4
+    assert _all_settle(jobs, stopped=True)
+    assert batch.last_batch_size == 4
+    assert 0.0 <= batch.last_spread_s <= batch.last_duration_s < 1.0
+
+    assert batch.run('resume', jobs) == [None] * 4
+    assert _all_settle(jobs, stopped=False)
+    assert batch.last_spread_s is not None
+    assert batch.latency['suspend'].count == 1 and batch.latency['resume'].count == 1
+
+
+def test_gone_process_does_not_stop_the_batch(batch, jobs):
+    gone = subprocess.Popen([sys.executable, "-c", "pass"])
+    handle = psutil.Process(gone.pid)
+    gone.wait()
+
+    results = batch.run('suspend', jobs[:2] + [handle] + jobs[2:])
+    assert results[:2] == [None, None] and results[3:] == [None, None]
+    assert isinstance(results[2], psutil.NoSuchProcess)
+    assert _all_settle(jobs, stopped=True)
+    batch.run('resume', jobs)
+
+
+def test_empty_batch(batch):
+    assert batch.run('suspend', []) == []
+    assert batch.last_spread_s is None
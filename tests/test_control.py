@@ -0,0 +1,85 @@
+import json
+from multiprocessing.connection import Client
+
+import pytest
+
+from core.control import ControlServer
+from core.gpu_process_source import FakeGpuProcessSource
+from core.process_throttler import Throttler
+from core.sensor_source import SensorSource
+from core.vram_guard_core import VRAMGuardCore
+
+
+class ConstantSource(SensorSource):
+    name = "constant"
+
+    def get_vram_temp(self):
+        return 70.0, "VRAM"
+
+
+@pytest.fixture
+def core(settings):
+    core = VRAMGuardCore(settings, None, ConstantSource(), Throttler(FakeGpuProcessSource(), settings))
+    yield core
+    core.close()
+
+
+@pytest.fixture
+def client(core, settings, tmp_path):
+    server = ControlServer(core, settings, str(tmp_path / "control.sock")).start()
+    conn = Client(server.address)
+
+    def request(message: dict) -> dict:
+        conn.send_bytes(json.dumps(message).encode("utf-8"))
+        return json.loads(conn.recv_bytes())
+
+    yield request
+    conn.close()
+    server.stop()
+
+
+def test_status_pause_and_resume(core, client):
+    status = client({"cmd": "status"})
+    assert status["ok"] and not status["paused"]
+    assert (status["t1"], status["t2"], status["suspended"]) == (92, 105, 0)
+
+    assert client({"cmd": "pause"}) == {"ok": True, "paused": True}
+    assert core.paused and client({"cmd": "status"})["paused"]
+    assert client({"cmd": "resume"}) == {"ok": True, "paused": False}
+    assert not core.paused
+
+
+def test_set_applies_valid_values(settings, client):
+    reply = client({"cmd": "set", "values": {"vram_t1_threshold": 90, "throttle_mode": "pi", "work_time_s": 0}})
+
+    assert reply == {"ok": True, "values": {"vram_t1_threshold": 90, "throttle_mode": "pi", "work_time_s": 0}}
+    assert settings.get('throttle_mode') == "pi"
+
+
+@pytest.mark.parametrize("values, error", [
+    ({"vram_t1_threshold": 105}, "vram_t1_threshold (105) must be below vram_t2_panic_threshold (105)"),
+    ({"vram_t2_panic_threshold": 80}, "vram_t1_threshold (92) must be below vram_t2_panic_threshold (80)"),
+    ({"cool_down_time_s": -1.0}, "cool_down_time_s must not be negative"),
+    ({"telemetry_retention_h": -2}, "telemetry_retention_h must not be negative"),
+    ({"throttle_mode": "bang-bang"}, "throttle_mode must be one of pulse, pi"),
+    ({"throttle_selection": "some"}, "throttle_selection must be one of all, selective"),
+    ({"vram_t1_threshold": "hot"}, "vram_t1_threshold must be of type int"),
+    ({"no_such_setting": 1}, "unknown settings: no_such_setting"),
+])
+def test_set_rejects_invalid_values(settings, client, values, error):
+    before = dict(settings.data)
+
+    # A valid value in the same request is not applied either
+    assert client({"cmd": "set", "values": {"work_time_s": 9.0, **values}}) == {"ok": False, "error": error}
+    assert settings.data == before
+
+
+def test_lowering_both_thresholds_together_is_accepted(settings, client):
+    reply = client({"cmd": "set", "values": {"vram_t1_threshold": 80, "vram_t2_panic_threshold": 85}})
+
+    assert reply["ok"]
+    assert (settings.get('vram_t1_threshold'), settings.get('vram_t2_panic_threshold')) == (80, 85)
+
+
+def test_unknown_command(client):
+    assert client({"cmd": "reboot"}) == {"ok": False, "error": "unknown command 'reboot'"}
@@ -0,0 +1,43 @@
+import pytest
+
+from core.duty_cycle_controller import PIDutyCycleController
+
+
+def _controller(initial_duty: float = 0.5) -> PIDutyCycleController:
+    return PIDutyCycleController(kp=0.05, ki=0.01, min_duty=0.1, max_duty=1.0, initial_duty=initial_duty)
+
+
+def test_proportional_and_integral_terms():
+    pi = _controller()
+    assert pi.update(89.0, 91.0, 0.0) == pytest.approx(0.6)  # 0.5 + 0.05 * 2, no dt yet
+    assert pi.update(89.0, 91.0, 5.0) == pytest.approx(0.7)  # Integral 0.5 + 0.01 * 2 * 5
+    assert pi.integral == pytest.approx(0.6)
+
+
+def test_duty_is_clamped_to_its_range():
+    pi = _controller()
+    assert pi.update(40.0, 91.0, 0.0) == 1.0
+    assert pi.is_saturated_high
+    assert pi.update(104.0, 91.0, 1.0) == 0.1
+    assert not pi.is_saturated_high
+    assert _controller(initial_duty=2.0).integral == 1.0
+
+
+def test_no_windup_while_saturated_high():
+    pi = _controller()
+    for now in range(100):  # 100 s with 11 °C of headroom would add 11 to an unguarded integral
+        assert pi.update(80.0, 91.0, float(now)) == 1.0
+    assert pi.integral == pytest.approx(0.5)
+
+    # One second at 1 °C over the setpoint brings the duty down at once
+    assert pi.update(92.0, 91.0, 100.0) == pytest.approx(0.5 - 0.01 - 0.05)
+
+
+def test_no_windup_while_saturated_low():
+    pi = _controller()
+    for now in range(100):
+        assert pi.update(104.0, 91.0, float(now)) == 0.1
+    assert pi.integral == pytest.approx(0.5)
+
+    assert pi.update(90.0, 91.0, 100.0) == pytest.approx(0.5 + 0.01 + 0.05)
+
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.lhm_fixture import build_tree
+from core import fleet_monitor
+from core.fleet_monitor import FleetMonitor, HostAlert, HostReading
+
+_real_sleep = asyncio.sleep  # Before the sleeps fixture patches it
+
+
+class StandInHost:
+    """Local LHM web server over keep-alive HTTP/1.1. While failing, it hangs up without answering."""
+
+    def __init__(self, temp: float = 74.0):
+        self.temp = temp
+        self.failing = False
+        self.requests = 0
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                if not line:
+                    break
+                self.requests += 1
+                if self.failing:
+                    break
+                payload = json.dumps(build_tree(cores=4, dimms=2, disks=1, nics=1, vram_temps=[self.temp])).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(payload) + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client gone, or the loop is shutting down with the connection still open
+        finally:
+            writer.close()
+
+    def close(self):
+        self._server.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records every asyncio.sleep() delay and shortens it, with jitter and start spread disabled."""
+    recorded = []
+
+    async def sleep(delay, result=None):
+        recorded.append(delay)
+        return await _real_sleep(min(delay, 0.005), result)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    monkeypatch.setattr(fleet_monitor.random, "uniform", lambda low, high: (low + high) / 2 if low else 0.0)
+    return recorded
+
+
+async def _wait_for(condition, timeout_s: float = 10.0):
+    """Waits (in real time) until condition() holds."""
+    deadline = asyncio.get_running_loop().time() + timeout_s
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await _real_sleep(0.001)
+
+
+async def _collect(monitor: FleetMonitor, until, timeout_s: float = 10.0):
+    events = []
+
+    async def consume():
+        async for event in monitor.events():
+            events.append(event)
+            if until(events):
+                return
+
+    try:
+        await asyncio.wait_for(consume(), timeout_s)
+    finally:
+        await asyncio.wait_for(monitor.stop(), 1.0)  # Hosts failing at that moment must not delay it
+    return events
+
+
+def _alerts(events):
+    return [(e.level, e.message) for e in events if isinstance(e, HostAlert)]
+
+
+def test_failing_host_backs_off_and_is_reported_down_once(sleeps):
+    async def run():
+        host = StandInHost()
+        host.failing = True
+        monitor = FleetMonitor([await host.start()], interval_s=1.0, max_backoff_s=8.0)
+        monitor.start()
+        try:
+            await _wait_for(lambda: len(sleeps) >= 6)
+        finally:
+            await asyncio.wait_for(monitor.stop(), 1.0)
+            host.close()
+        events = []
+        while not monitor._queue.empty():
+            events.append(monitor._queue.get_nowait())
+        return monitor, host, events
+
+    monitor, host, events = asyncio.run(run())
+    # 2 ** failures intervals, capped at max_backoff_s (sleeps[0] is the start spread)
+    assert sleeps[1:6] == [2.0, 4.0, 8.0, 8.0, 8.0]
+    # stop() may cancel a poll after the host counted it but before it was recorded as an error
+    assert 0 <= host.requests - monitor.errors <= 1 and monitor.polls == 0
+    assert [(level, message.split(":")[0]) for level, message in _alerts(events)] == [
+        ("down", f"{FleetMonitor.DOWN_AFTER_FAILURES} failed polls")]
+
+
+def test_down_alert_and_recovery(sleeps):
+    async def run():
+        host = StandInHost()
+        host.failing = True
+        monitor = FleetMonitor([await host.start()], interval_s=1.0)
+
+        def until(events):
+            if isinstance(events[-1], HostAlert) and events[-1].level == "down":
+                host.failing = False
+            return ("ok", "recovered") in _alerts(events)
+
+        try:
+            return await _collect(monitor, until), monitor
+        finally:
+            host.close()
+
+    events, monitor = asyncio.run(run())
+    alerts = _alerts(events)
+    assert len(alerts) == 2
+    assert alerts[0][0] == "down" and alerts[0][1].startswith(f"{FleetMonitor.DOWN_AFTER_FAILURES} failed polls")
+    assert alerts[1] == ("ok", "recovered")
+    assert isinstance(events[-2], HostReading) and events[-2].temp == 74.0
+    assert monitor.hosts[0].failures == 0
+
+
+def test_hosts_are_watched_independently(sleeps):
+    async def run():
+        healthy, hot, dead = StandInHost(74.0), StandInHost(95.0), StandInHost()
+        dead.failing = True
+        monitor = FleetMonitor([await healthy.start(), await hot.start(), await dead.start()], interval_s=1.0)
+
+        def until(events):
+            return healthy.requests >= 5 and any(level == "down" for level, _ in _alerts(events))
+
+        try:
+            events = await _collect(monitor, until)
+        finally:
+            for host in (healthy, hot, dead):
+                host.close()
+        return events, monitor
+
+    events, monitor = asyncio.run(run())
+    names = [host.name for host in monitor.hosts]
+    alerts = {(e.host, e.level) for e in events if isinstance(e, HostAlert)}
+    assert alerts == {(names[1], "warning"), (names[2], "down")}  # A healthy host raises no alert
+    readings = [e for e in events if isinstance(e, HostReading) and e.host == names[0]]
+    assert readings and all(r.temp == 74.0 and "Memory" in r.sensor for r in readings)
+    assert monitor.hosts[0].connection.opened == 1  # One keep-alive connection for every poll
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from core.sensor_source import HwmonSensorSource
+
+
+def _device(root, index, name, sensors):
+    """Builds hwmon<index> with name and temp<N>_label / temp<N>_input files."""
+    device = root / f"hwmon{index}"
+    device.mkdir(parents=True)
+    (device / "name").write_text(f"{name}\n")
+    for number, (label, millidegrees) in enumerate(sensors, start=1):
+        (device / f"temp{number}_label").write_text(f"{label}\n")
+        (device / f"temp{number}_input").write_text(f"{millidegrees}\n")
+    return device
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    root = tmp_path / "hwmon"
+    _device(root, 0, "k10temp", [("Tctl", 51250)])
+    _device(root, 1, "amdgpu", [("edge", 62000), ("junction", 70000), ("mem", 84500)])
+    return root
+
+
+@pytest.fixture
+def source(sysfs):
+    source = HwmonSensorSource(sysfs)
+    yield source
+    source.stop()
+
+
+def test_resolves_memory_label_and_converts_millidegrees(sysfs, source):
+    assert source.check_and_start()
+    assert source.get_vram_temp() == (84.5, "amdgpu mem")
+
+
+def test_vram_label_is_preferred_over_mem(sysfs, source):
+    _device(sysfs, 2, "gpu", [("mem_ctrl", 50000), ("VRAM", 91000)])
+
+    assert source.get_vram_temp() == (91.0, "gpu VRAM")
+
+
+def test_devices_are_searched_in_natural_order(tmp_path):
+    root = tmp_path / "hwmon"
+    _device(root, 10, "second", [("mem", 40000)])
+    _device(root, 2, "first", [("mem", 80000)])
+    source = HwmonSensorSource(root)
+
+    assert source.get_vram_temp() == (80.0, "first mem")
+    source.stop()
+
+
+def test_each_poll_is_one_pread_on_a_reused_fd(sysfs, source, monkeypatch):
+    opened, reads = [], []
+    real_open, real_pread = os.open, os.pread
+    monkeypatch.setattr(os, "open", lambda path, flags: opened.append(path) or real_open(path, flags))
+    monkeypatch.setattr(os, "pread", lambda fd, size, offset: reads.append(fd) or real_pread(fd, size, offset))
+
+    input_file = sysfs / "hwmon1" / "temp3_input"
+    temps = []
+    for millidegrees in (84500, 85000, 86250):
+        input_file.write_text(f"{millidegrees}\n")
+        temps.append(source.get_vram_temp()[0])
+
+    assert temps == [84.5, 85.0, 86.25]
+    assert opened == [input_file]
+    assert len(reads) == 3 and len(set(reads)) == 1
+
+
+def test_no_matching_label(tmp_path):
+    root = tmp_path / "hwmon"
+    _device(root, 0, "amdgpu", [("edge", 62000), ("junction", 70000)])
+    source = HwmonSensorSource(root)
+
+    assert not source.check_and_start()
+    assert source.get_vram_temp() == (None, "Not Found")
+    assert source._fd is None
+
+
+def test_label_without_input_is_skipped(tmp_path):
+    root = tmp_path / "hwmon"
+    device = _device(root, 0, "amdgpu", [("mem", 84500)])
+    (device / "temp1_input").unlink()
+
+    assert not HwmonSensorSource(root).check_and_start()
+
+
+def test_explicit_sensor_path_skips_the_search(sysfs):
+    source = HwmonSensorSource(sysfs, sensor_path=sysfs / "hwmon1" / "temp2_input")
+
+    assert source.get_vram_temp() == (70.0, "temp2_input")
+    source.stop()
+
+
+def test_unreadable_value_reopens_on_next_poll(sysfs, source):
+    input_file = sysfs / "hwmon1" / "temp3_input"
+    assert source.get_vram_temp()[0] == 84.5
+
+    input_file.write_text("garbage\n")
+    temp, error = source.get_vram_temp()
+    assert temp is None and error
+    assert source._fd is None
+
+    input_file.write_text("80000\n")
+    assert source.get_vram_temp() == (80.0, "amdgpu mem")
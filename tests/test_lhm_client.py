@@ -0,0 +1,129 @@
+import json
+import socket
+
+import pytest
+
+from benchmarks.lhm_fixture import build_tree
+from core.lhm_client import LHMClient
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_free_port_is_taken_from_port_range(tmp_path):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        taken, free = busy.getsockname()[1], _free_port()
+
+        class Client(LHMClient):
+            PORT_RANGE = [taken, free]
+
+        assert Client(tmp_path)._find_free_port() == free
+
+        Client.PORT_RANGE = [taken]
+        assert Client(tmp_path)._find_free_port() is None
+
+
+def _find(node: dict, text: str) -> dict:
+    if node.get("Text") == text:
+        return node
+    for child in node.get("Children", []):
+        found = _find(child, text)
+        if found:
+            return found
+    return {}
+
+
+def _payload(tree: dict) -> bytes:
+    return json.dumps(tree, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@pytest.fixture
+def client(tmp_path, stand_in_server, monkeypatch):
+    """LHMClient pointed at the stand-in server; resolves records every full resolution of the sensor."""
+    client = LHMClient(tmp_path)
+    client.api_url = stand_in_server.url
+    client.resolves = []
+    resolve = client.sensor.resolve
+    monkeypatch.setattr(client.sensor, "resolve", lambda data: client.resolves.append(1) or resolve(data))
+    return client
+
+
+def _poll(client, server, tree: dict):
+    server.body = _payload(tree)
+    return client.get_vram_temp()
+
+
+def test_stream_reads_only_up_to_the_cached_sensor(client, stand_in_server):
+    tree = build_tree(cores=4, dimms=2, disks=1, nics=1)
+    assert _poll(client, stand_in_server, tree) == (74.0, "GPU Memory Junction")
+    assert client.sensor.marker is not None
+
+    _find(tree, "GPU Memory Junction")["Value"] = "81.5 °C"
+    payload = _payload(tree)
+    sensor_end = payload.index(b"}", payload.index(b'"Value":"81.5')) + 1
+    # Everything after the sensor node is garbage: only an early exit can read this
+    stand_in_server.body = payload[:sensor_end] + b"\x00 not json"
+    assert client.get_vram_temp() == (81.5, "GPU Memory Junction")
+    assert client.resolves == [1]
+
+
+@pytest.mark.parametrize("change", ["id", "name", "sensor_id"])
+def test_changed_tree_is_resolved_again(client, stand_in_server, change):
+    assert _poll(client, stand_in_server, build_tree(cores=4, dimms=2, disks=1, nics=1))[0] == 74.0
+    cached_id = client.sensor.node_id
+
+    if change == "id":  # Added hardware shifts every id after it
+        tree = build_tree(cores=4, dimms=3, disks=1, nics=1, vram_temp=77.0)
+    else:
+        tree = build_tree(cores=4, dimms=2, disks=1, nics=1, vram_temp=77.0)
+        if change == "name":  # Another sensor took the id (e.g. a driver update renamed it)
+            node = _find(tree, "GPU Memory Junction")
+            node["Text"] = "GPU Board"
+            node["Value"] = "50.0 °C"
+            _find(tree, "GPU Hot Spot").update({"Text": "GPU Memory Temperature", "Value": "77.0 °C"})
+        else:  # Same position and name, but a different card (GPUs enumerated in another order)
+            _find(tree, "GPU Memory Junction")["SensorId"] = "/gpu-nvidia/1/temperature/3"
+
+    assert _poll(client, stand_in_server, tree) == (77.0, client.sensor.name)
+    assert client.resolves == [1, 1]
+    if change == "id":
+        assert client.sensor.node_id != cached_id
+    if change == "name":
+        assert client.sensor.name == "GPU Memory Temperature"
+    if change == "sensor_id":
+        assert client.sensor.sensor_id == "/gpu-nvidia/1/temperature/3"
+
+    assert _poll(client, stand_in_server, tree)[0] == 77.0  # Cached again
+    assert client.resolves == [1, 1]
+
+
+def test_sensor_missing_from_the_stream_falls_back_to_a_full_parse(client, stand_in_server):
+    _poll(client, stand_in_server, build_tree(cores=4, dimms=2, disks=1, nics=1))
+
+    # A smaller tree: the cached id is not in the stream at all
+    assert _poll(client, stand_in_server, build_tree(cores=1, dimms=0, disks=0, nics=0, fans=1, vram_temp=70.0)) == (
+        70.0, "GPU Memory Junction")
+    assert client.resolves == [1, 1]
+
+
+def test_vram_sensor_gone(client, stand_in_server):
+    _poll(client, stand_in_server, build_tree(cores=4, dimms=2, disks=1, nics=1))
+
+    assert _poll(client, stand_in_server, build_tree(cores=4, dimms=2, disks=1, nics=1, vram_temps=[])) == (
+        None, "Not Found")
+    assert client.sensor.marker is None and client.sensor.path is None
+
+
+def test_full_parse_mode_follows_the_cached_path(client, stand_in_server):
+    client.stream_parsing = False
+    _poll(client, stand_in_server, build_tree(cores=4, dimms=2, disks=1, nics=1))
+    assert _poll(client, stand_in_server, build_tree(cores=4, dimms=2, disks=1, nics=1, vram_temp=79.0))[0] == 79.0
+    assert client.resolves == [1]
+
+    assert _poll(client, stand_in_server, build_tree(cores=4, dimms=3, disks=1, nics=1, vram_temp=80.0))[0] == 80.0
+    assert client.resolves == [1, 1]
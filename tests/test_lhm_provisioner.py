@@ -0,0 +1,155 @@
+import hashlib
+import io
+import random
+import zipfile
+
+import pytest
+
+from core.lhm_provisioner import LHMProvisioner
+
+EXE = "LibreHardwareMonitor.exe"
+
+
+def _package() -> bytes:
+    # Incompressible, so the archive spans several download chunks
+    payload = b"MZ" + random.Random(0).randbytes(5 * LHMProvisioner.CHUNK_SIZE)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(EXE, payload)
+        archive.writestr("LibreHardwareMonitorLib.dll", b"library" * 500)
+    return buffer.getvalue()
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def package():
+    return _package()
+
+
+def _provisioner(tmp_path, url, sha256, **kwargs):
+    return LHMProvisioner(tmp_path / "lhm", tmp_path / "cache", url=url, sha256=sha256, **kwargs)
+
+
+def _retry(provisioner):
+    provisioner._last_failure = None  # Skip RETRY_INTERVAL_S
+    return provisioner.ensure_installed()
+
+
+def test_download_installs_verified_package(tmp_path, stand_in_server, package):
+    stand_in_server.body = package
+    provisioner = _provisioner(tmp_path, stand_in_server.url, _sha256(package))
+
+    assert provisioner.ensure_installed()
+    assert (tmp_path / "lhm" / EXE).exists()
+    assert provisioner.package_path.read_bytes() == package
+    assert not provisioner.partial_path.exists()
+
+
+def test_truncated_download_resumes_with_range(tmp_path, stand_in_server, package):
+    stand_in_server.body = package
+    half = len(package) // 2
+    stand_in_server.respond = lambda handler: stand_in_server.serve_range(handler, package[:half], len(package))
+    provisioner = _provisioner(tmp_path, stand_in_server.url, _sha256(package))
+
+    assert not provisioner.ensure_installed()
+    received = provisioner.partial_path.stat().st_size
+    assert 0 < received <= half  # Whole chunks before the break are kept
+    assert not (tmp_path / "lhm" / EXE).exists()
+
+    stand_in_server.respond = stand_in_server.serve_range
+    assert _retry(provisioner)
+    assert stand_in_server.requests[-1].get("Range") == f"bytes={received}-"
+    assert provisioner.package_path.read_bytes() == package
+
+
+def test_corrupt_download_is_discarded(tmp_path, stand_in_server, package):
+    corrupt = bytearray(package)
+    corrupt[len(corrupt) // 3] ^= 0xFF
+    stand_in_server.body = bytes(corrupt)
+    provisioner = _provisioner(tmp_path, stand_in_server.url, _sha256(package))
+
+    assert not provisioner.ensure_installed()
+    assert not provisioner.partial_path.exists()  # Complete but wrong: not resumed
+    assert not provisioner.package_path.exists()
+    assert not (tmp_path / "lhm" / EXE).exists()
+
+    stand_in_server.body = package
+    assert _retry(provisioner)
+
+
+def test_corrupt_zip_member_is_rejected_by_crc(tmp_path, package):
+    # A matching hash cannot be configured for a damaged archive, so the CRC check is exercised directly
+    damaged = bytearray(package)
+    damaged[len(damaged) // 4] ^= 0xFF  # Inside the executable's data
+    path = tmp_path / "damaged.zip"
+    path.write_bytes(bytes(damaged))
+    provisioner = _provisioner(tmp_path, "http://127.0.0.1:9/unused", None, offline_package=path)
+
+    assert not provisioner.ensure_installed()
+    assert not (tmp_path / "lhm" / EXE).exists()
+
+
+def test_unpinned_download_records_its_hash(tmp_path, stand_in_server, package):
+    stand_in_server.body = package
+    provisioner = _provisioner(tmp_path, stand_in_server.url, None)
+
+    assert provisioner.ensure_installed()
+    assert (tmp_path / "lhm" / EXE).exists()
+    assert provisioner.digest_path.read_text().strip() == _sha256(package)
+
+
+def test_cached_package_must_match_recorded_hash(tmp_path, stand_in_server, package):
+    stand_in_server.body = package
+    provisioner = _provisioner(tmp_path, stand_in_server.url, None)
+    assert provisioner.ensure_installed()
+    (tmp_path / "lhm" / EXE).unlink()
+
+    assert _provisioner(tmp_path, "http://127.0.0.1:9/unused", None).ensure_installed()  # Cache matches
+    (tmp_path / "lhm" / EXE).unlink()
+
+    tampered = bytearray(package)
+    tampered[-1] ^= 0xFF  # Still a readable archive (end of the central directory comment area)
+    provisioner.package_path.write_bytes(bytes(tampered))
+    provisioner = _provisioner(tmp_path, "http://127.0.0.1:9/unused", None)
+    assert not provisioner.ensure_installed()
+    assert not provisioner.package_path.exists() and not provisioner.digest_path.exists()
+
+
+def test_cached_package_without_any_hash_is_not_used(tmp_path, package):
+    provisioner = _provisioner(tmp_path, "http://127.0.0.1:9/unused", None)
+    provisioner.cache_dir.mkdir()
+    provisioner.package_path.write_bytes(package)
+
+    assert not provisioner.ensure_installed()
+    assert not (tmp_path / "lhm" / EXE).exists()
+    assert not provisioner.package_path.exists()  # Unverifiable: fetched again instead
+
+
+def test_server_error_is_retried_later(tmp_path, stand_in_server, package):
+    def fail(handler):
+        handler.send_response(503)
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+    stand_in_server.body = package
+    stand_in_server.respond = fail
+    provisioner = _provisioner(tmp_path, stand_in_server.url, _sha256(package))
+
+    assert not provisioner.ensure_installed()
+    assert not provisioner.ensure_installed()  # Within RETRY_INTERVAL_S: no new request
+    assert len(stand_in_server.requests) == 1
+
+    stand_in_server.respond = stand_in_server.serve_range
+    assert _retry(provisioner)
+
+
+def test_offline_package_is_used_without_network(tmp_path, package):
+    bundle = tmp_path / "bundle.zip"
+    bundle.write_bytes(package)
+    provisioner = _provisioner(tmp_path, "http://127.0.0.1:9/unused", None, offline_package=bundle)
+
+    assert provisioner.ensure_installed()
+    assert (tmp_path / "lhm" / EXE).exists()
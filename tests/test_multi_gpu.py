@@ -0,0 +1,83 @@
+import pytest
+
+from benchmarks.lhm_fixture import build_tree
+from core.clock import Clock
+from core.gpu_process_source import FakeGpuProcessSource
+from core.lhm_client import LHMClient
+from core.multi_gpu import MultiGpuGuard
+from core.process_throttler import Throttler
+from core.sensor_source import ReplaySensorSource, SensorSource, SensorsNotReadyError
+
+
+class RecordingClock(Clock):
+    def __init__(self):
+        self.slept = []
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+
+
+class ScriptedSource(SensorSource):
+    """list_gpus() answers from a script: exceptions are raised, lists returned."""
+
+    name = "scripted"
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def get_vram_temp(self):
+        return 60.0, "VRAM"
+
+    def list_gpus(self):
+        answer = self.answers[min(self.calls, len(self.answers) - 1)]
+        self.calls += 1
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def _guard(settings, source, clock):
+    throttler = Throttler(FakeGpuProcessSource(), settings)
+    return MultiGpuGuard(settings, None, source, throttler, clock=clock)
+
+
+def test_single_sensor_backend_starts_without_retries(settings):
+    clock = RecordingClock()
+    guard = _guard(settings, ReplaySensorSource([(0.0, 70.0)]), clock)
+
+    assert guard._discover() == []
+    assert clock.slept == []
+
+
+def test_not_ready_and_failed_lookups_are_retried(settings):
+    clock = RecordingClock()
+    source = ScriptedSource([SensorsNotReadyError("empty tree"), ConnectionError("refused"), []])
+    guard = _guard(settings, source, clock)
+
+    assert guard._discover() == []
+    assert source.calls == 3
+    assert clock.slept == [MultiGpuGuard.DISCOVERY_RETRY_S] * 2
+
+
+def test_retries_are_bounded(settings):
+    clock = RecordingClock()
+    source = ScriptedSource([SensorsNotReadyError("empty tree")])
+    guard = _guard(settings, source, clock)
+
+    assert guard._discover() == []
+    assert source.calls == MultiGpuGuard.DISCOVERY_ATTEMPTS
+
+
+def test_lhm_reports_an_empty_tree_as_not_ready(tmp_path):
+    client = LHMClient(tmp_path)
+    client.api_url = "http://127.0.0.1:9/data.json"
+    empty = {"id": 0, "Text": "Sensor", "Children": [{"id": 1, "Text": "HOST", "Children": []}]}
+
+    with pytest.raises(SensorsNotReadyError):
+        client._resolve_gpu_sensors(empty)
+
+
+def test_lhm_tree_without_gpu_sensors_is_single_sensor(tmp_path):
+    client = LHMClient(tmp_path)
+    assert client._resolve_gpu_sensors(build_tree(vram_temps=[])) == {}
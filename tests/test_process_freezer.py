@@ -0,0 +1,101 @@
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from core.process_freezer import CgroupFreezer, _cgroup_of, _descendants, _children_map, cgroup2_mount
+
+MOUNT = cgroup2_mount() if sys.platform.startswith("linux") else None
+
+pytestmark = pytest.mark.skipif(MOUNT is None or os.geteuid() != 0, reason="needs Linux, cgroup v2 and root")
+
+
+def _wait(predicate, timeout_s: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def origin():
+    """A cgroup standing in for the GPU job's service or container group."""
+    path = MOUNT / f"vram_guard_test_origin_{os.getpid()}"
+    path.mkdir()
+    yield path
+    path.rmdir()
+
+
+@pytest.fixture
+def freezer():
+    freezer = CgroupFreezer(MOUNT / f"vram_guard_test_{os.getpid()}")
+    yield freezer
+    freezer.close()
+
+
+@pytest.fixture
+def gpu_job(origin):
+    """A shell in the origin group that forks a worker child once told to."""
+    job = subprocess.Popen(["sh", "-c", "read go; sleep 60 & wait"], stdin=subprocess.PIPE)
+    (origin / "cgroup.procs").write_text(str(job.pid))
+    job.stdin.write(b"go\n")
+    job.stdin.flush()
+    assert _wait(lambda: _descendants([job.pid], _children_map()))
+    yield job
+    for pid in _descendants([job.pid], _children_map()):
+        try:
+            os.kill(pid, 9)
+        except OSError:
+            pass
+    job.kill()
+    job.wait()
+
+
+def test_suspend_pulls_in_descendants_and_resume_restores_origin(freezer, origin, gpu_job):
+    relative = "/" + str(origin.relative_to(MOUNT))
+    worker = _descendants([gpu_job.pid], _children_map())[0]
+    assert _cgroup_of(worker) == relative
+
+    results, finished = freezer.run('suspend', [psutil.Process(gpu_job.pid)])
+    assert results == [None] and finished[0] is not None
+    assert _cgroup_of(gpu_job.pid) == freezer.relative
+    assert _cgroup_of(worker) == freezer.relative  # Descendant pulled in by the same scan
+    assert _wait(freezer.is_frozen)
+
+    results, _ = freezer.run('resume', [psutil.Process(gpu_job.pid)])
+    assert results == [None]
+    assert not freezer.frozen
+    assert _cgroup_of(gpu_job.pid) == relative
+    assert _cgroup_of(worker) == relative
+    assert freezer._members() == set()
+
+
+def test_partial_resume_returns_only_that_tree(freezer, origin, gpu_job):
+    other = subprocess.Popen(["sleep", "60"])
+    try:
+        freezer.run('suspend', [psutil.Process(gpu_job.pid), psutil.Process(other.pid)])
+        assert _wait(freezer.is_frozen)
+
+        freezer.run('resume', [psutil.Process(gpu_job.pid)])  # e.g. after a panic kill of the job
+        relative = "/" + str(origin.relative_to(MOUNT))
+        assert _cgroup_of(gpu_job.pid) == relative
+        assert freezer._members() == {other.pid}
+        assert freezer.frozen
+    finally:
+        other.kill()
+        other.wait()
+
+
+def test_close_returns_frozen_members(origin, gpu_job):
+    freezer = CgroupFreezer(MOUNT / f"vram_guard_test_{os.getpid()}")
+    freezer.run('suspend', [psutil.Process(gpu_job.pid)])
+    path = freezer.path
+
+    freezer.close()
+    assert _cgroup_of(gpu_job.pid) == "/" + str(origin.relative_to(MOUNT))
+    assert not path.exists()
@@ -0,0 +1,87 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from core.gpu_process_source import FakeGpuProcessSource, GpuProcess
+from core.process_registry import ProcessRegistry
+from core.process_throttler import Throttler
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses SIGSTOP-based freezing")
+
+BUS_ID = "00000000:01:00.0"
+
+
+@pytest.fixture
+def job():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+def _previous_owner(pid: int) -> psutil.Process:
+    """
+    Handle of an earlier process with the same PID. psutil identifies a
+    process by PID and creation time, so this stands in for a recycled PID.
+    """
+    handle = psutil.Process(pid)
+    handle._create_time = handle.create_time() - 100.0
+    handle._ident = (pid, handle._create_time)
+    return handle
+
+
+def _stays(pid: int, stopped: bool, settle_s: float = 0.2) -> bool:
+    """Signals are delivered asynchronously: the state must hold for settle_s."""
+    deadline = time.monotonic() + settle_s
+    while time.monotonic() < deadline:
+        if (psutil.Process(pid).status() == psutil.STATUS_STOPPED) != stopped:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_key_includes_the_creation_time(job):
+    registry = ProcessRegistry()
+    registry._handles[job.pid] = _previous_owner(job.pid)
+    old_key, _ = registry.get(job.pid)
+
+    registry.evict(job.pid)
+    new_key, handle = registry.get(job.pid)
+    assert old_key[0] == new_key[0] == job.pid
+    assert old_key != new_key and new_key[1] == psutil.Process(job.pid).create_time()
+
+
+def test_recycled_pid_is_not_suspended(settings, job):
+    throttler = Throttler(FakeGpuProcessSource([GpuProcess(job.pid, BUS_ID)]), settings)
+    throttler.registry._handles[job.pid] = _previous_owner(job.pid)  # Cached before the PID was reused
+
+    throttler.suspend_gpu_processes()
+    assert _stays(job.pid, stopped=False)
+    assert throttler.throttled_pids == [] and len(throttler.registry) == 0
+
+    throttler.suspend_gpu_processes()  # A fresh handle for the new owner works as usual
+    assert throttler.throttled_pids == [job.pid]
+    throttler.close()
+
+
+def test_recycled_pid_is_not_resumed(settings, job):
+    throttler = Throttler(FakeGpuProcessSource([]), settings)
+    previous = _previous_owner(job.pid)
+    throttler.registry._handles[job.pid] = previous
+    throttler.registry.suspended.add((job.pid, previous.create_time()))  # Suspended, then exited
+    os.kill(job.pid, signal.SIGSTOP)  # The new owner was stopped by someone else (e.g. job control)
+    while psutil.Process(job.pid).status() != psutil.STATUS_STOPPED:
+        time.sleep(0.01)
+
+    try:
+        throttler.resume_all_processes()
+        assert _stays(job.pid, stopped=True)
+        assert throttler.throttled_pids == []
+    finally:
+        throttler.close()
+        os.kill(job.pid, signal.SIGCONT)
@@ -0,0 +1,111 @@
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from core.gpu_process_source import FakeGpuProcessSource, GpuProcess
+from core.process_selector import WeightedProcessSelector
+from core.process_throttler import Throttler
+
+BUS_ID = "00000000:01:00.0"
+
+
+def _process(pid: int, mem_util: float = None, used_memory_mib: float = None) -> GpuProcess:
+    return GpuProcess(pid, BUS_ID, used_memory_mib=used_memory_mib, mem_util=mem_util)
+
+
+def _pids(processes):
+    return [p.pid for p in processes]
+
+
+def test_smallest_set_that_sheds_the_fraction():
+    selector = WeightedProcessSelector()
+    processes = [_process(1, 10.0), _process(2, 90.0), _process(3, 50.0), _process(4, 10.0)]
+
+    assert _pids(selector.select(processes, 0.5)) == [2]  # 54 of 96
+    assert sorted(_pids(selector.select(processes, 0.6))) == [2, 3]
+    assert sorted(_pids(selector.select(processes, 1.0))) == [1, 2, 3, 4]
+    assert selector.select([], 0.6) == []
+
+
+def test_vram_use_is_the_fallback_weight():
+    selector = WeightedProcessSelector()
+    processes = [_process(1, used_memory_mib=1000.0), _process(2, used_memory_mib=9000.0)]
+
+    assert _pids(selector.select(processes, 0.5)) == [2]
+
+
+def test_equal_peers_take_turns():
+    selector = WeightedProcessSelector()
+    processes = [_process(pid, 40.0) for pid in (1, 2, 3, 4)]
+
+    rounds = [sorted(_pids(selector.select(processes, 0.5))) for _ in range(4)]
+    assert rounds == [[1, 2], [3, 4], [1, 2], [3, 4]]
+
+
+def test_rotation_is_weighted_between_similar_peers():
+    selector = WeightedProcessSelector()
+    heavier, lighter = _process(1, 100.0 / 6), _process(2, 90.0 / 6)  # Weights about 10 and 9
+
+    chosen = Counter(pid for _ in range(19) for pid in _pids(selector.select([heavier, lighter], 0.4)))
+    assert chosen == {1: 10, 2: 9}
+
+
+def test_light_processes_are_not_rotated_in():
+    selector = WeightedProcessSelector()
+    processes = [_process(1, 90.0), _process(2, 20.0), _process(3, 20.0)]
+
+    assert all(_pids(selector.select(processes, 0.6)) == [1] for _ in range(5))
+
+
+def test_rotation_state_of_gone_processes_is_dropped():
+    selector = WeightedProcessSelector()
+    selector.select([_process(1, 40.0), _process(2, 40.0)], 0.5)
+    selector.select([_process(2, 40.0)], 0.5)
+
+    assert set(selector._current) == {2}
+
+
+@pytest.fixture
+def jobs():
+    """Three real processes with distinct names: sleep, tail and python."""
+    if sys.platform == "win32":
+        pytest.skip("uses POSIX tools as stand-in GPU jobs")
+    procs = [subprocess.Popen(["sleep", "60"]), subprocess.Popen(["tail", "-f", "/dev/null"]),
+             subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])]
+    yield procs
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+
+def _throttler(settings, jobs, mem_utils):
+    source = FakeGpuProcessSource([_process(job.pid, util) for job, util in zip(jobs, mem_utils)])
+    return Throttler(source, settings)
+
+
+def test_never_suspend_list_applies_in_all_mode(settings, jobs):
+    settings.set('throttle_never_suspend', ["Tail"])
+    throttler = _throttler(settings, jobs, [10.0, 10.0, 10.0])
+
+    assert throttler._select_processes() == [jobs[0].pid, jobs[2].pid]
+    throttler.close()
+
+
+def test_selective_mode_picks_the_heaviest(settings, jobs):
+    settings.update({'throttle_selection': "selective", 'selective_shed_fraction': 0.6})
+    throttler = _throttler(settings, jobs, [10.0, 90.0, 50.0])
+
+    assert sorted(throttler._select_processes()) == sorted([jobs[1].pid, jobs[2].pid])
+    throttler.close()
+
+
+def test_always_and_never_lists_in_selective_mode(settings, jobs):
+    settings.update({'throttle_selection': "selective", 'selective_shed_fraction': 0.6,
+                     'throttle_always_suspend': ["sleep"], 'throttle_never_suspend': ["tail"]})
+    throttler = _throttler(settings, jobs, [10.0, 90.0, 50.0])
+
+    # sleep is forced although light, tail is exempt although heaviest; python sheds the rest
+    assert throttler._select_processes() == [jobs[0].pid, jobs[2].pid]
+    throttler.close()
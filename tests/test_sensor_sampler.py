@@ -0,0 +1,149 @@
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+from core.clock import ScaledClock
+from core.gpu_process_source import FakeGpuProcessSource
+from core.process_throttler import Throttler
+from core.sensor_sampler import SampleRingBuffer, SensorSampler
+from core.sensor_source import SensorSource
+from core.vram_guard_core import VRAMGuardCore
+
+
+class NoisySource(SensorSource):
+    """Constant temperature with uniform noise; records the clock time of every poll."""
+
+    name = "noisy"
+
+    def __init__(self, temp: float, noise: float, clock):
+        self.temp = temp
+        self.noise = noise
+        self.clock = clock
+        self.polls = []
+        self._random = random.Random(0)
+
+    def get_vram_temp(self):
+        self.polls.append(self.clock.monotonic())
+        return round(self.temp + self._random.uniform(-self.noise, self.noise), 1), "VRAM"
+
+
+def _count_polls(settings, temp: float, noise: float, duration_s: float = 600.0, scale: float = 200.0) -> int:
+    clock = ScaledClock(scale)
+    source = NoisySource(temp, noise, clock)
+    core = VRAMGuardCore(settings, None, source, Throttler(FakeGpuProcessSource(), settings), clock=clock)
+    thread = threading.Thread(target=core.run_monitoring_loop, daemon=True)
+    thread.start()
+    time.sleep(clock.to_real(duration_s))
+    core.stop()
+    thread.join(5)
+    core.close()
+    return len(source.polls)
+
+
+@pytest.mark.parametrize("temp", [75.0, 85.0])
+def test_sensor_noise_does_not_add_polls(settings, temp):
+    # Nominal interval from the headroom bound: (T1 - temp) / max heating rate + max detection latency
+    headroom = settings.get('vram_t1_threshold') - temp
+    nominal_s = headroom / settings.get('max_heating_rate_c_per_s') + settings.get('max_detection_latency_s')
+    noisy = _count_polls(settings, temp, noise=0.5)
+    # +-0.5 °C moves the interval by about +-0.5 s; without the fix every shorter interval polled at once
+    assert noisy <= 600.0 / (nominal_s - 0.5) * 1.1 + 2
+
+
+def test_shorter_interval_polls_at_once_only_when_already_due():
+    clock = ScaledClock(1.0)
+    source = NoisySource(70.0, 0.0, clock)
+    sampler = SensorSampler(source, SampleRingBuffer(), interval_s=10.0, clock=clock)
+    sampler.start()
+    try:
+        time.sleep(0.2)
+        assert len(source.polls) == 1
+
+        sampler.set_interval(5.0)  # Due 5 s after the first poll: not yet
+        time.sleep(0.2)
+        assert len(source.polls) == 1
+
+        sampler.set_interval(0.1)  # Due 0.1 s after the first poll: already passed
+        deadline = time.monotonic() + 2.0
+        while len(source.polls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert source.polls[1] - source.polls[0] < 1.0
+    finally:
+        sampler.stop()
+
+
+def _fill(buffer: SampleRingBuffer, first: int, last: int):
+    """Appends seq..last with every field derived from the sequence number."""
+    for seq in range(first, last + 1):
+        buffer.append(float(seq), float(seq), f"s{seq}", seq / 1000)
+
+
+def _consistent(sample) -> bool:
+    return (sample.timestamp == sample.value == float(sample.seq) and sample.sensor_id == f"s{sample.seq}"
+            and sample.duration == sample.seq / 1000)
+
+
+def test_ring_buffer_wraps_around():
+    buffer = SampleRingBuffer(capacity=5)
+    assert buffer.latest() is None and buffer.snapshot() == []
+
+    _fill(buffer, 1, 12)
+    assert buffer.seq == 12
+    # The two slots next to the writer are never handed out
+    assert [s.seq for s in buffer.snapshot()] == [10, 11, 12]
+    assert all(_consistent(s) for s in buffer.snapshot())
+    assert buffer.latest() == buffer.snapshot()[-1]
+
+
+def test_snapshot_limit_age_and_missing_readings():
+    buffer = SampleRingBuffer(capacity=10)
+    _fill(buffer, 1, 5)
+    buffer.append(6.0, None, "s6")
+
+    assert [s.seq for s in buffer.snapshot(limit=2)] == [5, 6]
+    assert [s.seq for s in buffer.snapshot(max_age_s=2.0, now=6.5)] == [5, 6]
+    assert buffer.latest().value is None
+
+
+def test_concurrent_reader_never_sees_torn_or_lapped_samples():
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible
+    buffer = SampleRingBuffer(capacity=16)
+    writer = threading.Thread(target=_fill, args=(buffer, 1, 50000))
+    problems, reads = [], 0
+    try:
+        writer.start()
+        while writer.is_alive():
+            latest = buffer.latest()
+            snapshot = buffer.snapshot()
+            reads += 1
+            if latest is not None and not _consistent(latest):
+                problems.append(latest)
+            seqs = [s.seq for s in snapshot]
+            if seqs and seqs != list(range(seqs[0], seqs[0] + len(seqs))):
+                problems.append(seqs)
+            problems.extend(s for s in snapshot if not _consistent(s))
+            if latest is not None and snapshot and snapshot[-1].seq < latest.seq:
+                problems.append((latest.seq, snapshot[-1].seq))  # The snapshot is taken after latest()
+    finally:
+        writer.join()
+        sys.setswitchinterval(switch_interval)
+
+    assert reads > 10 and problems == []
+    assert buffer.latest() == buffer.snapshot()[-1] and buffer.latest().seq == 50000
+
+
+def test_wait_for_new_returns_on_a_sample_or_wake_all():
+    buffer = SampleRingBuffer()
+    assert buffer.wait_for_new(0, timeout=0.01) is None
+
+    threading.Timer(0.05, buffer.append, args=(1.0, 70.0, "VRAM")).start()
+    assert buffer.wait_for_new(0, timeout=5.0).value == 70.0
+
+    threading.Timer(0.05, buffer.wake_all).start()
+    started = time.monotonic()
+    assert buffer.wait_for_new(1, timeout=5.0) is None
+    assert time.monotonic() - started < 4.0
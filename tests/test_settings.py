@@ -0,0 +1,128 @@
+import json
+import os
+
+import pytest
+
+from config.settings import Settings
+
+
+@pytest.fixture
+def saves(settings, monkeypatch):
+    """Counts the writes of settings.json."""
+    calls = []
+    save = settings._save
+    monkeypatch.setattr(settings, "_save", lambda: calls.append(1) or save())
+    return calls
+
+
+def _on_disk(settings) -> dict:
+    return json.loads(settings.filename.read_text(encoding="utf-8"))
+
+
+def _edit(settings, **values):
+    """Rewrites settings.json behind the object's back."""
+    _write(settings, json.dumps({**_on_disk(settings), **values}))
+
+
+def _write(settings, text: str):
+    """Replaces settings.json with text, with a clearly newer mtime."""
+    settings.filename.write_text(text, encoding="utf-8")
+    stat = settings.filename.stat()
+    os.utime(settings.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _reload(settings) -> bool:
+    settings._last_reload_check = 0.0  # Skip the rate limit
+    return settings.reload_if_changed()
+
+
+def test_transaction_writes_once(settings, saves):
+    with settings.transaction() as tx:
+        tx["vram_t1_threshold"] = 90
+        tx["cool_down_time_s"] = 4.0
+        assert settings.get('vram_t1_threshold') == 92  # Nothing applied before the block ends
+
+    assert len(saves) == 1
+    assert _on_disk(settings)["vram_t1_threshold"] == 90 and _on_disk(settings)["cool_down_time_s"] == 4.0
+    assert not settings.filename.with_name("settings.json.tmp").exists()
+
+
+def test_failed_transaction_and_unchanged_values_write_nothing(settings, saves):
+    with pytest.raises(RuntimeError):
+        with settings.transaction() as tx:
+            tx["vram_t1_threshold"] = 90
+            raise RuntimeError("abort")
+    settings.update({"vram_t1_threshold": 92, "work_time_s": 2.0})  # The current values
+
+    assert saves == []
+    assert settings.get('vram_t1_threshold') == 92
+
+
+def test_snapshot_is_shared_until_a_change(settings):
+    first = settings.snapshot()
+    assert settings.snapshot() is first
+
+    settings.set('vram_t1_threshold', 88)
+    second = settings.snapshot()
+    assert second is not first and second.version > first.version
+    assert (first.get('vram_t1_threshold'), second.get('vram_t1_threshold')) == (92, 88)
+
+    settings.set('vram_t1_threshold', 88)  # No change, no new snapshot
+    assert settings.snapshot() is second
+
+
+def test_snapshot_is_isolated_from_later_changes(settings):
+    settings.set('throttle_never_suspend', ["blender"])
+    snapshot = settings.snapshot()
+    settings.data['throttle_never_suspend'].append("obs")
+
+    assert snapshot.get('throttle_never_suspend') == ["blender"]
+    with pytest.raises(TypeError):
+        snapshot._data['vram_t1_threshold'] = 0
+
+
+def test_external_edit_is_reloaded(settings):
+    snapshot = settings.snapshot()
+    _edit(settings, vram_t1_threshold=85)
+
+    assert _reload(settings)
+    assert settings.get('vram_t1_threshold') == 85
+    assert settings.snapshot() is not snapshot
+    assert not _reload(settings)  # Same mtime and size: not parsed again
+
+
+def test_reload_is_rate_limited(settings):
+    settings.reload_if_changed()  # Starts the interval
+    _edit(settings, vram_t1_threshold=85)
+
+    assert not settings.reload_if_changed()
+    assert settings.get('vram_t1_threshold') == 92
+
+
+def test_own_writes_are_not_reloaded(settings, monkeypatch):
+    settings.set('vram_t1_threshold', 90)
+    monkeypatch.setattr(settings, "_read_file", lambda: pytest.fail("settings.json parsed again"))
+
+    assert not _reload(settings)
+
+
+def test_unparseable_file_keeps_previous_values(settings):
+    settings.set('vram_t1_threshold', 90)
+    _write(settings, '{"vram_t1_threshold": 8')  # Half-written by an editor
+
+    assert not _reload(settings)
+    assert settings.get('vram_t1_threshold') == 90
+    assert not _reload(settings)  # Not retried until the file changes again
+
+    _write(settings, json.dumps({"vram_t1_threshold": 87}))
+    assert _reload(settings)
+    assert settings.get('vram_t1_threshold') == 87
+    assert settings.get('cool_down_time_s') == 3.0  # Keys missing from the file fall back to the defaults
+
+
+def test_corrupt_file_at_startup_resets_to_defaults(tmp_path):
+    (tmp_path / "settings.json").write_text("[1, 2", encoding="utf-8")
+
+    settings = Settings(tmp_path)
+    assert settings.data == Settings.DEFAULT_SETTINGS
+    assert _on_disk(settings) == Settings.DEFAULT_SETTINGS
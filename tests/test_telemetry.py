@@ -0,0 +1,118 @@
+import builtins
+
+import pytest
+
+from core import telemetry
+from core.telemetry import TelemetryRecord, TelemetryStore, summarize
+from core.throttle_controller import ThrottleState
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TelemetryStore(tmp_path / "telemetry.bin", capacity=8)
+    yield store
+    store.close()
+
+
+def _write(store, first: int, last: int):
+    """Appends records first..last with the sequence number as timestamp and temperature."""
+    for seq in range(first, last + 1):
+        store.append(float(seq), 0, float(seq), ThrottleState.IDLE, None, 0)
+
+
+def test_round_trip_and_filters(store):
+    store.append(1.0, 0, 80.5, ThrottleState.IDLE, None, 0)
+    store.append(2.0, 1, None, ThrottleState.SUSPENDED, 0.25, 3)
+    store.append(3.0, 0, 93.0, ThrottleState.PANIC, 1.0, 70000)
+
+    records = store.read()
+    assert records[0] == TelemetryRecord(0, 1.0, 0, 80.5, ThrottleState.IDLE, None, 0)
+    assert records[1] == TelemetryRecord(1, 2.0, 1, None, ThrottleState.SUSPENDED, 0.25, 3)
+    assert records[2].suspended == 0xFFFF
+    assert [r.seq for r in store.read(gpu=0)] == [0, 2]
+    assert [r.seq for r in store.read(since=1.5, until=2.5)] == [1]
+
+
+def test_ring_wraps_around(store):
+    _write(store, 0, 19)
+
+    records = store.read()
+    assert store.count == 20
+    # The oldest slot is the next one to be written and is not handed out
+    assert [r.seq for r in records] == list(range(13, 20))
+    assert all(r.timestamp == r.temp == float(r.seq) for r in records)
+
+
+def test_reader_drops_slots_overwritten_while_copying(store, monkeypatch):
+    _write(store, 0, 9)
+
+    def copy_then_write(data):
+        copied = builtins.bytes(data)
+        _write(store, 10, 12)  # The writer laps the oldest slots of the copy
+        return copied
+
+    monkeypatch.setattr(telemetry, "bytes", copy_then_write, raising=False)
+    records = store.read()
+
+    # Copied up to seq 9; seqs 3..5 were replaced by 10..12 and must not show up with stale data
+    assert [r.seq for r in records] == list(range(6, 10))
+    assert all(r.timestamp == float(r.seq) for r in records)
+
+
+def test_readonly_reopen_and_layout_change(tmp_path, store):
+    _write(store, 0, 2)
+    reader = TelemetryStore(store.path, readonly=True)
+    assert reader.capacity == 8 and [r.seq for r in reader.read()] == [0, 1, 2]
+    reader.close()
+
+    store.close()
+    resized = TelemetryStore(store.path, capacity=16)  # A different layout starts a new history
+    assert resized.count == 0
+    resized.close()
+
+    (tmp_path / "other.bin").write_bytes(b"not telemetry" * 4)
+    with pytest.raises(ValueError):
+        TelemetryStore(tmp_path / "other.bin", readonly=True)
+
+
+def test_writer_records_at_interval_and_on_state_change(store):
+    writer = store.writer(gpu=2, interval_s=1.0)
+    for timestamp, state in [(0.0, ThrottleState.IDLE), (0.5, ThrottleState.IDLE), (0.7, ThrottleState.SUSPENDED),
+                             (1.2, ThrottleState.SUSPENDED), (1.7, ThrottleState.SUSPENDED)]:
+        writer.record(timestamp, 90.0, state, None, 1)
+
+    assert [(r.timestamp, r.gpu) for r in store.read()] == [(0.0, 2), (0.7, 2), (1.7, 2)]
+
+
+def _records(temps, states=None, step: float = 1.0):
+    states = states or [ThrottleState.IDLE] * len(temps)
+    return [TelemetryRecord(i, i * step, 0, temp, state, None, 0) for i, (temp, state) in enumerate(zip(temps, states))]
+
+
+def test_summary_percentiles_threshold_and_duty():
+    states = [ThrottleState.IDLE] * 2 + [ThrottleState.SUSPENDED] * 3 + [ThrottleState.WORKING] + [ThrottleState.IDLE] * 4
+    summary = summarize(_records([80.0 + i for i in range(10)], states), threshold=86.0)
+
+    # Each record counts until the next one; the last one has no duration
+    assert summary["covered_s"] == 9.0
+    assert (summary["min"], summary["max"], summary["mean"]) == (80.0, 89.0, 84.0)
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (84.0, 88.0, 88.0)
+    assert summary["above_threshold_s"] == 3.0
+    assert summary["throttled_s"] == 4.0
+    assert summary["duty"] == pytest.approx(6.0 / 9.0)
+
+
+def test_summary_weights_by_time_and_caps_gaps():
+    records = _records([70.0, 95.0, 70.0])
+    records[2] = records[2]._replace(timestamp=1000.0)  # VRAM Guard was not running for most of this
+
+    summary = summarize(records, threshold=90.0, max_gap_s=60.0)
+    assert summary["covered_s"] == 61.0
+    assert summary["above_threshold_s"] == 60.0
+    assert summary["p50"] == 95.0 and summary["mean"] == pytest.approx((70.0 + 95.0 * 60) / 61)
+
+
+def test_summary_of_no_records():
+    summary = summarize([], threshold=90.0)
+    assert summary["records"] == 0 and summary["max"] is None and summary["duty"] is None
+    assert summary["above_threshold_s"] == 0
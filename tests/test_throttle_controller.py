@@ -0,0 +1,193 @@
+import pytest
+
+from core.throttle_controller import ThrottleController, ThrottleState
+
+
+class FakeThrottler:
+    """Records the calls the controller makes instead of touching processes."""
+
+    def __init__(self):
+        self.calls = []
+
+    def suspend_gpu_processes(self):
+        self.calls.append("suspend")
+
+    def resume_all_processes(self):
+        self.calls.append("resume")
+
+    def emergency_kill(self):
+        self.calls.append("kill")
+
+
+@pytest.fixture
+def throttler():
+    return FakeThrottler()
+
+
+@pytest.fixture
+def controller(settings, throttler):
+    # T1 92, T2 105, cool-down 3 s, work 2 s, max cool-down 10 s, hysteresis 2 °C (defaults)
+    return ThrottleController(settings, throttler)
+
+
+def _feed(controller, readings):
+    for now, temp in readings:
+        controller.update(temp, now)
+
+
+def test_pulse_cycle_returns_to_idle(controller, throttler):
+    controller.update(90.0, 0.0)
+    assert controller.state == ThrottleState.IDLE and controller.time_to_deadline(0.0) is None
+
+    controller.update(93.0, 1.0)
+    assert controller.state == ThrottleState.SUSPENDED
+    assert controller.time_to_deadline(1.0) == 3.0
+
+    controller.update(91.5, 4.0)  # Cool-down over and below T1 (but not below the early-resume level)
+    assert controller.state == ThrottleState.WORKING
+    assert controller.deadline == 6.0
+
+    controller.update(None, 6.0)  # Deadline tick: still below T1
+    assert controller.state == ThrottleState.IDLE
+    assert throttler.calls == ["suspend", "resume"]
+
+
+def test_early_resume_needs_hysteresis_and_min_cool_down(controller, throttler):
+    controller.update(95.0, 0.0)
+    controller.update(90.5, 1.0)  # Below T1, above T1 - hysteresis
+    assert controller.state == ThrottleState.SUSPENDED
+
+    controller.update(89.5, 1.5)
+    assert controller.state == ThrottleState.WORKING  # <= 90 after >= MIN_COOL_DOWN_S
+    assert throttler.calls == ["suspend", "resume"]
+
+
+def test_early_resume_waits_for_min_cool_down(controller):
+    controller.update(95.0, 0.0)
+    controller.update(80.0, ThrottleController.MIN_COOL_DOWN_S / 2)
+    assert controller.state == ThrottleState.SUSPENDED
+    controller.update(80.0, ThrottleController.MIN_COOL_DOWN_S)
+    assert controller.state == ThrottleState.WORKING
+
+
+def test_work_phase_suspends_early_only_above_hysteresis(controller, throttler):
+    _feed(controller, [(0.0, 95.0), (1.0, 89.0)])
+    assert controller.state == ThrottleState.WORKING
+
+    controller.update(93.0, 1.5)  # >= T1 but < T1 + hysteresis: keep working until the deadline
+    assert controller.state == ThrottleState.WORKING
+    controller.update(None, 3.0)  # Deadline with 93 °C
+    assert controller.state == ThrottleState.SUSPENDED
+
+    _feed(controller, [(3.6, 89.0), (4.0, 94.0)])  # Working again, then >= T1 + hysteresis
+    assert controller.state == ThrottleState.SUSPENDED
+    assert throttler.calls == ["suspend", "resume", "suspend", "resume", "suspend"]
+
+
+def test_cool_down_extension_is_capped(controller, throttler):
+    controller.update(95.0, 0.0)
+    controller.update(95.0, 3.0)  # Still hot at the deadline: extend to max_cool_down_time_s
+    assert controller.state == ThrottleState.SUSPENDED
+    assert controller.deadline == 10.0
+
+    controller.update(95.0, 10.0)  # Still hot, but the cap is reached
+    assert controller.state == ThrottleState.WORKING
+    assert throttler.calls == ["suspend", "resume"]
+
+
+def test_panic_abort_continues_with_cool_down(controller, throttler):
+    controller.update(106.0, 0.0)
+    assert controller.state == ThrottleState.PANIC
+    assert controller.deadline == ThrottleController.PANIC_DURATION_S
+
+    controller.update(104.0, 2.0)
+    assert controller.state == ThrottleState.SUSPENDED  # Processes stay suspended
+    assert controller.deadline == 5.0
+    assert throttler.calls == ["suspend"]
+    assert controller.panic_count == 0
+
+
+def test_panic_kill_after_panic_duration(controller, throttler):
+    controller.update(106.0, 0.0)
+    controller.update(107.0, ThrottleController.PANIC_DURATION_S - 0.1)
+    assert throttler.calls == ["suspend"]
+
+    controller.update(107.0, ThrottleController.PANIC_DURATION_S)
+    assert throttler.calls == ["suspend", "kill", "resume"]
+    assert controller.state == ThrottleState.IDLE
+    assert controller.panic_count == 1
+
+
+def test_panic_while_suspended_does_not_suspend_again(controller, throttler):
+    _feed(controller, [(0.0, 95.0), (1.0, 106.0)])
+    assert controller.state == ThrottleState.PANIC
+    assert throttler.calls == ["suspend"]
+
+
+def test_stop_releases_suspended_processes(controller, throttler):
+    controller.update(95.0, 0.0)
+    controller.stop()
+    assert controller.state == ThrottleState.IDLE
+    assert throttler.calls == ["suspend", "resume"]
+
+
+@pytest.fixture
+def pi_controller(settings, throttler):
+    # Setpoint 91 °C (T1 - 1), period 5 s, duty 0.1..1.0, starting at work / (cool + work) = 0.4
+    settings.set('throttle_mode', "pi")
+    return ThrottleController(settings, throttler)
+
+
+def test_pi_engages_at_the_setpoint_with_the_pulse_ratio(pi_controller, throttler):
+    pi_controller.update(90.0, 0.0)
+    assert pi_controller.state == ThrottleState.IDLE and pi_controller.duty_controller is None
+
+    pi_controller.update(91.0, 1.0)
+    assert pi_controller.state == ThrottleState.SUSPENDED
+    assert pi_controller.duty_controller.duty == pytest.approx(0.4)
+    assert pi_controller.deadline == pytest.approx(1.0 + 0.6 * 5.0)
+    assert throttler.calls == ["suspend"]
+
+
+def test_pi_duty_is_clamped_to_min_duty(settings, pi_controller, throttler):
+    # Hot but below T2: the duty falls to pi_min_duty and the integral keeps its starting point
+    _feed(pi_controller, [(now / 2, 104.0) for now in range(9)])
+    assert pi_controller.duty_controller.duty == settings.get('pi_min_duty')
+    assert pi_controller.duty_controller.integral == pytest.approx(0.4)
+
+    pi_controller.update(104.0, 4.5)  # End of the cool-down: work for min duty * period only
+    assert pi_controller.state == ThrottleState.WORKING
+    assert pi_controller.deadline == pytest.approx(4.5 + 0.1 * 5.0)
+
+    pi_controller.update(104.0, 5.0)  # Next period: suspend for the remaining 90 %
+    assert pi_controller.state == ThrottleState.SUSPENDED
+    assert pi_controller.deadline == pytest.approx(5.0 + 0.9 * 5.0)
+    assert throttler.calls == ["suspend", "resume", "suspend"]
+
+
+def test_pi_does_not_wind_up_while_saturated(pi_controller):
+    _feed(pi_controller, [(0.0, 91.0), (1.0, 60.0), (2.0, 60.0)])
+    assert pi_controller.duty_controller.duty == 1.0
+    assert pi_controller.duty_controller.integral == pytest.approx(0.4)
+
+    pi_controller.update(93.0, 3.0)  # Above the setpoint again: the duty drops in the same reading
+    assert pi_controller.duty_controller.duty == pytest.approx(0.4 - 0.01 * 2 - 0.05 * 2)
+    assert pi_controller.state == ThrottleState.WORKING
+    assert pi_controller.deadline == pytest.approx(3.0 + 0.28 * 5.0)
+
+
+def test_pi_leaves_at_max_duty_well_below_the_setpoint(settings, pi_controller, throttler):
+    settings.set('pi_kp', 1.0)
+    _feed(pi_controller, [(0.0, 91.0), (3.0, 85.0)])
+    assert pi_controller.state == ThrottleState.WORKING
+    assert pi_controller.deadline == 8.0
+
+    pi_controller.update(90.0, 8.0)  # Saturated, but within the hysteresis (91 - 2): another full period
+    assert pi_controller.duty_controller.is_saturated_high
+    assert pi_controller.state == ThrottleState.WORKING
+    assert pi_controller.deadline == 13.0
+
+    pi_controller.update(88.0, 13.0)
+    assert pi_controller.state == ThrottleState.IDLE
+    assert pi_controller.duty_controller is None
+    assert throttler.calls == ["suspend", "resume"]
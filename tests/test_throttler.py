@@ -0,0 +1,99 @@
+import subprocess
+import sys
+import threading
+import time
+
+import psutil
+import pytest
+
+from core.gpu_process_source import FakeGpuProcessSource, GpuProcess
+from core.multi_gpu import MultiGpuGuard
+from core.process_throttler import Throttler
+from core.vram_guard_core import VRAMGuardCore
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses SIGSTOP-based freezing")
+
+BUS_ID = "00000000:01:00.0"
+
+
+@pytest.fixture
+def gpu_job():
+    job = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield job
+    job.kill()
+    job.wait()
+
+
+def _stopped(pid: int) -> bool:
+    return psutil.Process(pid).status() == psutil.STATUS_STOPPED
+
+
+def _settles(pid: int, stopped: bool, timeout_s: float = 2.0) -> bool:
+    """Signals are delivered asynchronously: waits for the process to reach the expected state."""
+    deadline = time.monotonic() + timeout_s
+    while _stopped(pid) != stopped:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _throttler(settings, job):
+    return Throttler(FakeGpuProcessSource([GpuProcess(job.pid, BUS_ID)]), settings)
+
+
+def test_close_resumes_suspended_processes(settings, gpu_job):
+    throttler = _throttler(settings, gpu_job)
+    throttler.suspend_gpu_processes()
+    assert _settles(gpu_job.pid, stopped=True)
+
+    throttler.close()
+    assert _settles(gpu_job.pid, stopped=False)
+    assert throttler.throttled_pids == []
+    throttler.close()  # Second call (e.g. loop end after exit) does nothing
+
+
+def test_no_suspend_after_close(settings, gpu_job):
+    throttler = _throttler(settings, gpu_job)
+    throttler.close()
+
+    throttler.suspend_gpu_processes()
+    assert _settles(gpu_job.pid, stopped=False)
+    assert throttler.throttled_pids == []
+
+
+def test_close_waits_for_a_running_batch(settings, gpu_job):
+    throttler = _throttler(settings, gpu_job)
+    entered, release = threading.Event(), threading.Event()
+    run = throttler.batch.run
+
+    def slow_run(action, processes):
+        results = run(action, processes)
+        if action == 'suspend':
+            entered.set()
+            release.wait(5)
+        return results
+
+    throttler.batch.run = slow_run
+    worker = threading.Thread(target=throttler.suspend_gpu_processes)
+    worker.start()
+    assert entered.wait(5)
+    closer = threading.Thread(target=throttler.close)
+    closer.start()
+    release.set()
+    worker.join(5)
+    closer.join(5)
+
+    assert _settles(gpu_job.pid, stopped=False)
+
+
+def test_multi_gpu_guard_closes_per_gpu_throttlers(settings, gpu_job):
+    guard = MultiGpuGuard(settings, None, None, _throttler(settings, gpu_job))
+    per_gpu = _throttler(settings, gpu_job)
+    guard.cores = [VRAMGuardCore(settings, None, None, per_gpu)]
+    per_gpu.suspend_gpu_processes()
+    assert _settles(gpu_job.pid, stopped=True)
+
+    guard.stop()
+    guard.close()
+    assert _settles(gpu_job.pid, stopped=False)
@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from core.gpu_process_source import FakeGpuProcessSource
+from core.process_throttler import Throttler
+from core.sensor_sampler import Sample
+from core.sensor_source import SensorSource
+from core.throttle_controller import ThrottleState
+from core.trend_estimator import TrendEstimator
+from core.vram_guard_core import VRAMGuardCore
+
+
+def _series(values, start: float = 0.0, step: float = 1.0):
+    return [Sample(seq, start + seq * step, value, "VRAM") for seq, value in enumerate(values)]
+
+
+def _ramp(start_temp: float, slope: float, count: int = 10, noise: float = 0.0, seed: int = 0):
+    rng = random.Random(seed)
+    return _series([start_temp + slope * i + rng.gauss(0.0, noise) for i in range(count)])
+
+
+def test_clean_ramp_is_fitted_exactly():
+    estimate = TrendEstimator().estimate(_ramp(80.0, 0.5), threshold=92.0)
+
+    assert estimate.slope_c_per_s == pytest.approx(0.5)
+    assert estimate.confidence == pytest.approx(1.0)
+    assert estimate.fitted_temp == pytest.approx(84.5)
+    assert estimate.time_to_threshold_s == pytest.approx(15.0)
+
+
+def test_noisy_ramp_keeps_its_slope_with_lower_confidence():
+    estimate = TrendEstimator().estimate(_ramp(80.0, 0.5, count=30, noise=0.3), threshold=100.0)
+
+    assert estimate.slope_c_per_s == pytest.approx(0.5, abs=0.05)
+    assert 0.9 < estimate.confidence < 1.0
+    assert estimate.fitted_temp == pytest.approx(94.5, abs=0.5)
+    assert estimate.time_to_threshold_s == pytest.approx((100.0 - estimate.fitted_temp) / estimate.slope_c_per_s)
+
+
+def test_noise_without_a_trend_has_low_confidence():
+    estimate = TrendEstimator().estimate(_ramp(85.0, 0.0, count=30, noise=0.5), threshold=92.0)
+
+    assert estimate.confidence < 0.3
+
+
+@pytest.mark.parametrize("values", [[80.0] * 10, [90.0 - i for i in range(10)]])
+def test_flat_or_cooling_series_never_reaches_the_threshold(values):
+    estimate = TrendEstimator().estimate(_series(values), threshold=92.0)
+
+    assert estimate.time_to_threshold_s is None
+    assert estimate.confidence == (0.0 if len(set(values)) == 1 else pytest.approx(1.0))
+
+
+def test_threshold_already_reached_by_the_fit():
+    assert TrendEstimator().estimate(_ramp(90.0, 1.0), threshold=92.0).time_to_threshold_s == 0.0
+
+
+def test_too_few_readings():
+    estimator = TrendEstimator(min_samples=4)
+    samples = _ramp(80.0, 0.5, count=5)
+    samples[1] = samples[1]._replace(value=None)  # Failed readings do not count
+
+    assert estimator.estimate(samples[:4], threshold=92.0) is None
+    assert estimator.estimate(samples, threshold=92.0) is not None
+    assert estimator.estimate(_series([80.0, 81.0, 82.0, 83.0], step=0.0), threshold=92.0) is None
+
+
+class ConstantSource(SensorSource):
+    name = "constant"
+
+    def get_vram_temp(self):
+        return 70.0, "VRAM"
+
+
+@pytest.fixture
+def core(settings):
+    # Horizon 5 s, minimum confidence 0.8, predictive cool-down 1 s (defaults)
+    settings.set('enable_predictive_throttling', True)
+    core = VRAMGuardCore(settings, None, ConstantSource(), Throttler(FakeGpuProcessSource(), settings))
+    yield core
+    core.close()
+
+
+def _predict(core, samples):
+    """Feeds the last reading to the controller and runs the prediction check for it."""
+    now, temp = samples[-1].timestamp, samples[-1].value
+    core.controller.update(temp, now)
+    core._check_prediction(temp, now, core.trend.estimate(samples, core.config.get('vram_t1_threshold')))
+    return now
+
+
+def test_confident_prediction_within_horizon_throttles(core):
+    now = _predict(core, _ramp(80.0, 1.0))  # 89 °C, T1 in 3 s
+
+    assert core.controller.state == ThrottleState.SUSPENDED
+    assert core.controller.deadline == now + 1.0
+    assert core.prediction_stats["predicted_crossings"] == 1
+
+
+@pytest.mark.parametrize("samples", [
+    _ramp(70.0, 1.0),  # T1 in 13 s, beyond the horizon
+    _ramp(86.0, 0.3, noise=1.5, seed=3),  # Close and rising, but too noisy to trust
+    _ramp(89.0, -0.2),  # Cooling
+])
+def test_prediction_needs_horizon_and_confidence(core, samples):
+    estimate = core.trend.estimate(samples, 92.0)
+    assert estimate.time_to_threshold_s is None or estimate.time_to_threshold_s > 5.0 or estimate.confidence < 0.8
+
+    _predict(core, samples)
+    assert core.controller.state == ThrottleState.IDLE
+    assert core.prediction_stats["predicted_crossings"] == 0
+
+
+def test_prediction_disabled(settings, core):
+    settings.set('enable_predictive_throttling', False)
+    core.config = settings.snapshot()  # The core reads a new snapshot every cycle
+    _predict(core, _ramp(80.0, 1.0))
+    assert core.controller.state == ThrottleState.IDLE
+
+
+def test_crossing_within_horizon_counts_as_hit(core):
+    now = _predict(core, _ramp(80.0, 1.0))
+    core.controller.update(92.5, now + 2.0)
+
+    assert core.prediction_stats == {"predicted_crossings": 1, "actual_crossings": 1, "prediction_hits": 1}
+
+
+def test_crossing_after_horizon_is_a_miss(core):
+    now = _predict(core, _ramp(80.0, 1.0))
+    core.controller.update(88.0, now + 1.0)
+    core.controller.update(88.0, now + 3.0)  # Back to work: the prediction was early
+    core.controller.update(93.0, now + 6.0)
+
+    assert core.prediction_stats == {"predicted_crossings": 1, "actual_crossings": 1, "prediction_hits": 0}
+
+
+def test_unpredicted_crossing(core):
+    core.controller.update(85.0, 0.0)
+    core.controller.update(95.0, 1.0)
+
+    assert core.prediction_stats == {"predicted_crossings": 0, "actual_crossings": 1, "prediction_hits": 0}
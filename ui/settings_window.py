@@ -51,9 +51,10 @@ class SettingsWindow:
         self.root.mainloop()
 
     def _save(self):
-        self.settings.set("vram_t1_threshold", self.t1_var.get())
-        self.settings.set("enable_notifications", self.notify_var.get())
-        self.settings.set("enable_audio_alert", self.audio_var.get())
-        self.settings.set("enable_autostart", self.auto_var.get())
+        with self.settings.transaction() as tx:
+            tx["vram_t1_threshold"] = self.t1_var.get()
+            tx["enable_notifications"] = self.notify_var.get()
+            tx["enable_audio_alert"] = self.audio_var.get()
+            tx["enable_autostart"] = self.auto_var.get()
         logger.info("Settings updated via GUI.")
         self.root.destroy()
@@ -1,58 +1,137 @@
 import logging
-from PIL import Image
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
 import pystray
 import threading
-from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 class VRAMGuardTray:
+    TEMP_ICON_CACHE_SIZE = 64  # Rendered (temperature, state) icons kept in memory
+    ICON_SIZE = 64
+    STATE_COLORS = {
+        "idle": (0, 128, 255),
+        "working": (255, 140, 0),
+        "suspended": (255, 140, 0),
+        "panic": (220, 0, 0),
+    }
+
     def __init__(self, project_root, settings, core, on_exit_callback, on_settings_callback):
         self.project_root = project_root
         self.settings = settings
         self.core = core
         self.on_exit = on_exit_callback
         self.on_settings = on_settings_callback
-        
+
         self.icon_dir = self.project_root / "resources" / "icons"
         self.icon = None
+
+        # Decoded icons by file name, and an LRU of temperature icons by (temp, state)
+        self._icons = {}
+        self._temp_icons = OrderedDict()
+        self._font = None
+        # What the tray currently shows, so unchanged values are not pushed again
+        self._shown_icon_key = None
+        self._shown_title = None
+        self._lock = threading.Lock()
+
         self._setup_tray()
 
     def _get_icon_image(self, name="norm.ico"):
+        image = self._icons.get(name)
+        if image is not None:
+            return image
+
         path = self.icon_dir / name
         if not path.exists():
             # Fallback to a simple colored square if icon is missing
-            return Image.new('RGB', (64, 64), color=(0, 128, 255))
-        return Image.open(path)
+            image = Image.new('RGB', (64, 64), color=(0, 128, 255))
+        else:
+            image = Image.open(path)
+            image.load()  # Decode now; Image.open() is lazy
+        self._icons[name] = image
+        return image
+
+    def _get_temp_icon(self, temp: int, state: str):
+        key = (temp, state)
+        image = self._temp_icons.get(key)
+        if image is not None:
+            self._temp_icons.move_to_end(key)
+            return image
+
+        image = Image.new('RGBA', (self.ICON_SIZE, self.ICON_SIZE), self.STATE_COLORS.get(state, (0, 128, 255)))
+        draw = ImageDraw.Draw(image)
+        text = str(temp)
+        font = self._get_font()
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        draw.text(((self.ICON_SIZE - (right - left)) / 2 - left, (self.ICON_SIZE - (bottom - top)) / 2 - top),
+                  text, fill=(255, 255, 255), font=font)
+
+        self._temp_icons[key] = image
+        if len(self._temp_icons) > self.TEMP_ICON_CACHE_SIZE:
+            self._temp_icons.popitem(last=False)
+        return image
+
+    def _get_font(self):
+        if self._font is None:
+            try:
+                self._font = ImageFont.truetype("arialbd.ttf", 40)
+            except OSError:
+                try:
+                    self._font = ImageFont.load_default(size=40)
+                except TypeError:  # Pillow < 10.1 has no scalable default font
+                    self._font = ImageFont.load_default()
+        return self._font
 
     def _setup_tray(self):
         menu = pystray.Menu(
             pystray.MenuItem("Settings", self.on_settings),
             pystray.MenuItem("Exit", self.on_exit)
         )
-        
+
         self.icon = pystray.Icon(
-            "VRAM Guard", 
-            self._get_icon_image("norm.ico"), 
-            "VRAM Guard: Monitoring...", 
+            "VRAM Guard",
+            self._get_icon_image("norm.ico"),
+            "VRAM Guard: Monitoring...",
             menu
         )
+        self._shown_icon_key = "norm.ico"
 
     def update_state(self):
-        """Updates icon and tooltip based on current core state."""
+        """
+        Updates icon and tooltip based on current core state.
+        Only values that differ from what is displayed are sent to the tray.
+        """
         if not self.icon: return
-        
-        temp = self.core.current_temp if self.core.current_temp else 0
+
+        temp = round(self.core.current_temp) if self.core.current_temp else 0
         status = "Throttling!" if self.core.is_throttling else "Safe"
-        
-        # Change icon based on throttling
-        icon_name = "fire.ico" if self.core.is_throttling else "norm.ico"
-        self.icon.icon = self._get_icon_image(icon_name)
-        self.icon.title = f"VRAM: {temp}°C [{status}]"
+
+        if self.settings.get('tray_show_temperature') and self.core.current_temp is not None:
+            state = self.core.state.value
+            icon_key = (temp, state)
+        else:
+            # Change icon based on throttling
+            icon_key = "fire.ico" if self.core.is_throttling else "norm.ico"
+
+        gpus = self.core.gpu_states
+        if len(gpus) > 1:
+            # One entry per GPU; Windows limits tooltips to 127 characters
+            title = " | ".join(f"{g.label}: {round(g.temp or 0)}°C [{g.state.value}]" for g in gpus)[:127]
+        else:
+            title = f"VRAM: {temp}°C [{status}]"
+
+        with self._lock:
+            if icon_key != self._shown_icon_key:
+                self.icon.icon = self._get_temp_icon(*icon_key) if isinstance(icon_key, tuple) else self._get_icon_image(icon_key)
+                self._shown_icon_key = icon_key
+            if title != self._shown_title:
+                self.icon.title = title
+                self._shown_title = title
 
     def run(self):
         self.icon.run()
 
     def stop(self):
         if self.icon:
-            self.icon.stop()
\ No newline at end of file
+            self.icon.stop()
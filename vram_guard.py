@@ -1,22 +1,32 @@
 import sys
 import os
+import argparse
+import atexit
 import logging
 import logging.handlers
+import queue
+import signal
 import threading
-import time
 import ctypes
+import psutil
 from pathlib import Path
 
 # Import core modules
 from config.settings import Settings
 from config.license_manager import LicenseManager
-from core.lhm_client import LHMClient
+from core.sensor_source import create_sensor_source
 from core.process_throttler import Throttler
+from core.gpu_process_source import create_gpu_process_source
 from core.vram_guard_core import VRAMGuardCore
-from ui.tray_icon import VRAMGuardTray
-from ui.settings_window import SettingsWindow
+from core.multi_gpu import MultiGpuGuard
+from core.telemetry import TelemetryStore
+from core.metrics import MetricsServer
+from core.tracing import tracer
+from core import events
+from core.control import ControlServer, default_address
 
 APP_NAME = "VRAM Guard"
+SHUTDOWN_TIMEOUT_S = 5.0  # How long exit waits for the control loop to release processes itself
 
 def hide_console():
     """
@@ -31,9 +41,24 @@ def hide_console():
     except Exception:
         pass
 
-def setup_logging(project_root: Path):
+def shutdown(core, sensor_source, core_thread: threading.Thread = None):
     """
-    Configures the logging system.
+    Common exit path of tray and headless mode: stops the control loop,
+    resumes every process it suspended (on all GPUs) and stops the sensor
+    backend. Safe to call after the loop has already ended.
+    """
+    core.stop()
+    if core_thread is not None:
+        core_thread.join(timeout=SHUTDOWN_TIMEOUT_S)
+    core.close()
+    sensor_source.stop()
+
+def setup_logging(project_root: Path, console: bool = False) -> logging.handlers.QueueListener:
+    """
+    Configures the logging system. Loggers only enqueue records; a background
+    thread formats and writes them, so the monitoring loop never waits on disk.
+    :param console: Also log to stderr (headless mode, e.g. under a service manager).
+    :return: The running listener (stop() flushes pending records).
     """
     log_path = project_root / "vram_guard.log"
     
@@ -45,35 +70,65 @@ def setup_logging(project_root: Path):
         '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
     ))
 
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(file_handler.formatter)
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
     # Root logger setup
-    logging.basicConfig(level=logging.INFO, handlers=[file_handler])
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Layout is applied by the listener's handlers
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
     # Suppress noisy external logs
     logging.getLogger('urllib3').setLevel(logging.WARNING)
+    return listener
 
 def main():
     """
     Main entry point for VRAM Guard v1.4.1.
     """
+    launched_at = psutil.Process().create_time()
+
+    parser = argparse.ArgumentParser(description="Protects GPU VRAM from overheating.")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without tray icon or GUI; control through the local socket (python -m core.control)")
+    args = parser.parse_args()
+
     # 0. Hide console immediately for stealth operation
-    hide_console()
+    if not args.headless:
+        hide_console()
 
     # 1. Path and Environment Setup
     project_root = Path(__file__).parent.absolute()
     os.chdir(project_root)
     
-    setup_logging(project_root)
+    log_listener = setup_logging(project_root, console=args.headless)
     logger = logging.getLogger(APP_NAME)
     logger.info(f"--- {APP_NAME} v1.4.1 Started ---")
 
     # 2. Initialize Components
     settings = Settings(project_root)
+    tracer.enabled = settings.get('enable_tracing')
+    if settings.get('enable_event_log'):
+        try:
+            events.start(project_root / "vram_guard_events.jsonl")
+        except OSError as e:
+            logger.error(f"Event log disabled: {e}")
     license_manager = LicenseManager()
-    lhm_client = LHMClient(project_root)
-    throttler = Throttler()
+    sensor_source = create_sensor_source(settings, project_root)
+    throttler = Throttler(create_gpu_process_source(settings.get('gpu_process_cache_ttl_s')), settings)
 
     # 3. Admin Rights Check
     if not throttler._is_admin:
         logger.critical("Application requires Administrator privileges to manage processes.")
+        if args.headless:
+            sys.exit(1)
         # Without console, user needs a GUI message
         ctypes.windll.user32.MessageBoxW(
             0, "VRAM Guard requires Administrator privileges.\nPlease run Start_Protection.bat as Admin.", 
@@ -82,32 +137,67 @@ def main():
         sys.exit(1)
 
     # 4. Core Logic Setup
-    core = VRAMGuardCore(settings, license_manager, lhm_client, throttler)
+    telemetry = None
+    if settings.get('enable_telemetry'):
+        try:
+            capacity = int(settings.get('telemetry_retention_h') * 3600 / settings.get('telemetry_interval_s'))
+            telemetry = TelemetryStore(project_root / "vram_telemetry.bin", capacity)
+        except Exception as e:
+            logger.error(f"Telemetry history disabled: {e}")
+
+    if settings.get('enable_multi_gpu'):
+        core = MultiGpuGuard(settings, license_manager, sensor_source, throttler, telemetry=telemetry,
+                             launched_at=launched_at)
+    else:
+        writer = telemetry.writer(0, settings.get('telemetry_interval_s')) if telemetry else None
+        core = VRAMGuardCore(settings, license_manager, sensor_source, throttler, telemetry=writer,
+                             launched_at=launched_at)
     
+    if settings.get('enable_metrics'):
+        try:
+            MetricsServer(core, settings.get('metrics_port'), settings.get('metrics_bind_address')).start()
+        except OSError as e:
+            logger.error(f"Metrics endpoint could not start: {e}")
+
+    if args.headless:
+        run_headless(core, settings, sensor_source, project_root)
+        return
+
     # 5. Start Core Monitoring in background thread
     core_thread = threading.Thread(target=core.run_monitoring_loop, daemon=True)
     core_thread.start()
 
+    # GUI modules (PIL, pystray, tkinter) are imported only now, while LHM starts on the core thread
+    from ui.tray_icon import VRAMGuardTray
+
     # 6. UI Callbacks
     def on_exit(icon, item):
         logger.info("Exit requested by user.")
         icon.stop()
-        lhm_client.stop()
+        shutdown(core, sensor_source, core_thread)
+        # os._exit skips atexit: flush the background log writers first
+        events.stop()
+        log_listener.stop()
         # Ensure all threads are killed
         os._exit(0)
 
     def on_settings(icon, item):
         logger.debug("Opening settings window.")
+        from ui.settings_window import SettingsWindow
         SettingsWindow(settings).show()
 
     # 7. Initialize and Run Tray Icon
     tray = VRAMGuardTray(project_root, settings, core, on_exit, on_settings)
 
-    # UI Update Loop (Updates tray info every 2 seconds)
+    # UI Update Loop (woken by core state changes, refreshes at least every 30 seconds)
+    ui_changed = threading.Event()
+    core.subscribe(ui_changed.set)
+
     def update_ui_loop():
         while True:
             tray.update_state()
-            time.sleep(2)
+            ui_changed.wait(timeout=30)
+            ui_changed.clear()
 
     threading.Thread(target=update_ui_loop, daemon=True).start()
 
@@ -117,7 +207,34 @@ def main():
     except Exception as e:
         logger.critical(f"Tray icon crashed: {e}")
     finally:
-        lhm_client.stop()
+        shutdown(core, sensor_source, core_thread)
+
+def run_headless(core, settings: Settings, sensor_source, project_root: Path):
+    """
+    Service mode: only the core loop (on the main thread) and the control
+    socket run. No GUI module is ever imported.
+    """
+    logger = logging.getLogger(APP_NAME)
+    control = None
+    try:
+        control = ControlServer(core, settings, settings.get('control_address') or default_address(project_root)).start()
+    except OSError as e:
+        logger.error(f"Control socket could not start: {e}")
+
+    def request_stop(signum, frame):
+        logger.info(f"Signal {signum} received. Stopping...")
+        core.stop()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    try:
+        core.run_monitoring_loop()
+    finally:
+        if control:
+            control.stop()
+        shutdown(core, sensor_source)
+        logger.info(f"--- {APP_NAME} stopped ---")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file